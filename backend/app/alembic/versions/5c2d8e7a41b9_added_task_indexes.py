@@ -0,0 +1,42 @@
+"""Added task indexes
+
+Revision ID: 5c2d8e7a41b9
+Revises: e0ba46a3de81
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2d8e7a41b9'
+down_revision = 'e0ba46a3de81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Индексы создаются без блокировки записи в таблицу
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_project_id_status_due_date', 'task', ['project_id', 'status', 'due_date'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_task_project_id_id', 'task', ['project_id', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_task_due_date_id_not_overdue', 'task', ['due_date', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+            postgresql_where=sa.text("status <> 'OVERDUE' AND due_date IS NOT NULL")
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_due_date_id_not_overdue', table_name='task', postgresql_concurrently=True)
+        op.drop_index('ix_task_project_id_id', table_name='task', postgresql_concurrently=True)
+        op.drop_index('ix_task_project_id_status_due_date', table_name='task', postgresql_concurrently=True)
@@ -0,0 +1,102 @@
+"""Added project task stats
+
+Revision ID: 8f3b1c9d2a47
+Revises: 5c2d8e7a41b9
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3b1c9d2a47'
+down_revision = '5c2d8e7a41b9'
+branch_labels = None
+depends_on = None
+
+STATUSES = {
+    'todo': 'TODO',
+    'in_progress': 'IN_PROGRESS',
+    'completed': 'COMPLETED',
+    'overdue': 'OVERDUE',
+}
+
+
+def upsert(changes: str) -> str:
+    # changes - строки (project_id, status, delta), delta = 1 для новой версии строки и -1 для старой
+    counters = ",\n".join(
+        f"coalesce(sum(delta) FILTER (WHERE status = '{status}'), 0)" for status in STATUSES.values()
+    )
+    updates = ",\n".join(
+        f"{name} = s.{name} + EXCLUDED.{name}" for name in [*STATUSES, 'total']
+    )
+    return f"""
+        INSERT INTO project_task_stats AS s (project_id, {', '.join(STATUSES)}, total)
+        SELECT project_id, {counters}, sum(delta)
+        FROM ({changes}) AS changes
+        WHERE project_id IS NOT NULL
+        GROUP BY project_id
+        ON CONFLICT (project_id) DO UPDATE SET {updates};
+    """
+
+
+CHANGED_ROWS = """
+    FROM old_rows AS o JOIN new_rows AS n USING (id)
+    WHERE (o.project_id, o.status) IS DISTINCT FROM (n.project_id, n.status)
+"""
+
+APPLY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION project_task_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {upsert("SELECT project_id, status, 1 AS delta FROM new_rows")}
+    ELSIF TG_OP = 'DELETE' THEN
+        {upsert("SELECT project_id, status, -1 AS delta FROM old_rows")}
+    ELSE
+        {upsert(
+            f"SELECT o.project_id, o.status, -1 AS delta {CHANGED_ROWS}"
+            f" UNION ALL SELECT n.project_id, n.status, 1 AS delta {CHANGED_ROWS}"
+        )}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+TRIGGERS = {
+    'task_stats_insert': 'AFTER INSERT ON task REFERENCING NEW TABLE AS new_rows',
+    'task_stats_update': 'AFTER UPDATE ON task REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'task_stats_delete': 'AFTER DELETE ON task REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def upgrade():
+    op.create_table('project_task_stats',
+    sa.Column('todo', sa.Integer(), nullable=False),
+    sa.Column('in_progress', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('overdue', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    op.execute(APPLY_FUNCTION)
+    # Триггеры уровня оператора: массовые вставки и COPY обновляют счетчик проекта один раз
+    for name, event in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {event} FOR EACH STATEMENT EXECUTE FUNCTION project_task_stats_apply()"
+        )
+    # Начальное заполнение в той же транзакции, запись в task на это время блокируется
+    op.execute("LOCK TABLE task IN SHARE MODE")
+    op.execute(upsert("SELECT project_id, status, 1 AS delta FROM task"))
+
+
+def downgrade():
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON task")
+    op.execute("DROP FUNCTION IF EXISTS project_task_stats_apply()")
+    op.drop_table('project_task_stats')
@@ -0,0 +1,86 @@
+"""Task project fk set null
+
+Revision ID: b7e4a2f9c315
+Revises: 8f3b1c9d2a47
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4a2f9c315'
+down_revision = '8f3b1c9d2a47'
+branch_labels = None
+depends_on = None
+
+STATUSES = {
+    'todo': 'TODO',
+    'in_progress': 'IN_PROGRESS',
+    'completed': 'COMPLETED',
+    'overdue': 'OVERDUE',
+}
+
+
+def upsert(changes: str, project_filter: str) -> str:
+    counters = ",\n".join(
+        f"coalesce(sum(delta) FILTER (WHERE status = '{status}'), 0)" for status in STATUSES.values()
+    )
+    updates = ",\n".join(
+        f"{name} = s.{name} + EXCLUDED.{name}" for name in [*STATUSES, 'total']
+    )
+    return f"""
+        INSERT INTO project_task_stats AS s (project_id, {', '.join(STATUSES)}, total)
+        SELECT project_id, {counters}, sum(delta)
+        FROM ({changes}) AS changes
+        WHERE {project_filter}
+        GROUP BY project_id
+        ON CONFLICT (project_id) DO UPDATE SET {updates};
+    """
+
+
+CHANGED_ROWS = """
+    FROM old_rows AS o JOIN new_rows AS n USING (id)
+    WHERE (o.project_id, o.status) IS DISTINCT FROM (n.project_id, n.status)
+"""
+
+
+def apply_function(project_filter: str) -> str:
+    return f"""
+CREATE OR REPLACE FUNCTION project_task_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {upsert("SELECT project_id, status, 1 AS delta FROM new_rows", project_filter)}
+    ELSIF TG_OP = 'DELETE' THEN
+        {upsert("SELECT project_id, status, -1 AS delta FROM old_rows", project_filter)}
+    ELSE
+        {upsert(
+            f"SELECT o.project_id, o.status, -1 AS delta {CHANGED_ROWS}"
+            f" UNION ALL SELECT n.project_id, n.status, 1 AS delta {CHANGED_ROWS}",
+            project_filter,
+        )}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def upgrade():
+    # Задачи удаляемого проекта отвязываются в БД тем же оператором DELETE,
+    # как раньше это делал ORM отдельными UPDATE
+    op.drop_constraint('task_project_id_fkey', 'task', type_='foreignkey')
+    op.create_foreign_key(
+        'task_project_id_fkey', 'task', 'project', ['project_id'], ['id'], ondelete='SET NULL'
+    )
+    # Триггер по отвязанным задачам срабатывает, когда проекта и его счетчиков уже нет
+    op.execute(apply_function("project_id IN (SELECT id FROM project)"))
+
+
+def downgrade():
+    op.execute(apply_function("project_id IS NOT NULL"))
+    op.drop_constraint('task_project_id_fkey', 'task', type_='foreignkey')
+    op.create_foreign_key('task_project_id_fkey', 'task', 'project', ['project_id'], ['id'])
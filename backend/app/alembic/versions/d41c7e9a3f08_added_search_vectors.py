@@ -0,0 +1,53 @@
+"""Added search vectors
+
+Revision ID: d41c7e9a3f08
+Revises: b7e4a2f9c315
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c7e9a3f08'
+down_revision = 'b7e4a2f9c315'
+branch_labels = None
+depends_on = None
+
+# Выражения зафиксированы здесь, а не импортируются из моделей: миграция не должна
+# меняться вместе с кодом
+TASK_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+PROJECT_SEARCH_VECTOR = "setweight(to_tsvector('russian', coalesce(name, '')), 'C')"
+
+
+def upgrade():
+    # Добавление хранимой генерируемой колонки перезаписывает таблицу под блокировкой
+    op.add_column('task', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(TASK_SEARCH_VECTOR, persisted=True)
+    ))
+    op.add_column('project', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(PROJECT_SEARCH_VECTOR, persisted=True)
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_search_vector', 'task', ['search_vector'],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_project_search_vector', 'project', ['search_vector'],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_project_search_vector', table_name='project', postgresql_concurrently=True)
+        op.drop_index('ix_task_search_vector', table_name='task', postgresql_concurrently=True)
+    op.drop_column('project', 'search_vector')
+    op.drop_column('task', 'search_vector')
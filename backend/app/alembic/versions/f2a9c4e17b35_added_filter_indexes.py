@@ -0,0 +1,38 @@
+"""Added filter indexes
+
+Revision ID: f2a9c4e17b35
+Revises: d41c7e9a3f08
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c4e17b35'
+down_revision = 'd41c7e9a3f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # varchar_pattern_ops: индекс обслуживает LIKE 'префикс%' при любой collation БД
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_project_id_title', 'task', ['project_id', 'title'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+            postgresql_ops={'title': 'varchar_pattern_ops'}
+        )
+        op.create_index(
+            'ix_project_name', 'project', ['name'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+            postgresql_ops={'name': 'varchar_pattern_ops'}
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_project_name', table_name='project', postgresql_concurrently=True)
+        op.drop_index('ix_task_project_id_title', table_name='task', postgresql_concurrently=True)
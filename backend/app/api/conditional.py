@@ -0,0 +1,76 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def make_etag(version: tuple[Any, ...]) -> str:
+    # Время приводится к UTC, чтобы версия из БД, из загруженных строк и из кэша совпадала
+    version = tuple(
+        value.astimezone(timezone.utc).isoformat() if isinstance(value, datetime) else value
+        for value in version
+    )
+    digest = hashlib.sha1(repr(version).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def set_validators(
+        request: Request,
+        response: Response,
+        version: tuple[Any, ...],
+) -> Response | None:
+    """
+    Пишет ETag и Last-Modified в ответ и проверяет условные заголовки запроса
+
+    Args:
+        request: запрос
+        response: ответ эндпоинта
+        version: версия данных, первый элемент - время последнего изменения
+
+    Returns:
+        ответ 304, если у клиента актуальная версия, иначе None
+    """
+    etag = make_etag(version)
+    last_modified = version[0]
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Слабое сравнение: префикс W/ не учитывается
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        not_modified = "*" in tags or etag.removeprefix("W/") in tags
+    else:
+        not_modified = is_not_modified_since(request.headers.get("if-modified-since"), last_modified)
+
+    if not not_modified:
+        return None
+    return Response(
+        status_code=304,
+        headers={
+            name: response.headers[name]
+            for name in ("ETag", "Last-Modified")
+            if name in response.headers
+        },
+    )
+
+
+def is_not_modified_since(header: str | None, last_modified: datetime | None) -> bool:
+    if not header or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
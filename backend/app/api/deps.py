@@ -1,11 +1,23 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from datetime import datetime
-from fastapi import Depends, Query, HTTPException
+
+from fastapi import Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.engine import engine
+from app import cruds
+from app.core import replica
+from app.core.config import settings
+from app.core.engine import (
+    engine,
+    get_async_engine,
+    get_async_replica_engines,
+    replica_engines,
+)
+from app.cruds.filters import CompiledFilter, FilterSpec
 from app.models import Task, TaskStatus
-from app.models.utils import Pagination
+from app.models.utils import Pagination, decode_cursor
 
 # from app.models.user import TokenPayload, User
 
@@ -14,18 +26,142 @@ from app.models.utils import Pagination
 # )
 
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+replica_router = replica.ReplicaRouter(
+    replica_engines,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_SECONDS,
+)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+MIN_INT4, MAX_INT4 = -2**31, 2**31 - 1
+
+
+def mark_primary(request: Request, response: Response) -> None:
+    """
+    После записи клиент какое-то время читает из основной БД и видит свои изменения,
+    даже если реплика их еще не получила
+    """
+    if replica_router.engines and request.method not in SAFE_METHODS:
+        response.set_cookie(
+            replica.STICKY_COOKIE,
+            str(replica.get_sticky_until()),
+            max_age=settings.DB_REPLICA_STICKY_SECONDS,
+            httponly=True,
+        )
+
+
+def choose_replica(request: Request) -> int | None:
+    if replica.is_sticky(request.cookies):
+        return None
+    return replica_router.choose()
+
+
+def get_db(request: Request, response: Response) -> Generator[Session, None, None]:
+    """
+    Единица работы: одна транзакция на запрос. Обработчики и CRUD методы только
+    отправляют изменения в БД, коммит выполняется после обработчика, откат - при исключении.
+    Выход из зависимости происходит до отправки ответа, поэтому ошибка коммита
+    возвращается клиенту, а не теряется
+    """
+    mark_primary(request, response)
+    # expire_on_commit=False: объекты ответа не перечитываются из БД после коммита
+    with Session(engine, expire_on_commit=False) as session, session.begin():
+        yield session
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Сессия для обработчиков без побочных эффектов: читает с реплики, если она есть,
+    отстает не больше DB_REPLICA_MAX_LAG_SECONDS и клиент недавно ничего не записывал.
+    Иначе - основная БД
+    """
+    index = choose_replica(request)
+    if index is None:
+        with Session(engine, expire_on_commit=False) as session, session.begin():
+            yield session
+        return
+    with Session(
+        replica_engines[index], expire_on_commit=False, info={replica.REPLICA_SESSION_KEY: True}
+    ) as session, session.begin():
+        yield session
+
+
+async def get_async_db(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    mark_primary(request, response)
+    # expire_on_commit=False: в асинхронном режиме ленивая загрузка после коммита невозможна
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session, session.begin():
+        yield session
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Проверка отставания синхронная, поэтому выполняется в пуле потоков
+    index = await run_in_threadpool(choose_replica, request) if replica_router.engines else None
+    if index is None:
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as session, session.begin():
+            yield session
+        return
+    async with AsyncSession(
+        get_async_replica_engines()[index], expire_on_commit=False, info={replica.REPLICA_SESSION_KEY: True}
+    ) as session, session.begin():
         yield session
 
 
 def pagination(
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
 ) -> Pagination:
     if skip < 0 or limit <=0:
         raise HTTPException(status_code=400, detail="Invalid pagination parameters")
-    return Pagination(skip=skip, limit=limit)
+    if cursor is None:
+        return Pagination(skip=skip, limit=limit)
+    try:
+        return Pagination(limit=limit, cursor=decode_cursor(cursor))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def get_list_filter(spec: FilterSpec):
+    """
+    Зависимость, разбирающая параметры filter и sort по спецификации модели
+    """
+    def list_filter(
+        filters: list[str] = Query(
+            [], alias="filter", description="Условие поле:оператор:значение, например status:in:todo,completed"
+        ),
+        sort: str | None = Query(None, description="Поля сортировки через запятую, -поле - по убыванию"),
+    ) -> CompiledFilter:
+        try:
+            return spec.compile(spec.parse(filters, sort))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return list_filter
+
+
+def get_batch_ids(
+    ids: list[str] = Query(..., description="id через запятую, параметр можно повторять"),
+) -> list[int]:
+    try:
+        list_ids = [int(id) for value in ids for id in value.split(",") if id]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ids")
+    if not list_ids:
+        raise HTTPException(status_code=400, detail="No ids")
+    # id задач - integer в Postgres, значение вне диапазона сорвало бы весь запрос
+    if any(not MIN_INT4 <= id <= MAX_INT4 for id in list_ids):
+        raise HTTPException(status_code=400, detail="Invalid ids")
+    if len(list_ids) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many ids, max {settings.BULK_MAX_ITEMS}")
+    return list_ids
+
+
+def get_search_query(
+    q: str = Query(
+        ..., min_length=1, max_length=255,
+        description='Слова для поиска; "фраза" в кавычках, or - любое из слов, -слово - исключить'
+    )
+) -> str:
+    return q
 
 
 def get_status_filter(
@@ -33,7 +169,8 @@ def get_status_filter(
 ):
     if not status:
         return []
-    return [Task.status == status]
+    # Статус с учетом просрочки, как он отдается в ответе
+    return [cruds.task.get_actual_status_condition([status])]
 
 def get_due_date_filter(
     due_date_from: str | None = Query(None, title="Due Date From", description="Filter tasks by due date from"),
@@ -1,9 +1,34 @@
 from fastapi import APIRouter
+from fastapi.routing import APIRoute
 
-from app.api.routes import project, task
+from app.api.routes import async_project, async_task, project, task, utils
+from app.core.config import settings
 
-api_router = APIRouter()
 
-api_router.include_router(project.router, tags=["project"], prefix="/project")
-api_router.include_router(task.router, tags=["task"], prefix="/task")
+def get_api_router(async_api: bool = settings.ASYNC_API) -> APIRouter:
+    api_router = APIRouter()
+    if async_api:
+        # Асинхронные роутеры подключаются первыми и перекрывают одноименные синхронные эндпоинты
+        api_router.include_router(async_project.router, tags=["project"], prefix="/project")
+        api_router.include_router(async_task.router, tags=["task"], prefix="/task")
+    async_routes = list(api_router.routes)
 
+    api_router.include_router(project.router, tags=["project"], prefix="/project")
+    api_router.include_router(task.router, tags=["task"], prefix="/task")
+    api_router.include_router(utils.router, tags=["utils"], prefix="/utils")
+
+    # Перекрытые синхронные эндпоинты скрываем из схемы OpenAPI
+    async_endpoints = {
+        (route.path.replace(":int", ""), method)
+        for route in async_routes
+        for method in route.methods
+    }
+    for route in api_router.routes[len(async_routes):]:
+        if isinstance(route, APIRoute) and all(
+            (route.path, method) in async_endpoints for method in route.methods
+        ):
+            route.include_in_schema = False
+    return api_router
+
+
+api_router = get_api_router()
@@ -0,0 +1,256 @@
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import cruds
+from app.api import conditional, deps, serializers
+from app.cruds.filters import CompiledFilter
+from app.models.project import (
+    CreateProject,
+    ProjectOut,
+    ProjectWithStats,
+    UpdateProject,
+)
+from app.models.task import ProjectWithTasks, TaskSearchOut
+from app.models.utils import Pagination
+
+# Асинхронные обработчики основных эндпоинтов проектов, включаются настройкой ASYNC_API.
+# Пути с конвертером :int, чтобы не перекрывать остальные эндпоинты синхронного роутера.
+router = APIRouter()
+
+@router.get("/", response_model=list[ProjectWithStats] | list[ProjectWithTasks] | list[ProjectOut])
+async def get_projects(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(deps.get_async_read_db),
+    pagination: Pagination = Depends(deps.pagination),
+    list_filter: CompiledFilter = Depends(deps.get_list_filter(cruds.async_project.filter_spec)),
+    include: Literal["stats"] | None = Query(None, description="stats - счетчики задач по статусам"),
+    expand: Literal["tasks"] | None = Query(None, description="tasks - первые задачи каждого проекта"),
+) -> list[ProjectOut]:
+    """
+    Получение списка всех проектов
+
+    Args:
+        session: сессия БД
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag, Last-Modified и X-Next-Cursor
+        pagination: параметры пагинации
+        list_filter: фильтры и сортировка из параметров filter и sort
+        include: дополнительные данные проектов
+        expand: связанные объекты, встраиваемые в ответ
+
+    Returns:
+        список проектов
+    """
+    if include and expand:
+        raise HTTPException(
+            status_code=400,
+            detail="include and expand cannot be combined"
+        )
+    if include == "stats":
+        projects = await cruds.async_project.get_list_with_stats(
+            session=session,
+            filters=list_filter.filters,
+            sort=list_filter.sort,
+            skip=pagination.skip,
+            limit=pagination.limit,
+            after=pagination.cursor
+        )
+        if len(projects) == pagination.limit:
+            response.headers["X-Next-Cursor"] = cruds.async_project.get_cursor(projects[-1], list_filter.sort)
+        return serializers.render(serializers.project_stats_list_adapter, projects, response)
+    if not expand and conditional.is_conditional(request):
+        version = await cruds.async_project.get_list_version(
+            session=session,
+            filters=list_filter.filters,
+            sort=list_filter.sort,
+            skip=pagination.skip,
+            limit=pagination.limit,
+            after=pagination.cursor
+        )
+        not_modified = conditional.set_validators(request, response, version)
+        if not_modified:
+            return not_modified
+    projects = await cruds.async_project.get_list_rows(
+        session=session,
+        schema=ProjectOut,
+        filters=list_filter.filters,
+        sort=list_filter.sort,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after=pagination.cursor
+    )
+    if len(projects) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.async_project.get_cursor(projects[-1], list_filter.sort)
+    if expand == "tasks":
+        tasks = await cruds.async_task.get_first_by_project_ids(
+            session=session,
+            project_ids=[project.id for project in projects]
+        )
+        return serializers.render(
+            serializers.project_tasks_list_adapter,
+            [ProjectWithTasks(**project._mapping, tasks=tasks.get(project.id, [])) for project in projects],
+            response
+        )
+    conditional.set_validators(request, response, cruds.async_project.get_version(projects))
+    return serializers.render_rows(serializers.project_rows_adapter, projects, response)
+
+
+@router.post("/", response_model=ProjectOut)
+async def create_project(
+        project_on_creation: CreateProject,
+        session: AsyncSession = Depends(deps.get_async_db),
+):
+    """
+    Создание нового проекта
+
+    Args:
+        project_on_creation: параметры создания проекта
+        session: сессия БД
+
+    Returns:
+        Объект проекта
+    """
+    return await cruds.async_project.create(
+        session=session,
+        obj_in=project_on_creation
+    )
+
+
+@router.patch("/", response_model=ProjectOut)
+async def update_project(
+        project_id: int,
+        project_on_update: UpdateProject,
+        session: AsyncSession = Depends(deps.get_async_db)
+):
+    """
+    Обновление существующего проекта
+
+    Args:
+        project_id: id проекта
+        project_on_update: параметры обновления проекта
+        session: сессия БД
+
+    Returns:
+        Объект проекта
+    """
+    project = await cruds.async_project.update_by_id(
+        session=session,
+        id=project_id,
+        obj_new=project_on_update
+    )
+    if not project:
+        raise HTTPException(
+            status_code=404,
+            detail="Project not found"
+        )
+    return project
+
+
+@router.get("/{project_id:int}", response_model=ProjectOut | ProjectWithTasks)
+async def get_project(
+        project_id: int,
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(deps.get_async_read_db),
+        expand: Literal["tasks"] | None = Query(None, description="tasks - первые задачи проекта"),
+):
+    """
+    Получение существующего проекта по айди
+
+    Args:
+        project_id: id проекта
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag и Last-Modified
+        session: сессия БД
+        expand: связанные объекты, встраиваемые в ответ
+
+    Returns:
+        Объект проекта
+    """
+    project = await cruds.async_project.get_one_by_id(
+        session=session,
+        id=project_id
+    )
+    if not project:
+        raise HTTPException(
+            status_code=404,
+            detail="Project not found"
+        )
+    if expand == "tasks":
+        tasks = await cruds.async_task.get_first_by_project_ids(session=session, project_ids=[project.id])
+        return serializers.render(
+            serializers.project_tasks_adapter,
+            ProjectWithTasks(**project.model_dump(), tasks=tasks.get(project.id, [])),
+            response
+        )
+    not_modified = conditional.set_validators(request, response, cruds.async_project.get_version([project]))
+    if not_modified:
+        return not_modified
+    # Схема ответа объединяет варианты, поэтому ORM объект валидируется заранее,
+    # иначе проверка варианта с tasks загрузила бы связь целиком
+    return serializers.render(serializers.project_adapter, ProjectOut.model_validate(project), response)
+
+
+@router.get("/{project_id:int}/tasks/search", response_model=list[TaskSearchOut])
+async def search_project_tasks(
+        project_id: int,
+        response: Response,
+        session: AsyncSession = Depends(deps.get_async_read_db),
+        q: str = Depends(deps.get_search_query),
+        pagination: Pagination = Depends(deps.pagination),
+):
+    """
+    Полнотекстовый поиск задач проекта, результаты упорядочены по релевантности
+
+    Args:
+        project_id: id проекта
+        response: ответ, в заголовок X-Next-Cursor пишется курсор следующей страницы
+        session: сессия БД
+        q: поисковый запрос
+        pagination: параметры пагинации, курсор - (rank, id) последней задачи
+
+    Returns:
+        список задач с релевантностью
+    """
+    tasks = await cruds.async_task.search(
+        session=session,
+        q=q,
+        project_id=project_id,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after=pagination.cursor
+    )
+    if len(tasks) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.async_task.get_search_cursor(tasks[-1])
+    return serializers.render_rows(serializers.task_search_rows_adapter, tasks, response)
+
+
+@router.delete("/", response_model=dict)
+async def delete_project(
+        project_id: int,
+        session: AsyncSession = Depends(deps.get_async_db),
+):
+    """
+    Удаление существующего проекта
+
+    Args:
+        project_id: id проекта
+        session: сессия БД
+
+    Returns:
+        None
+    """
+    deleted_id = await cruds.async_project.remove_by_id(
+        session=session,
+        id=project_id
+    )
+    if deleted_id is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Project not found"
+        )
+    return {"detail": "Project deleted"}
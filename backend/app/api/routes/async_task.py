@@ -0,0 +1,272 @@
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import joinedload
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import cruds
+from app.api import conditional, deps, serializers
+from app.cruds.filters import CompiledFilter
+from app.models import Task
+from app.models.task import (
+    CreateTask,
+    TaskBatchOut,
+    TaskOut,
+    TaskSearchOut,
+    TaskWithProject,
+    UpdateTask,
+)
+from app.models.utils import Pagination
+
+# Асинхронные обработчики основных эндпоинтов задач, включаются настройкой ASYNC_API.
+# Пути с конвертером :int, чтобы не перекрывать остальные эндпоинты синхронного роутера.
+router = APIRouter()
+
+@router.get("/", response_model=list[TaskWithProject] | list[TaskOut])
+async def get_tasks_by_project_id(
+        project_id: int,
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(deps.get_async_read_db),
+        pagination: Pagination = Depends(deps.pagination),
+        list_filter: CompiledFilter = Depends(deps.get_list_filter(cruds.async_task.filter_spec)),
+        task_filters: list | None = Depends(deps.get_task_filters),
+        expand: Literal["project"] | None = Query(None, description="project - проект задачи"),
+):
+    """
+    Получение списка задач для указанного проекта
+
+    Args:
+        project_id: id проекта
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag, Last-Modified и X-Next-Cursor
+        session: сессия БД
+        pagination: параметры пагинации
+        list_filter: фильтры и сортировка из параметров filter и sort
+        task_filters: фильтры для задач
+        expand: связанные объекты, встраиваемые в ответ
+
+    Returns:
+        список объектов задач
+    """
+    if not expand and conditional.is_conditional(request):
+        version = await cruds.async_task.get_list_version(
+            session=session,
+            filters=[Task.project_id == project_id] + task_filters + list_filter.filters,
+            sort=list_filter.sort,
+            skip=pagination.skip,
+            limit=pagination.limit,
+            after=pagination.cursor
+        )
+        not_modified = conditional.set_validators(request, response, version)
+        if not_modified:
+            return not_modified
+    tasks = await cruds.async_task.get_list_rows(
+        session=session,
+        schema=TaskOut,
+        filters=[Task.project_id == project_id] + task_filters + list_filter.filters,
+        sort=list_filter.sort,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after=pagination.cursor
+    )
+    if len(tasks) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.async_task.get_cursor(tasks[-1], list_filter.sort)
+    if expand == "project":
+        # Все задачи страницы из одного проекта, он читается один раз
+        project = await cruds.async_project.get_one_by_id(session=session, id=project_id)
+        return serializers.render(
+            serializers.task_project_list_adapter,
+            [TaskWithProject(**task._mapping, project=project.model_dump() if project else None) for task in tasks],
+            response
+        )
+    conditional.set_validators(request, response, cruds.async_task.get_version(tasks))
+    return serializers.render_rows(serializers.task_rows_adapter, tasks, response)
+
+
+@router.get("/search", response_model=list[TaskSearchOut])
+async def search_tasks(
+        response: Response,
+        session: AsyncSession = Depends(deps.get_async_read_db),
+        q: str = Depends(deps.get_search_query),
+        pagination: Pagination = Depends(deps.pagination),
+):
+    """
+    Полнотекстовый поиск задач по названию, описанию и названию проекта,
+    результаты упорядочены по релевантности
+
+    Args:
+        response: ответ, в заголовок X-Next-Cursor пишется курсор следующей страницы
+        session: сессия БД
+        q: поисковый запрос
+        pagination: параметры пагинации, курсор - (rank, id) последней задачи
+
+    Returns:
+        список задач с релевантностью
+    """
+    tasks = await cruds.async_task.search(
+        session=session,
+        q=q,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after=pagination.cursor
+    )
+    if len(tasks) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.async_task.get_search_cursor(tasks[-1])
+    return serializers.render_rows(serializers.task_search_rows_adapter, tasks, response)
+
+
+@router.get("/batch", response_model=TaskBatchOut)
+async def get_tasks_batch(
+        session: AsyncSession = Depends(deps.get_async_read_db),
+        ids: list[int] = Depends(deps.get_batch_ids),
+):
+    """
+    Получение задач по списку id одним запросом
+
+    Args:
+        session: сессия БД
+        ids: список id задач
+
+    Returns:
+        задачи в порядке запрошенных id и id, которых нет в БД
+    """
+    tasks = await cruds.async_task.get_many_by_ids(session=session, list_ids=ids)
+    return TaskBatchOut(
+        items=[cruds.async_task.with_actual_status(task) for task in tasks],
+        missing=cruds.async_task.get_missing_ids(tasks, ids)
+    )
+
+
+@router.post("/", response_model=TaskOut)
+async def create_task(
+        task_on_creation: CreateTask,
+        project_id: int,
+        session: AsyncSession = Depends(deps.get_async_db),
+):
+    """
+    Создание задачи
+
+    Args:
+        task_on_creation: объект задачи
+        project_id: id проекта
+        session: сессия БД
+
+    Returns:
+        созданная задача
+    """
+    project = await cruds.async_project.get_one_by_id(session=session, id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=404,
+            detail="Project not found"
+        )
+    task = await cruds.async_task.create(
+        session=session,
+        obj_in=dict(project_id=project_id, **task_on_creation.dict())
+    )
+    return await cruds.async_task.get_status_update(
+        session=session,
+        obj_current=task
+    )
+
+
+@router.patch("/{task_id:int}", response_model=TaskOut)
+async def update_task(
+        task_id: int,
+        task_on_update: UpdateTask,
+        session: AsyncSession = Depends(deps.get_async_db)
+):
+    """
+    Обновление существующей задачи
+
+    Args:
+        task_id: id задачи
+        task_on_update: данные для обновления задачи
+        session: сессия БД
+
+    Returns:
+        обновленная задача
+    """
+    task = await cruds.async_task.update_by_id(
+        session=session,
+        id=task_id,
+        obj_new=task_on_update
+    )
+    if not task:
+        raise HTTPException(
+            status_code=404,
+            detail="Task not found"
+        )
+    return task
+
+
+@router.get("/{task_id:int}", response_model=TaskOut | TaskWithProject)
+async def get_task(
+        task_id: int,
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(deps.get_async_read_db),
+        expand: Literal["project"] | None = Query(None, description="project - проект задачи"),
+):
+    """
+    Получение существующей задачи
+
+    Args:
+        task_id: id задачи
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag и Last-Modified
+        session: сессия БД
+        expand: связанные объекты, встраиваемые в ответ
+
+    Returns:
+        Объект задачи
+    """
+    task = await cruds.async_task.get_one_by_id(
+        session=session,
+        id=task_id,
+        options=[joinedload(Task.project)] if expand == "project" else None
+    )
+    if not task:
+        raise HTTPException(
+            status_code=404,
+            detail="Task not found"
+        )
+    if expand == "project":
+        return serializers.render(
+            serializers.task_project_adapter,
+            TaskWithProject(
+                **cruds.async_task.with_actual_status(task).model_dump(),
+                project=task.project.model_dump() if task.project else None
+            ),
+            response
+        )
+    not_modified = conditional.set_validators(request, response, cruds.async_task.get_version([task]))
+    if not_modified:
+        return not_modified
+    return serializers.render(serializers.task_adapter, cruds.async_task.with_actual_status(task), response)
+
+
+@router.delete("/", response_model=dict)
+async def delete_task(
+        task_id: int,
+        session: AsyncSession = Depends(deps.get_async_db),
+):
+    """
+    Удаление задачи
+
+    Args:
+        task_id: id задачи
+        session: сессия БД
+    """
+    deleted_id = await cruds.async_task.remove_by_id(
+        session=session,
+        id=task_id
+    )
+    if deleted_id is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Task not found"
+        )
+    return {"detail": "Task deleted"}
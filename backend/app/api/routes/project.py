@@ -1,35 +1,113 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+import codecs
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Literal
+
+from anyio import from_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import cruds
-from app.api import deps
+from app.api import conditional, deps, serializers
+from app.core.config import settings
+from app.core.engine import engine
+from app.cruds.filters import CompiledFilter
 from app.models.project import *
+from app.models.task import (
+    BulkItemError,
+    CreateTask,
+    ProjectWithTasks,
+    TaskImportOut,
+    TaskOut,
+    TaskSearchOut,
+)
 from app.models.utils import Pagination
 
 router = APIRouter()
 
-@router.get("/", response_model=list[ProjectOut])
+@router.get("/", response_model=list[ProjectWithStats] | list[ProjectWithTasks] | list[ProjectOut])
 def get_projects(
-    session: Session = Depends(deps.get_db),
-    pagination: Pagination = Depends(deps.pagination)
+    request: Request,
+    response: Response,
+    session: Session = Depends(deps.get_read_db),
+    pagination: Pagination = Depends(deps.pagination),
+    list_filter: CompiledFilter = Depends(deps.get_list_filter(cruds.project.filter_spec)),
+    include: Literal["stats"] | None = Query(None, description="stats - счетчики задач по статусам"),
+    expand: Literal["tasks"] | None = Query(None, description="tasks - первые задачи каждого проекта"),
 ) -> list[ProjectOut]:
     """
     Получение списка всех проектов
 
     Args:
         session: сессия БД
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag, Last-Modified и X-Next-Cursor
         pagination: параметры пагинации
+        list_filter: фильтры и сортировка из параметров filter и sort
+        include: дополнительные данные проектов
+        expand: связанные объекты, встраиваемые в ответ
 
     Returns:
         список проектов
     """
-    projects = cruds.project.get_list(
+    if include and expand:
+        raise HTTPException(
+            status_code=400,
+            detail="include and expand cannot be combined"
+        )
+    if include == "stats":
+        projects = cruds.project.get_list_with_stats(
+            session=session,
+            filters=list_filter.filters,
+            sort=list_filter.sort,
+            skip=pagination.skip,
+            limit=pagination.limit,
+            after=pagination.cursor
+        )
+        if len(projects) == pagination.limit:
+            response.headers["X-Next-Cursor"] = cruds.project.get_cursor(projects[-1], list_filter.sort)
+        return serializers.render(serializers.project_stats_list_adapter, projects, response)
+    if not expand and conditional.is_conditional(request):
+        version = cruds.project.get_list_version(
+            session=session,
+            filters=list_filter.filters,
+            sort=list_filter.sort,
+            skip=pagination.skip,
+            limit=pagination.limit,
+            after=pagination.cursor
+        )
+        not_modified = conditional.set_validators(request, response, version)
+        if not_modified:
+            return not_modified
+    projects = cruds.project.get_list_rows(
         session=session,
+        schema=ProjectOut,
+        filters=list_filter.filters,
+        sort=list_filter.sort,
         skip=pagination.skip,
-        limit=pagination.limit
+        limit=pagination.limit,
+        after=pagination.cursor
     )
-    return projects
+    if len(projects) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.project.get_cursor(projects[-1], list_filter.sort)
+    if expand == "tasks":
+        tasks = cruds.task.get_first_by_project_ids(
+            session=session,
+            project_ids=[project.id for project in projects]
+        )
+        return serializers.render(
+            serializers.project_tasks_list_adapter,
+            [ProjectWithTasks(**project._mapping, tasks=tasks.get(project.id, [])) for project in projects],
+            response
+        )
+    conditional.set_validators(request, response, cruds.project.get_version(projects))
+    return serializers.render_rows(serializers.project_rows_adapter, projects, response)
 
 
 @router.post("/", response_model=ProjectOut)
@@ -47,12 +125,10 @@ def create_project(
     Returns:
         Объект проекта
     """
-    project = cruds.project.create(
+    return cruds.project.create(
         session=session,
         obj_in=project_on_creation
     )
-    session.commit()
-    return project
 
 
 @router.patch("/", response_model=ProjectOut)
@@ -72,32 +148,36 @@ def update_project(
     Returns:
         Объект проекта
     """
-    project = cruds.project.get_one_by_id(session=session, id=project_id)
+    project = cruds.project.update_by_id(
+        session=session,
+        id=project_id,
+        obj_new=project_on_update
+    )
     if not project:
         raise HTTPException(
             status_code=404,
             detail="Project not found"
         )
-    cruds.project.update(
-        session=session,
-        obj_current=project,
-        obj_new=project_on_update
-    )
-    session.commit()
     return project
 
 
-@router.get("/{project_id}", response_model=ProjectOut)
+@router.get("/{project_id}", response_model=ProjectOut | ProjectWithTasks)
 def get_project(
         project_id: int,
-        session: Session = Depends(deps.get_db),
+        request: Request,
+        response: Response,
+        session: Session = Depends(deps.get_read_db),
+        expand: Literal["tasks"] | None = Query(None, description="tasks - первые задачи проекта"),
 ):
     """
     Получение существующего проекта по айди
 
     Args:
         project_id: id проекта
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag и Last-Modified
         session: сессия БД
+        expand: связанные объекты, встраиваемые в ответ
 
     Returns:
         Объект проекта
@@ -111,7 +191,19 @@ def get_project(
             status_code=404,
             detail="Project not found"
         )
-    return project
+    if expand == "tasks":
+        tasks = cruds.task.get_first_by_project_ids(session=session, project_ids=[project.id])
+        return serializers.render(
+            serializers.project_tasks_adapter,
+            ProjectWithTasks(**project.model_dump(), tasks=tasks.get(project.id, [])),
+            response
+        )
+    not_modified = conditional.set_validators(request, response, cruds.project.get_version([project]))
+    if not_modified:
+        return not_modified
+    # Схема ответа объединяет варианты, поэтому ORM объект валидируется заранее,
+    # иначе проверка варианта с tasks загрузила бы связь целиком
+    return serializers.render(serializers.project_adapter, ProjectOut.model_validate(project), response)
 
 
 @router.delete("/", response_model=dict)
@@ -129,18 +221,222 @@ def delete_project(
     Returns:
         None
     """
-    project = cruds.project.get_one_by_id(
+    # Задачи проекта отвязываются внешним ключом в том же DELETE
+    deleted_id = cruds.project.remove_by_id(
         session=session,
         id=project_id
     )
-    if not project:
+    if deleted_id is None:
         raise HTTPException(
             status_code=404,
             detail="Project not found"
         )
-    cruds.project.remove(
+    return {"detail": "Project deleted"}
+
+
+@router.get("/{project_id}/tasks/search", response_model=list[TaskSearchOut])
+def search_project_tasks(
+        project_id: int,
+        response: Response,
+        session: Session = Depends(deps.get_read_db),
+        q: str = Depends(deps.get_search_query),
+        pagination: Pagination = Depends(deps.pagination),
+):
+    """
+    Полнотекстовый поиск задач проекта, результаты упорядочены по релевантности
+
+    Args:
+        project_id: id проекта
+        response: ответ, в заголовок X-Next-Cursor пишется курсор следующей страницы
+        session: сессия БД
+        q: поисковый запрос
+        pagination: параметры пагинации, курсор - (rank, id) последней задачи
+
+    Returns:
+        список задач с релевантностью
+    """
+    tasks = cruds.task.search(
+        session=session,
+        q=q,
+        project_id=project_id,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after=pagination.cursor
+    )
+    if len(tasks) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.task.get_search_cursor(tasks[-1])
+    return serializers.render_rows(serializers.task_search_rows_adapter, tasks, response)
+
+
+def export_tasks(project_id: int, export_format: str) -> Iterator[str]:
+    # Сессия открывается внутри генератора: сессия из зависимости закрывается до начала отправки ответа
+    with Session(engine) as session:
+        chunks = cruds.task.stream_by_project_id(
+            session=session,
+            project_id=project_id,
+            chunk_size=settings.EXPORT_CHUNK_SIZE
+        )
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(TaskOut.model_fields)
+            for rows in chunks:
+                for row in rows:
+                    writer.writerow(TaskOut.model_validate(row._asdict()).model_dump(mode="json").values())
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for rows in chunks:
+                yield "".join(
+                    TaskOut.model_validate(row._asdict()).model_dump_json() + "\n" for row in rows
+                )
+
+
+@router.get("/{project_id}/tasks/export")
+def export_project_tasks(
+        project_id: int,
+        export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+        session: Session = Depends(deps.get_db),
+):
+    """
+    Потоковая выгрузка всех задач проекта в формате NDJSON или CSV
+
+    Args:
+        project_id: id проекта
+        export_format: формат выгрузки
+        session: сессия БД
+
+    Returns:
+        поток строк с задачами
+    """
+    project = cruds.project.get_one_by_id(
         session=session,
         id=project_id
     )
-    return {"detail": "Project deleted"}
+    if not project:
+        raise HTTPException(
+            status_code=404,
+            detail="Project not found"
+        )
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_tasks(project_id, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="project_{project_id}_tasks.{export_format}"'}
+    )
+
+
+def iter_stream_lines(stream: AsyncIterator[bytes]) -> Iterator[str]:
+    """
+    Построчно читает асинхронный поток тела запроса из рабочего потока,
+    не загружая тело целиком в память
+    """
+    async def next_chunk() -> bytes | None:
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    tail = ""
+    while (chunk := from_thread.run(next_chunk)) is not None:
+        *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def check_import_record(record: Any) -> dict[str, Any] | None:
+    # Postgres не хранит NUL в текстовых полях, такая запись сорвала бы весь COPY
+    if not isinstance(record, dict) or any(isinstance(value, str) and "\x00" in value for value in record.values()):
+        return None
+    return record
+
+
+def iter_import_records(lines: Iterator[str], import_format: str) -> Iterator[dict[str, Any] | None]:
+    # None обозначает запись, которую не удалось разобрать
+    if import_format == "csv":
+        reader = csv.DictReader(lines)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                # Строка с ошибкой разбора (например, NUL) уже прочитана, чтение продолжается
+                yield None
+                continue
+            yield check_import_record({key: value for key, value in record.items() if key and value != ""})
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield check_import_record(record)
+
+
+def import_tasks(project_id: int, import_format: str, stream: AsyncIterator[bytes]) -> TaskImportOut:
+    result = TaskImportOut()
+    with Session(engine) as session:
+        project = cruds.project.get_one_by_id(
+            session=session,
+            id=project_id
+        )
+        if not project:
+            raise HTTPException(
+                status_code=404,
+                detail="Project not found"
+            )
+        rows = []
+        records = iter_import_records(iter_stream_lines(stream), import_format)
+        for index, record in enumerate(records):
+            try:
+                if record is None:
+                    raise ValueError("Invalid record")
+                rows.append(CreateTask.model_validate(record))
+            except (ValidationError, ValueError) as e:
+                result.rejected += 1
+                if len(result.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                    detail = e.errors(include_url=False, include_context=False) if isinstance(e, ValidationError) else str(e)
+                    result.errors.append(BulkItemError(index=index, detail=detail))
+                continue
+            if len(rows) >= settings.IMPORT_CHUNK_SIZE:
+                result.accepted += cruds.task.copy_rows(session=session, rows=rows, project_id=project_id)
+                rows = []
+        result.accepted += cruds.task.copy_rows(session=session, rows=rows, project_id=project_id)
+        session.commit()
+    return result
 
+
+@router.post("/{project_id}/tasks/import", response_model=TaskImportOut)
+async def import_project_tasks(
+        project_id: int,
+        request: Request,
+        response: Response,
+        import_format: Literal["ndjson", "csv"] | None = Query(None, alias="format"),
+):
+    """
+    Потоковая загрузка задач проекта из тела запроса в формате NDJSON или CSV через COPY.
+    Формат берется из параметра format или из заголовка Content-Type.
+
+    Args:
+        project_id: id проекта
+        request: запрос с телом в формате NDJSON или CSV
+        response: ответ, после загрузки клиент читает из основной БД
+        import_format: формат загрузки
+
+    Returns:
+        количество принятых и отклоненных строк и первые ошибки
+    """
+    # Сессия создается в потоке загрузки, а не через get_db, поэтому отметка ставится здесь
+    deps.mark_primary(request, response)
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = "csv" if content_type.startswith("text/csv") else "ndjson"
+    return await run_in_threadpool(import_tasks, project_id, import_format, request.stream())
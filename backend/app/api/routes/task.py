@@ -1,43 +1,182 @@
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, Literal
 
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, joinedload
+
+from app import cruds
+from app.api import conditional, deps, serializers
+from app.core.config import settings
+from app.cruds.filters import CompiledFilter
 from app.models import *
 from app.models.project import *
-from app import cruds
-from app.api import deps
-from app.models.task import CreateTask, TaskOut, UpdateTask
+from app.models.task import (
+    BulkDeleteOut,
+    BulkItemError,
+    BulkTasksOut,
+    BulkUpdateTask,
+    CreateTask,
+    TaskBatchOut,
+    TaskOut,
+    TaskSearchOut,
+    TaskWithProject,
+    UpdateTask,
+)
 from app.models.utils import Pagination
 
 router = APIRouter()
 
-@router.get("/", response_model=list[TaskOut])
+
+def check_bulk_size(items: list[Any]) -> None:
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items, max {settings.BULK_MAX_ITEMS}"
+        )
+
+
+def is_valid_id(id: int) -> bool:
+    # id задач - integer в Postgres, значение вне диапазона сорвало бы весь запрос
+    return deps.MIN_INT4 <= id <= deps.MAX_INT4
+
+
+def validate_bulk_items(
+        items: list[Any],
+        schema: type[SQLModel]
+) -> tuple[list[tuple[int, SQLModel]], list[BulkItemError]]:
+    """
+    Валидирует элементы массового запроса по отдельности
+
+    Returns:
+        пары (позиция, объект) для валидных элементов и ошибки для остальных
+    """
+    check_bulk_size(items)
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            errors.append(BulkItemError(
+                index=index,
+                detail=e.errors(include_url=False, include_context=False)
+            ))
+    return valid, errors
+
+@router.get("/", response_model=list[TaskWithProject] | list[TaskOut])
 def get_tasks_by_project_id(
         project_id: int,
-        session: Session = Depends(deps.get_db),
+        request: Request,
+        response: Response,
+        session: Session = Depends(deps.get_read_db),
         pagination: Pagination = Depends(deps.pagination),
-        task_filters: list | None = Depends(deps.get_task_filters)
+        list_filter: CompiledFilter = Depends(deps.get_list_filter(cruds.task.filter_spec)),
+        task_filters: list | None = Depends(deps.get_task_filters),
+        expand: Literal["project"] | None = Query(None, description="project - проект задачи"),
 ):
     """
     Получение списка задач для указанного проекта
 
     Args:
         project_id: id проекта
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag, Last-Modified и X-Next-Cursor
         session: сессия БД
         pagination: параметры пагинации
+        list_filter: фильтры и сортировка из параметров filter и sort
         task_filters: фильтры для задач
+        expand: связанные объекты, встраиваемые в ответ
 
     Returns:
         список объектов задач
     """
-    tasks = cruds.task.get_tasks_by_project_id_with_update(
-        project_id=project_id,
+    if not expand and conditional.is_conditional(request):
+        version = cruds.task.get_list_version(
+            session=session,
+            filters=[Task.project_id == project_id] + task_filters + list_filter.filters,
+            sort=list_filter.sort,
+            skip=pagination.skip,
+            limit=pagination.limit,
+            after=pagination.cursor
+        )
+        not_modified = conditional.set_validators(request, response, version)
+        if not_modified:
+            return not_modified
+    tasks = cruds.task.get_list_rows(
         session=session,
-        filters=task_filters,
+        schema=TaskOut,
+        filters=[Task.project_id == project_id] + task_filters + list_filter.filters,
+        sort=list_filter.sort,
         skip=pagination.skip,
-        limit=pagination.limit
+        limit=pagination.limit,
+        after=pagination.cursor
+    )
+    if len(tasks) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.task.get_cursor(tasks[-1], list_filter.sort)
+    if expand == "project":
+        # Все задачи страницы из одного проекта, он читается один раз
+        project = cruds.project.get_one_by_id(session=session, id=project_id)
+        return serializers.render(
+            serializers.task_project_list_adapter,
+            [TaskWithProject(**task._mapping, project=project.model_dump() if project else None) for task in tasks],
+            response
         )
-    return tasks
+    conditional.set_validators(request, response, cruds.task.get_version(tasks))
+    return serializers.render_rows(serializers.task_rows_adapter, tasks, response)
+
+
+@router.get("/search", response_model=list[TaskSearchOut])
+def search_tasks(
+        response: Response,
+        session: Session = Depends(deps.get_read_db),
+        q: str = Depends(deps.get_search_query),
+        pagination: Pagination = Depends(deps.pagination),
+):
+    """
+    Полнотекстовый поиск задач по названию, описанию и названию проекта,
+    результаты упорядочены по релевантности
+
+    Args:
+        response: ответ, в заголовок X-Next-Cursor пишется курсор следующей страницы
+        session: сессия БД
+        q: поисковый запрос
+        pagination: параметры пагинации, курсор - (rank, id) последней задачи
+
+    Returns:
+        список задач с релевантностью
+    """
+    tasks = cruds.task.search(
+        session=session,
+        q=q,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        after=pagination.cursor
+    )
+    if len(tasks) == pagination.limit:
+        response.headers["X-Next-Cursor"] = cruds.task.get_search_cursor(tasks[-1])
+    return serializers.render_rows(serializers.task_search_rows_adapter, tasks, response)
+
+
+@router.get("/batch", response_model=TaskBatchOut)
+def get_tasks_batch(
+        session: Session = Depends(deps.get_read_db),
+        ids: list[int] = Depends(deps.get_batch_ids),
+):
+    """
+    Получение задач по списку id одним запросом
+
+    Args:
+        session: сессия БД
+        ids: список id задач
+
+    Returns:
+        задачи в порядке запрошенных id и id, которых нет в БД
+    """
+    tasks = cruds.task.get_many_by_ids(session=session, list_ids=ids)
+    return TaskBatchOut(
+        items=[cruds.task.with_actual_status(task) for task in tasks],
+        missing=cruds.task.get_missing_ids(tasks, ids)
+    )
 
 
 @router.post("/", response_model=TaskOut)
@@ -57,7 +196,7 @@ def create_task(
     Returns:
         созданная задача
     """
-    
+
     project = cruds.project.get_one_by_id(session=session, id=project_id)
     if not project:
         raise HTTPException(
@@ -68,14 +207,111 @@ def create_task(
         session=session,
         obj_in=dict(project_id=project_id, **task_on_creation.dict())
     )
-    cruds.task.get_status_update(
+    return cruds.task.get_status_update(
         session=session,
-        obj_current=task,
-        internal_commit=False
+        obj_current=task
+    )
+
+
+@router.post("/bulk", response_model=BulkTasksOut)
+def create_tasks_bulk(
+        project_id: int,
+        items: list[dict[str, Any]] = Body(...),
+        session: Session = Depends(deps.get_db),
+):
+    """
+    Массовое создание задач проекта в одной транзакции
+
+    Args:
+        project_id: id проекта
+        items: список задач
+        session: сессия БД
+
+    Returns:
+        созданные задачи и ошибки валидации по позициям
+    """
+    valid, errors = validate_bulk_items(items, CreateTask)
+    project = cruds.project.get_one_by_id(session=session, id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=404,
+            detail="Project not found"
+        )
+    tasks = cruds.task.create_many(
+        session=session,
+        objs_in=[dict(project_id=project_id, **task.dict()) for _, task in valid]
+    )
+    cruds.task.mark_overdue(
+        session=session,
+        filters=[Task.id.in_([task.id for task in tasks])]
+    )
+    return BulkTasksOut(items=tasks, errors=errors)
+
+
+@router.patch("/bulk", response_model=BulkTasksOut)
+def update_tasks_bulk(
+        items: list[dict[str, Any]] = Body(...),
+        session: Session = Depends(deps.get_db),
+):
+    """
+    Массовое обновление задач в одной транзакции
+
+    Args:
+        items: список изменений, каждый элемент содержит id задачи
+        session: сессия БД
+
+    Returns:
+        обновленные задачи и ошибки по позициям
+    """
+    valid, errors = validate_bulk_items(items, BulkUpdateTask)
+    errors.extend(
+        BulkItemError(index=index, detail="Invalid id")
+        for index, task in valid if not is_valid_id(task.id)
+    )
+    valid = [(index, task) for index, task in valid if is_valid_id(task.id)]
+    # id обновленных задач в порядке элементов запроса
+    updated = cruds.task.update_many(
+        session=session,
+        objs_new=[task.dict(exclude_unset=True) for _, task in valid]
+    )
+    updated_ids = set(updated)
+    errors.extend(
+        BulkItemError(index=index, detail="Task not found")
+        for index, task in valid if task.id not in updated_ids
+    )
+    cruds.task.mark_overdue(
+        session=session,
+        filters=[Task.id.in_(updated_ids)]
+    )
+    tasks = cruds.task.get_many_by_ids(session=session, list_ids=updated)
+    return BulkTasksOut(items=tasks, errors=sorted(errors, key=lambda error: error.index))
+
+
+@router.delete("/bulk", response_model=BulkDeleteOut)
+def delete_tasks_bulk(
+        ids: list[int] = Body(...),
+        session: Session = Depends(deps.get_db),
+):
+    """
+    Массовое удаление задач в одной транзакции
+
+    Args:
+        ids: список id задач
+        session: сессия БД
+
+    Returns:
+        id удаленных задач и ошибки по позициям
+    """
+    check_bulk_size(ids)
+    deleted = cruds.task.remove_many(session=session, ids=[task_id for task_id in ids if is_valid_id(task_id)])
+    deleted_ids = set(deleted)
+    return BulkDeleteOut(
+        deleted=deleted,
+        errors=[
+            BulkItemError(index=index, detail="Task not found" if is_valid_id(task_id) else "Invalid id")
+            for index, task_id in enumerate(ids) if task_id not in deleted_ids
+        ]
     )
-    session.commit()
-    session.refresh(task)
-    return task
 
 
 @router.patch("/{task_id}", response_model=TaskOut)
@@ -95,58 +331,64 @@ def update_task(
     Returns:
         обновленная задача
     """
-    
-    task = cruds.task.get_one_by_id(session=session, id=task_id)
+    # Статус OVERDUE выставляется тем же UPDATE, если срок уже прошел
+    task = cruds.task.update_by_id(
+        session=session,
+        id=task_id,
+        obj_new=task_on_update
+    )
     if not task:
         raise HTTPException(
             status_code=404,
             detail="Task not found"
         )
-    cruds.task.update(
-        session=session,
-        obj_current=task,
-        obj_new=task_on_update
-    )
-    cruds.task.get_status_update(
-        session=session,
-        obj_current=task,
-        internal_commit=False
-    )
-    session.commit()
-    session.refresh(task)
     return task
 
 
-@router.get("/{task_id}", response_model=TaskOut)
+@router.get("/{task_id}", response_model=TaskOut | TaskWithProject)
 def get_task(
         task_id: int,
-        session: Session = Depends(deps.get_db),
+        request: Request,
+        response: Response,
+        session: Session = Depends(deps.get_read_db),
+        expand: Literal["project"] | None = Query(None, description="project - проект задачи"),
 ):
     """
     Получение существующей задачи
 
     Args:
         task_id: id задачи
+        request: запрос, проверяются заголовки If-None-Match и If-Modified-Since
+        response: ответ, в заголовки пишутся ETag и Last-Modified
         session: сессия БД
+        expand: связанные объекты, встраиваемые в ответ
 
     Returns:
         Объект задачи
     """
     task = cruds.task.get_one_by_id(
         session=session,
-        id=task_id
-    )
-    task = cruds.task.get_status_update(
-        session=session,
-        obj_current=task,
-        internal_commit=True
+        id=task_id,
+        options=[joinedload(Task.project)] if expand == "project" else None
     )
     if not task:
         raise HTTPException(
             status_code=404,
             detail="Task not found"
         )
-    return task
+    if expand == "project":
+        return serializers.render(
+            serializers.task_project_adapter,
+            TaskWithProject(
+                **cruds.task.with_actual_status(task).model_dump(),
+                project=task.project.model_dump() if task.project else None
+            ),
+            response
+        )
+    not_modified = conditional.set_validators(request, response, cruds.task.get_version([task]))
+    if not_modified:
+        return not_modified
+    return serializers.render(serializers.task_adapter, cruds.task.with_actual_status(task), response)
 
 
 @router.delete("/", response_model=dict)
@@ -161,17 +403,13 @@ def delete_task(
         task_id: id задачи
         session: сессия БД
     """
-    task = cruds.task.get_one_by_id(
+    deleted_id = cruds.task.remove_by_id(
         session=session,
         id=task_id
     )
-    if not task:
+    if deleted_id is None:
         raise HTTPException(
             status_code=404,
             detail="Task not found"
         )
-    cruds.task.delete(
-        session=session,
-        obj_current=task
-    )
     return {"detail": "Task deleted"}
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+
+from app.core.cache import cache
+
+router = APIRouter()
+
+@router.get("/cache-stats")
+def get_cache_stats() -> dict[str, int | str]:
+    """
+    Получение счетчиков кэша объектов
+
+    Returns:
+        dict: бэкенд кэша, число попаданий, промахов, вытеснений и инвалидаций
+    """
+    if cache is None:
+        return {"backend": "none"}
+    return {"backend": type(cache).__name__, **cache.get_stats()}
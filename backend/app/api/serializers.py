@@ -0,0 +1,75 @@
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from sqlmodel import SQLModel
+from typing_extensions import TypedDict
+
+from app.core.config import settings
+from app.models.project import ProjectOut, ProjectWithStats
+from app.models.task import ProjectWithTasks, TaskOut, TaskSearchOut, TaskWithProject
+
+
+def get_row_type(model: type[SQLModel]) -> type:
+    """
+    TypedDict с полями модели: строки из БД сериализуются по нему без валидации
+    """
+    return TypedDict(
+        f"{model.__name__}Row",
+        {name: field.annotation for name, field in model.model_fields.items()},
+    )
+
+
+# Адаптеры собираются один раз при импорте, а не на каждый ответ
+task_adapter = TypeAdapter(TaskOut)
+task_list_adapter = TypeAdapter(list[TaskOut])
+task_rows_adapter = TypeAdapter(list[get_row_type(TaskOut)])
+task_search_rows_adapter = TypeAdapter(list[get_row_type(TaskSearchOut)])
+project_adapter = TypeAdapter(ProjectOut)
+project_list_adapter = TypeAdapter(list[ProjectOut])
+project_rows_adapter = TypeAdapter(list[get_row_type(ProjectOut)])
+project_stats_list_adapter = TypeAdapter(list[ProjectWithStats])
+project_tasks_adapter = TypeAdapter(ProjectWithTasks)
+project_tasks_list_adapter = TypeAdapter(list[ProjectWithTasks])
+task_project_adapter = TypeAdapter(TaskWithProject)
+task_project_list_adapter = TypeAdapter(list[TaskWithProject])
+
+
+def json_response(content: bytes, response: Response | None = None) -> Response:
+    json = Response(content=content, media_type="application/json")
+    if response is not None:
+        # Заголовки, выставленные обработчиком (курсор, ETag), переносятся в итоговый ответ
+        json.headers.raw.extend(response.headers.raw)
+    return json
+
+
+def render(adapter: TypeAdapter, content: Any, response: Response | None = None) -> Any:
+    """
+    При включенном FAST_JSON валидирует ответ один раз по атрибутам объектов
+    и сериализует его в байты в pydantic-core, минуя response_model FastAPI
+
+    Args:
+        adapter: адаптер схемы ответа
+        content: ORM объекты или готовые схемы ответа
+        response: ответ эндпоинта, из него переносятся заголовки
+
+    Returns:
+        content без изменений или готовый JSON ответ
+    """
+    if not settings.FAST_JSON:
+        return content
+    return json_response(
+        adapter.dump_json(adapter.validate_python(content, from_attributes=True)),
+        response,
+    )
+
+
+def render_rows(adapter: TypeAdapter, rows: list[Row], response: Response | None = None) -> Any:
+    """
+    То же для строк, выбранных по колонкам: при FAST_JSON они сериализуются
+    напрямую в JSON без создания моделей
+    """
+    if not settings.FAST_JSON:
+        return rows
+    return json_response(adapter.dump_json([row._asdict() for row in rows]), response)
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.core.config import settings
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Вытеснение по размеру и истечению TTL
+    invalidations: int = 0
+
+
+class CacheBackend(ABC):
+    """
+    Кэш объектов по ключу. Значения - словари, сериализуемые в JSON.
+    """
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> dict[str, Any] | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: dict[str, Any], ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        ...
+
+    def get_stats(self) -> dict[str, int]:
+        return asdict(self.stats)
+
+
+class MemoryCache(CacheBackend):
+    """
+    LRU кэш с TTL внутри процесса
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return dict(value)
+
+    def set(self, key: str, value: dict[str, Any], ttl: int) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    self.stats.invalidations += 1
+
+
+class RedisCache(CacheBackend):
+    """
+    Кэш в Redis (или совместимом сервере). Клиент должен поддерживать get, set(ex=...) и delete,
+    поэтому в тестах его можно заменить локальной заглушкой.
+    """
+
+    def __init__(self, client: Any, prefix: str = "cache:") -> None:
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: dict[str, Any], ttl: int) -> None:
+        if ttl <= 0:
+            return
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.stats.invalidations += self.client.delete(*(self.prefix + key for key in keys))
+
+
+def get_cache() -> CacheBackend | None:
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES)
+    if settings.CACHE_BACKEND == "redis":
+        import redis  # Необязательная зависимость, нужна только для этого бэкенда
+
+        return RedisCache(redis.Redis.from_url(str(settings.REDIS_URL)))
+    return None
+
+
+cache = get_cache()
@@ -66,6 +66,66 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Настройки пула соединений, задаются на один воркер
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # -1 отключает пересоздание соединений
+    DB_POOL_PRE_PING: bool = True
+    # NullPool для работы за PgBouncer, пулом соединений управляет он
+    DB_USE_NULL_POOL: bool = False
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 - без ограничения
+    # Через сколько выполнений одного запроса psycopg готовит его на сервере (PREPARE),
+    # 0 отключает подготовку. С DB_USE_NULL_POOL (PgBouncer в режиме transaction)
+    # подготовка отключена всегда: подготовленный запрос живет в серверном соединении
+    DB_PREPARE_THRESHOLD: int = 2
+
+    # Реплики для чтения: DSN через запятую, пустой список - все запросы идут в основную БД
+    DB_REPLICA_URLS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = []
+    # После записи клиент читает из основной БД столько секунд (read-your-writes)
+    DB_REPLICA_STICKY_SECONDS: int = 5
+    # Реплика с большим отставанием не используется
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    # Как часто перепроверять отставание реплик
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 1.0
+    # Проверка отставания идет в пути запроса: недоступная реплика не должна держать его
+    # дольше этого времени на установке соединения
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS: int = 2
+
+    # Статистика запроса пишется в лог app.requests с уровнем WARNING, если запрос
+    # медленнее порога, иначе с уровнем DEBUG
+    SLOW_REQUEST_MS: int = 1000
+    # Сколько символов самого медленного SQL попадает в лог, 0 - не писать SQL
+    LOG_SLOWEST_SQL_LENGTH: int = 500
+
+    # Обслуживать основные эндпоинты асинхронными обработчиками
+    ASYNC_API: bool = False
+
+    # Сериализация ответов на чтение через готовые TypeAdapter, минуя response_model
+    FAST_JSON: bool = False
+
+    # Максимальное число задач каждого проекта в ответах с expand=tasks
+    EXPAND_TASKS_LIMIT: int = 20
+
+    # Кэш объектов для get_one_by_id/get_many_by_ids
+    CACHE_BACKEND: Literal["none", "memory", "redis"] = "none"
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 10000
+    REDIS_URL: str | None = None
+
+    # Максимальное число элементов в одном массовом запросе
+    BULK_MAX_ITEMS: int = 10000
+    # Размер пачки строк при потоковой выгрузке задач
+    EXPORT_CHUNK_SIZE: int = 1000
+    # Размер пачки строк для COPY при потоковой загрузке задач
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_MAX_REPORTED_ERRORS: int = 100
+
+    # Фоновый перевод просроченных задач в статус OVERDUE
+    OVERDUE_SWEEPER_IN_PROCESS: bool = False
+    OVERDUE_SWEEP_INTERVAL_SECONDS: int = 60
+    OVERDUE_SWEEP_BATCH_SIZE: int = 1000
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
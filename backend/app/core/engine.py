@@ -1,5 +1,67 @@
+from functools import cache
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 from sqlmodel import create_engine
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine, instrumented_pool
+
+
+def get_engine_options(poolclass: type[Pool] = QueuePool, connect_timeout: int | None = None) -> dict[str, Any]:
+    options: dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if settings.DB_USE_NULL_POOL:
+        options["poolclass"] = instrumented_pool(NullPool)
+    else:
+        options.update(
+            poolclass=instrumented_pool(poolclass),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    prepare = settings.DB_PREPARE_THRESHOLD > 0 and not settings.DB_USE_NULL_POOL
+    # None в psycopg отключает подготовку, 0 означало бы подготовку с первого выполнения
+    connect_args: dict[str, Any] = {"prepare_threshold": settings.DB_PREPARE_THRESHOLD if prepare else None}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    if connect_timeout:
+        connect_args["connect_timeout"] = connect_timeout
+    options["connect_args"] = connect_args
+    return options
+
+
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **get_engine_options())
+
+# Реплики для чтения: движок на каждый DSN, индексы совпадают с асинхронными
+replica_timeout = settings.DB_REPLICA_CONNECT_TIMEOUT_SECONDS
+replica_engines = [
+    create_engine(url, **get_engine_options(connect_timeout=replica_timeout)) for url in settings.DB_REPLICA_URLS
+]
+
+instrument_engine(engine)
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+
+
+# Асинхронные движки на psycopg async создаются при первом обращении:
+# без ASYNC_API асинхронные обработчики не подключены и пул не нужен
+@cache
+def get_async_engine() -> AsyncEngine:
+    async_engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI), **get_engine_options(AsyncAdaptedQueuePool)
+    )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+@cache
+def get_async_replica_engines() -> list[AsyncEngine]:
+    async_replica_engines = [
+        create_async_engine(url, **get_engine_options(AsyncAdaptedQueuePool, connect_timeout=replica_timeout))
+        for url in settings.DB_REPLICA_URLS
+    ]
+    for async_replica_engine in async_replica_engines:
+        instrument_engine(async_replica_engine.sync_engine)
+    return async_replica_engines
@@ -0,0 +1,168 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger("app.requests")
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_sql: str | None = None
+    commits: int = 0
+    pool_wait: float = 0.0
+
+    def add_statement(self, duration: float, statement: str) -> None:
+        self.statements += 1
+        self.db_time += duration
+        if duration >= self.slowest_time:
+            self.slowest_time = duration
+            # Обрезается только при записи в лог, здесь сохраняется ссылка без копирования
+            self.slowest_sql = statement
+
+    def get_headers(self) -> list[tuple[bytes, bytes]]:
+        values = {
+            "X-DB-Statements": str(self.statements),
+            "X-DB-Time-Ms": f"{self.db_time * 1e3:.2f}",
+            "X-DB-Slowest-Ms": f"{self.slowest_time * 1e3:.2f}",
+            "X-DB-Commits": str(self.commits),
+            "X-DB-Pool-Wait-Ms": f"{self.pool_wait * 1e3:.2f}",
+            "Server-Timing": f"db;dur={self.db_time * 1e3:.2f}, pool;dur={self.pool_wait * 1e3:.2f}",
+        }
+        return [(name.lower().encode(), value.encode()) for name, value in values.items()]
+
+
+# Статистика текущего запроса. Объект изменяемый, поэтому значения,
+# накопленные в пуле потоков и в гринлетах асинхронного драйвера, видны middleware
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, *_) -> None:
+    if request_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, *_) -> None:
+    stats = request_stats.get()
+    if stats is not None and conn.info.get("query_started"):
+        stats.add_statement(time.perf_counter() - conn.info["query_started"].pop(), statement)
+
+
+def _handle_error(context) -> None:
+    # Упавший запрос не доходит до after_cursor_execute, отметка времени снимается здесь
+    conn = context.connection
+    if request_stats.get() is not None and conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def _commit(_conn) -> None:
+    stats = request_stats.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Подписывает движок на события выполнения SQL и коммитов.
+    Для асинхронного движка передается его sync_engine
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(engine, "commit", _commit)
+
+
+def instrumented_pool(pool_class: type[Pool]) -> type[Pool]:
+    """
+    Подкласс пула, который замеряет ожидание соединения.
+    У пула нет события начала выдачи соединения, поэтому оборачивается _do_get
+    """
+
+    def _do_get(self):
+        stats = request_stats.get()
+        if stats is None:
+            return pool_class._do_get(self)
+        started = time.perf_counter()
+        try:
+            return pool_class._do_get(self)
+        finally:
+            stats.pool_wait += time.perf_counter() - started
+
+    return type(f"Instrumented{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+
+
+class InstrumentationMiddleware:
+    """
+    Собирает статистику SQL по запросу: пишет ее в метрики, в лог (медленные запросы -
+    WARNING, остальные - DEBUG), а вне production - в заголовки ответа.
+    Сделано на чистом ASGI, чтобы учитывать и потоковые ответы
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.ENVIRONMENT != "production":
+                    # Для потоковых ответов здесь учтены только запросы до начала тела
+                    message["headers"] = [*message.get("headers", []), *stats.get_headers()]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            self.record(scope, stats, status_code, time.perf_counter() - started)
+
+    @staticmethod
+    def record(scope: Scope, stats: RequestStats, status_code: int, duration: float) -> None:
+        method = scope["method"]
+        # Шаблон пути, а не сам путь, чтобы число серий метрик не росло с id
+        route = getattr(scope.get("route"), "path", "unmatched")
+
+        metrics.requests_total.inc(method, route, str(status_code))
+        metrics.request_duration.observe(duration, method, route)
+        metrics.db_statements.observe(stats.statements, method, route)
+        metrics.db_time.observe(stats.db_time, method, route)
+        metrics.db_pool_wait.observe(stats.pool_wait, method, route)
+
+        level = logging.WARNING if duration * 1e3 >= settings.SLOW_REQUEST_MS else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        log: dict[str, Any] = {
+            "method": method,
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(duration * 1e3, 2),
+            "db_statements": stats.statements,
+            "db_time_ms": round(stats.db_time * 1e3, 2),
+            "db_slowest_ms": round(stats.slowest_time * 1e3, 2),
+            "db_slowest_sql": stats.slowest_sql and stats.slowest_sql[:settings.LOG_SLOWEST_SQL_LENGTH] or None,
+            "db_commits": stats.commits,
+            "db_pool_wait_ms": round(stats.pool_wait * 1e3, 2),
+        }
+        logger.log(level, json.dumps(log, ensure_ascii=False))
@@ -0,0 +1,91 @@
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+
+# Отметка в session.info: сессия читает с реплики, ее объекты не попадают в кэш
+REPLICA_SESSION_KEY = "replica"
+
+# Cookie с моментом (unix time), до которого клиент читает из основной БД
+STICKY_COOKIE = "db_primary_until"
+
+# Отставание в секундах. Не реплика (основная БД в роли заглушки) отстает на 0,
+# реплика без новых WAL - тоже: время последней транзакции на ней не меняется
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+@dataclass
+class ReplicaState:
+    lag: float | None = None  # None - реплика недоступна
+    checked_at: float = 0.0
+
+
+class ReplicaRouter:
+    """
+    Выбирает реплику для чтения по кругу среди тех, чье отставание не больше max_lag.
+    Отставание кэшируется на check_interval секунд, чтобы не проверять его на каждый запрос
+    """
+
+    def __init__(self, engines: list[Engine], max_lag: float, check_interval: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.states = [ReplicaState() for _ in engines]
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def get_lag(self, engine: Engine) -> float | None:
+        try:
+            with engine.connect() as connection:
+                return float(connection.execute(LAG_QUERY).scalar_one())
+        except DBAPIError:
+            return None
+
+    def is_available(self, index: int) -> bool:
+        state = self.states[index]
+        now = time.monotonic()
+        if now - state.checked_at >= self.check_interval:
+            # Проверку выполняет один поток, остальные пользуются прошлым значением
+            if self._lock.acquire(blocking=False):
+                try:
+                    state.lag = self.get_lag(self.engines[index])
+                    state.checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return state.lag is not None and state.lag <= self.max_lag
+
+    def choose(self) -> int | None:
+        """
+        Returns:
+            индекс реплики или None, если подходящих нет и читать нужно из основной БД
+        """
+        if not self.engines:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self.is_available(index):
+                return index
+        return None
+
+
+def is_sticky(cookies: dict[str, str]) -> bool:
+    try:
+        return float(cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_sticky_until() -> int:
+    return int(time.time()) + settings.DB_REPLICA_STICKY_SECONDS
@@ -1,2 +1,4 @@
-from .project import project
-from .task import task
+from .project import async_project, project
+from .task import async_task, task
+
+__all__ = ["async_project", "async_task", "project", "task"]
@@ -0,0 +1,211 @@
+from datetime import datetime
+from typing import Any, Generic
+
+from fastapi import HTTPException
+from sqlalchemy import Row, exc
+from sqlmodel import SQLModel, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
+
+from app.core.cache import CacheBackend
+from app.cruds.base import (
+    CacheInvalidationMixin,
+    ModelType,
+    ReturningMixin,
+    RowsMixin,
+    SortKey,
+    StatementsMixin,
+    T,
+    VersionMixin,
+    get_list_query,
+    get_sort,
+)
+from app.models.utils import encode_cursor
+
+
+class AsyncCRUDBase(
+    CacheInvalidationMixin, VersionMixin, RowsMixin, ReturningMixin, StatementsMixin, Generic[ModelType]
+):
+    def __init__(self, model: type[ModelType], cache: CacheBackend | None = None):
+        """
+        Асинхронный вариант CRUDBase с тем же набором методов.
+        **Parameters**
+        * `model`: A SQLModel model class
+
+        Чтение идет мимо кэша, но методы записи инвалидируют затронутые ключи `cache`
+        после коммита, как и в CRUDBase: кэш общий с синхронными обработчиками.
+        """
+        self.model = model
+        self.cache = cache
+        self.init_statements()
+
+    async def get_one_by_id(
+        self,
+        *,
+        id: int | str,
+        session: AsyncSession,
+        filters: list[Any] | None = None,
+        options: list[Any] | None = None,
+    ) -> ModelType | None:
+        response = await session.execute(self.get_one_by_id_query(filters=filters, options=options), {"id": id})
+        return response.scalar_one_or_none()
+
+    async def get_many_by_ids(
+        self,
+        *,
+        list_ids: list[int | str],
+        filters: list[Any] | None = None,
+        session: AsyncSession,
+    ) -> list[ModelType] | None:
+        if not list_ids:
+            return []
+        response = await session.execute(self.get_many_by_ids_query(filters=filters), {"ids": list_ids})
+        return self.order_by_ids(response.scalars().all(), list_ids)
+
+    async def get_count(
+        self, *, session: AsyncSession
+    ) -> ModelType | None:
+        response = await session.execute(
+            select(func.count()).select_from(self.model)
+        )
+        return response.scalar_one()
+
+    async def get_list(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        query: T | Select[T] | None = None,
+        filters: list[Any] | None = None,
+        sort: list[SortKey] | None = None,  # Keys from FilterSpec.compile, default - by id
+        after: list[Any] | None = None,  # Keyset cursor (sort values, id)
+        session: AsyncSession,
+    ) -> list[ModelType]:
+        if query is None and sort is None and after is None:
+            query = self.list_query.where(*filters) if filters else self.list_query
+            response = await session.execute(query, {"skip": skip, "limit": limit})
+            return response.scalars().all()
+        query = get_list_query(
+            self.model,
+            skip=skip,
+            limit=limit,
+            query=query,
+            filters=filters,
+            sort=sort,
+            after=after,
+        )
+        response = await session.execute(query)
+        return response.scalars().all()
+
+    async def get_list_rows(self, *, session: AsyncSession, **params: Any) -> list[Row]:
+        response = await session.execute(self.get_list_rows_query(**params))
+        return response.all()
+
+    def get_cursor(self, obj: ModelType | Row, sort: list[SortKey] | None = None) -> str:
+        pk_name = self.model.__table__.primary_key.columns[0].name
+        return encode_cursor(
+            [getattr(obj, column.name) for column, _ in get_sort(self.model, sort)] + [getattr(obj, pk_name)]
+        )
+
+    async def get_list_version(
+        self, *, session: AsyncSession, **params: Any
+    ) -> tuple[datetime | None, int, int]:
+        response = await session.execute(self.get_list_version_query(**params))
+        return tuple(response.one())
+
+    async def flush(self, *, session: AsyncSession, internal_commit: bool = False) -> None:
+        if internal_commit:
+            await session.commit()
+        else:
+            await session.flush()
+
+    async def create(
+        self,
+        *,
+        obj_in: ModelType,
+        session: AsyncSession,
+        internal_commit: bool = False,
+    ) -> ModelType:
+        db_obj = self.model.model_validate(obj_in)  # type: ignore
+        try:
+            session.add(db_obj)
+            await self.flush(session=session)
+        except exc.IntegrityError as e:
+            await session.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"{e}",
+            )
+        # Инвалидация регистрируется до коммита, иначе хук after_commit ее не увидит
+        self.cache_invalidate([getattr(db_obj, self.pk.name)], session=session.sync_session)
+        await self.flush(session=session, internal_commit=internal_commit)
+        return db_obj
+
+    async def update(
+        self,
+        *,
+        obj_current: ModelType,
+        obj_new: dict[str, Any] | ModelType,
+        session: AsyncSession,
+        internal_commit: bool = False,
+    ) -> ModelType:
+        if isinstance(obj_new, dict):
+            update_data = obj_new
+        else:
+            update_data = obj_new.dict(exclude_unset=True)
+        for field in update_data:
+            setattr(obj_current, field, update_data[field])
+
+        session.add(obj_current)
+        self.cache_invalidate([getattr(obj_current, self.pk.name)], session=session.sync_session)
+        await self.flush(session=session, internal_commit=internal_commit)
+        # updated_at вычисляется в БД, а ленивая загрузка в асинхронном режиме невозможна
+        await session.refresh(obj_current)
+        return obj_current
+
+    async def remove(
+        self, *, id: int | str, session: AsyncSession, internal_commit: bool = False
+    ) -> ModelType:
+        response = await session.execute(self.one_by_id_query, {"id": id})
+        obj = response.scalar_one()
+        await session.delete(obj)
+        self.cache_invalidate([id], session=session.sync_session)
+        await self.flush(session=session, internal_commit=internal_commit)
+        return obj
+
+    async def update_by_id(
+        self,
+        *,
+        id: int | str,
+        obj_new: dict[str, Any] | SQLModel,
+        filters: list[Any] | None = None,
+        session: AsyncSession,
+    ) -> ModelType | None:
+        values = self.get_update_values(self.get_update_data(obj_new))
+        if not values:
+            return await self.get_one_by_id(id=id, filters=filters, session=session)
+        try:
+            response = await session.execute(
+                self.get_update_by_id_query(id=id, values=values, filters=filters)
+            )
+            row = response.one_or_none()
+        except exc.IntegrityError as e:
+            await session.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"{e}",
+            )
+        self.cache_invalidate([id], session=session.sync_session)
+        return None if row is None else self.model.model_validate(row._mapping)
+
+    async def remove_by_id(
+        self,
+        *,
+        id: int | str,
+        filters: list[Any] | None = None,
+        session: AsyncSession,
+    ) -> int | str | None:
+        response = await session.execute(self.get_remove_by_id_query(id=id, filters=filters))
+        deleted_id = response.scalar_one_or_none()
+        self.cache_invalidate([id], session=session.sync_session)
+        return deleted_id
@@ -1,67 +1,453 @@
+from datetime import datetime
 from typing import Any, Generic, TypeVar
 
 from fastapi import HTTPException
 from pydantic import BaseModel
-from sqlalchemy import exc
-from sqlmodel import Session, SQLModel, func, select
+from sqlalchemy import ARRAY, Column, Enum, Row, String, any_, bindparam, event, exc
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import (
+    Session,
+    SQLModel,
+    and_,
+    delete,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
 from sqlmodel.sql.expression import Select
+from sqlmodel.sql.sqltypes import AutoString
 
-from app.api.deps import get_db
+from app.core.cache import CacheBackend
+from app.core.config import settings
+from app.core.replica import REPLICA_SESSION_KEY
+from app.models.utils import encode_cursor
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
 T = TypeVar("T", bound=SQLModel)
+SortKey = tuple[Column, bool]  # (колонка, по убыванию)
+# Ключи кэша, измененные в транзакции сессии: удаляются из кэша только после коммита,
+# иначе параллельный запрос успеет закэшировать еще не измененную строку
+CACHE_INVALIDATE_KEY = "cache_invalidate"
 
 
-class CRUDBase(Generic[ModelType]):
-    def __init__(self, model: type[ModelType]):
+def get_pending_invalidations(session: Session) -> dict[CacheBackend, set[str]]:
+    return session.info.setdefault(CACHE_INVALIDATE_KEY, {})
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_after_commit(session: Session) -> None:
+    for cache, keys in session.info.pop(CACHE_INVALIDATE_KEY, {}).items():
+        cache.delete(*keys)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def drop_invalidations(session: Session, transaction: Any) -> None:
+    # Внешняя транзакция завершена без коммита - в БД ничего не изменилось
+    if transaction.parent is None:
+        session.info.pop(CACHE_INVALIDATE_KEY, None)
+
+
+def coerce_cursor_value(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, Enum) and column.type.enum_class:
+        return column.type.enum_class(value)
+    if isinstance(column.type, (String, AutoString)):  # AutoString из sqlmodel не задает python_type
+        return str(value)
+    if column.type.python_type is datetime:
+        return datetime.fromisoformat(value)
+    return column.type.python_type(value)
+
+
+def get_sort(model: type[SQLModel], sort: list[SortKey] | None) -> list[SortKey]:
+    return list(sort) if sort else [(model.__table__.primary_key.columns[0], False)]
+
+
+def get_sort_keys(model: type[SQLModel], sort: list[SortKey] | None) -> list[SortKey]:
+    """
+    Ключи сортировки с замыкающим первичным ключом, чтобы страницы были стабильными.
+    Направление первичного ключа совпадает с направлением последнего ключа
+    """
+    pk = model.__table__.primary_key.columns[0]
+    sort = get_sort(model, sort)
+    if any(column is pk for column, _ in sort):
+        return sort
+    return [*sort, (pk, sort[-1][1])]
+
+
+def get_keyset_filter(model: type[SQLModel], sort: list[SortKey] | None, after: list[Any]) -> Any:
+    """
+    Условие "строго после курсора". Курсор - значения ключей сортировки и первичного ключа
+    последней строки, NULL значения при сортировке идут последними.
+    """
+    sort = get_sort(model, sort)
+    if len(after) != len(sort) + 1:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    keys = get_sort_keys(model, sort)
+    # Если первичный ключ уже среди ключей сортировки, его отдельное значение не нужно
+    after = after if len(keys) > len(sort) else after[:-1]
+    try:
+        values = [coerce_cursor_value(column, value) for (column, _), value in zip(keys, after, strict=True)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(keys) == 1:
+        (column, descending), = keys
+        return column < values[0] if descending else column > values[0]
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1 and all(
+        value is not None and not column.nullable for (column, _), value in zip(keys, values, strict=True)
+    ):
+        # Сравнение кортежей обслуживается составным индексом по тем же колонкам
+        descending = directions.pop()
+        columns = tuple_(*(column for column, _ in keys))
+        bound = tuple_(*(literal(value, column.type) for (column, _), value in zip(keys, values, strict=True)))
+        return columns < bound if descending else columns > bound
+    # (k1 после v1) или (k1 = v1 и остальные ключи после своих значений)
+    condition = None
+    for (column, descending), value in reversed(list(zip(keys, values, strict=True))):
+        if value is None:
+            # После NULL идут только NULL этой колонки
+            value_after, value_equal = false(), column.is_(None)
+        else:
+            value_after = column < value if descending else column > value
+            if column.nullable:
+                value_after = or_(value_after, column.is_(None))
+            value_equal = column == value
+        condition = value_after if condition is None else or_(value_after, and_(value_equal, condition))
+    return condition
+
+
+def get_order_by(keys: list[SortKey]) -> list[Any]:
+    # NULLS LAST только для nullable колонок: иначе обратный обход индекса не подходит
+    return [
+        (column.desc() if descending else column.asc()).nulls_last() if column.nullable
+        else column.desc() if descending else column.asc()
+        for column, descending in keys
+    ]
+
+
+def get_list_query(
+    model: type[ModelType],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    query: T | Select[T] | None = None,
+    filters: list[Any] | None = None,
+    sort: list[SortKey] | None = None,  # Ключи из FilterSpec.compile
+    after: list[Any] | None = None,
+) -> Select:
+    if query is None:
+        query = select(model).limit(limit)
+        if after is None:
+            query = query.offset(skip)
+    if filters:
+        query = query.filter(*filters)
+    if after is not None:
+        query = query.filter(get_keyset_filter(model, sort, after))
+    return query.order_by(*get_order_by(get_sort_keys(model, sort)))
+
+
+class VersionMixin:
+    """
+    Версия данных для ETag и Last-Modified: (максимальное время изменения, количество, сумма id)
+    """
+
+    def get_last_modified_column(self) -> Any:
+        return self.model.updated_at
+
+    def get_last_modified(self, obj: ModelType) -> datetime | None:
+        return obj.updated_at
+
+    def get_version(self, objs: list[ModelType]) -> tuple[datetime | None, int, int]:
+        pk_name = self.model.__table__.primary_key.columns[0].name
+        last_modified = [value for value in map(self.get_last_modified, objs) if value is not None]
+        return (
+            max(last_modified, default=None),
+            len(objs),
+            sum(getattr(obj, pk_name) for obj in objs),
+        )
+
+    def get_list_version_query(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        filters: list[Any] | None = None,
+        sort: list[SortKey] | None = None,
+        after: list[Any] | None = None,
+    ) -> Select:
+        """
+        Агрегат, дающий ту же версию, что и get_version для страницы get_list,
+        без загрузки самих строк
+        """
+        pk = self.model.__table__.primary_key.columns[0]
+        query = select(pk, self.get_last_modified_column().label("last_modified")).limit(limit)
+        if after is None:
+            query = query.offset(skip)
+        page = get_list_query(
+            self.model,
+            query=query,
+            filters=filters,
+            sort=sort,
+            after=after,
+        ).subquery()
+        return select(
+            func.max(page.c.last_modified),
+            func.count(),
+            func.coalesce(func.sum(page.c[pk.name]), 0),
+        )
+
+
+class RowsMixin:
+    """
+    Списки только для чтения: выбираются колонки схемы ответа, а не сущности целиком.
+    Строки результата неизменяемы и не попадают в identity map сессии.
+    """
+
+    def get_row_columns(self, schema: type[SQLModel]) -> list[Any]:
+        return [self.model.__table__.c[name] for name in schema.model_fields]
+
+    def get_list_rows_query(
+        self,
+        *,
+        schema: type[SQLModel],
+        skip: int = 0,
+        limit: int = 100,
+        filters: list[Any] | None = None,
+        sort: list[SortKey] | None = None,
+        after: list[Any] | None = None,
+    ) -> Select:
+        query = select(*self.get_row_columns(schema)).limit(limit)
+        if after is None:
+            query = query.offset(skip)
+        return get_list_query(
+            self.model,
+            query=query,
+            filters=filters,
+            sort=sort,
+            after=after,
+        )
+
+
+class ReturningMixin:
+    """
+    Запись по первичному ключу одним оператором с RETURNING, без предварительного чтения объекта
+    """
+
+    def get_update_data(self, obj_new: dict[str, Any] | SQLModel) -> dict[str, Any]:
+        if isinstance(obj_new, dict):
+            return obj_new
+        return obj_new.model_dump(exclude_unset=True)
+
+    def get_update_values(self, update_data: dict[str, Any]) -> dict[str, Any]:
+        # Значения для SET, наследники могут добавить вычисляемые в БД поля
+        return update_data
+
+    def get_update_by_id_query(
+        self,
+        *,
+        id: int | str,
+        values: dict[str, Any],
+        filters: list[Any] | None = None,
+    ) -> Any:
+        pk = self.model.__table__.primary_key.columns[0]
+        return (
+            update(self.model)
+            .where(pk == id, *(filters or []))
+            .values(values)
+            .returning(*self.model.__mapper__.columns)  # Без колонок, не отображенных в модель
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_remove_by_id_query(self, *, id: int | str, filters: list[Any] | None = None) -> Any:
+        pk = self.model.__table__.primary_key.columns[0]
+        return (
+            delete(self.model)
+            .where(pk == id, *(filters or []))
+            .returning(pk)
+            .execution_options(synchronize_session=False)
+        )
+
+
+class StatementsMixin:
+    """
+    Заготовленные запросы горячих методов: выражение строится один раз на модель,
+    значения передаются параметрами при выполнении. Форма запроса не меняется между вызовами,
+    поэтому ключ кэша компиляции и текст SQL совпадают, и psycopg может подготовить
+    его на сервере (DB_PREPARE_THRESHOLD)
+    """
+
+    def init_statements(self) -> None:
+        self.pk = self.model.__table__.primary_key.columns[0]
+        self.one_by_id_query = select(self.model).where(self.pk == bindparam("id"))
+        # Один параметр-массив вместо параметра на каждый id: текст запроса не зависит от длины
+        # списка и не упирается в ограничение числа параметров
+        self.many_by_ids_query = select(self.model).where(
+            self.pk == any_(bindparam("ids", type_=ARRAY(self.pk.type)))
+        )
+        self.list_query = (
+            select(self.model).order_by(self.pk).limit(bindparam("limit")).offset(bindparam("skip"))
+        )
+
+    def get_one_by_id_query(self, *, filters: list[Any] | None = None, options: list[Any] | None = None) -> Select:
+        query = self.one_by_id_query
+        if filters:
+            query = query.where(*filters)
+        if options:
+            query = query.options(*options)
+        return query
+
+    def get_many_by_ids_query(self, *, filters: list[Any] | None = None) -> Select:
+        return self.many_by_ids_query.where(*filters) if filters else self.many_by_ids_query
+
+    def order_by_ids(self, objs: list[Any], list_ids: list[int | str]) -> list[Any]:
+        """
+        Объекты в порядке списка id, повторы id не дублируют объекты
+        """
+        by_id = {getattr(obj, self.pk.name): obj for obj in objs}
+        return [by_id[id] for id in dict.fromkeys(list_ids) if id in by_id]
+
+    def get_missing_ids(self, objs: list[Any], list_ids: list[int | str]) -> list[int | str]:
+        found = {getattr(obj, self.pk.name) for obj in objs}
+        return [id for id in dict.fromkeys(list_ids) if id not in found]
+
+
+class CacheInvalidationMixin:
+    """
+    Ключи кэша объектов модели и их инвалидация после коммита транзакции
+    """
+
+    cache: CacheBackend | None = None
+
+    def get_cache_key(self, id: int | str) -> str:
+        return f"{self.model.__tablename__}:{id}"
+
+    def cache_invalidate(self, ids: list[int | str], session: Session) -> None:
+        """
+        Ключи удаляются из кэша после коммита транзакции сессии, при откате - забываются
+        """
+        if self.cache and ids:
+            get_pending_invalidations(session).setdefault(self.cache, set()).update(
+                self.get_cache_key(id) for id in ids
+            )
+
+
+class CRUDBase(
+    CacheInvalidationMixin, VersionMixin, RowsMixin, ReturningMixin, StatementsMixin, Generic[ModelType]
+):
+    def __init__(self, model: type[ModelType], cache: CacheBackend | None = None):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
         **Parameters**
         * `model`: A SQLModel model class
         * `schema`: A Pydantic model (schema) class
+
+        Объект не хранит сессию: она передается в каждый метод явно.
+        Методы записи не коммитят, если не передан internal_commit=True.
+        Если передан `cache`, get_one_by_id/get_many_by_ids без фильтров читают через кэш,
+        а методы записи инвалидируют затронутые ключи.
         """
         self.model = model
-        self.session = next(get_db())
+        self.cache = cache
+        self.init_statements()
+
+    def get_cache_ttl(self, obj: ModelType) -> int:
+        return settings.CACHE_TTL_SECONDS
+
+    def is_pending_invalidation(self, key: str, session: Session) -> bool:
+        return key in session.info.get(CACHE_INVALIDATE_KEY, {}).get(self.cache, ())
+
+    def cache_set(self, obj: ModelType, session: Session) -> None:
+        # Данные реплики могут отставать, в кэш попадает только прочитанное из основной БД
+        if session.info.get(REPLICA_SESSION_KEY):
+            return
+        key = self.get_cache_key(getattr(obj, self.pk.name))
+        # Незакоммиченные изменения своей транзакции в кэш не попадают
+        if self.is_pending_invalidation(key, session):
+            return
+        self.cache.set(key, obj.model_dump(mode="json"), self.get_cache_ttl(obj))
+
+    def cache_get(self, id: int | str, session: Session) -> ModelType | None:
+        key = self.get_cache_key(id)
+        if self.is_pending_invalidation(key, session):
+            return None
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        # Объект из кэша подключается к сессии как загруженный из БД, без запроса
+        obj = self.model.model_validate(data)
+        make_transient_to_detached(obj)
+        return session.merge(obj, load=False)
+
+    def flush(self, *, session: Session, internal_commit: bool = False) -> None:
+        """
+        Изменения отправляются в БД, транзакцию завершает владелец сессии
+        (для запросов API - зависимость get_db). internal_commit=True - коммит сразу,
+        для кода, который сам управляет сессией вне единицы работы
+        """
+        if internal_commit:
+            session.commit()
+        else:
+            session.flush()
 
     def get_one_by_id(
         self,
         *,
         id: int | str,
-        session: Session | None = None,
+        session: Session,
         filters: list[Any] | None = None,
+        options: list[Any] | None = None,  # Опции загрузки связей, например joinedload
     ) -> ModelType | None:
-        session = session or self.session
-        if filters:
-            query = select(self.model).filter(self.model.__table__.primary_key.columns[0] == id, *filters)
-        else:
-            query = select(self.model).where(self.model.__table__.primary_key.columns[0] == id)
-        response = session.execute(query)
-        return response.scalar_one_or_none()
+        if self.cache and not filters and not options:
+            obj = self.cache_get(id, session)
+            if obj is not None:
+                return obj
+        response = session.execute(self.get_one_by_id_query(filters=filters, options=options), {"id": id})
+        obj = response.scalar_one_or_none()
+        if self.cache and not filters and obj is not None:
+            self.cache_set(obj, session)
+        return obj
 
     def get_many_by_ids(
         self,
         *,
         list_ids: list[int | str],
         filters: list[Any] | None = None,
-        session: Session | None = None,
+        session: Session,
     ) -> list[ModelType] | None:
-        session = session or self.session
-        if filters:
-            query = select(self.model).filter(self.model.__table__.primary_key.columns[0].in_(list_ids), *filters)
-        else:
-            query = select(self.model).where(self.model.__table__.primary_key.columns[0].in_(list_ids))
-        response = session.execute(
-            query
-        )
-        return response.scalars().all()
+        """
+        Объекты по списку id в порядке этого списка, отсутствующие id пропускаются
+        (см. get_missing_ids)
+        """
+        requested_ids = list_ids
+        cached = []
+        if self.cache and not filters:
+            for id in dict.fromkeys(list_ids):
+                obj = self.cache_get(id, session)
+                if obj is not None:
+                    cached.append(obj)
+            cached_ids = {getattr(obj, self.pk.name) for obj in cached}
+            list_ids = [id for id in list_ids if id not in cached_ids]
+        if not list_ids:
+            return self.order_by_ids(cached, requested_ids)
+        response = session.execute(self.get_many_by_ids_query(filters=filters), {"ids": list_ids})
+        objs = response.scalars().all()
+        if self.cache and not filters:
+            for obj in objs:
+                self.cache_set(obj, session)
+        return self.order_by_ids(cached + objs, requested_ids)
 
     def get_count(
-        self, session: Session | None = None
+        self, *, session: Session
     ) -> ModelType | None:
-        session = session or self.session
         response = session.execute(
-            select(func.count()).select_from(select(self.model).subquery())
+            select(func.count()).select_from(self.model)
         )
         return response.scalar_one()
 
@@ -72,48 +458,63 @@ class CRUDBase(Generic[ModelType]):
         limit: int = 100,
         query: T | Select[T] | None = None,
         filters: list[Any] | None = None,
-        order: str | None = None,  # asc or desc
-        order_by: tuple | None = None,  # Field name
-        session: Session | None = None,
+        sort: list[SortKey] | None = None,  # Keys from FilterSpec.compile, default - by id
+        after: list[Any] | None = None,  # Keyset cursor (sort values, id)
+        session: Session,
     ) -> list[ModelType]:
-        session = session or self.session
-        if query is None:
-            query = select(self.model).offset(skip).limit(limit)
-        if filters:
-            query = query.filter(*filters)
-        if order_by:
-            columns = self.model.__table__.columns
-            if order == 'asc':
-                query = query.order_by(columns[order_by].asc())
-            else:
-                query = query.order_by(columns[order_by].desc())
+        if query is None and sort is None and after is None:
+            query = self.list_query.where(*filters) if filters else self.list_query
+            return session.execute(query, {"skip": skip, "limit": limit}).scalars().all()
+        query = get_list_query(
+            self.model,
+            skip=skip,
+            limit=limit,
+            query=query,
+            filters=filters,
+            sort=sort,
+            after=after,
+        )
         response = session.execute(query)
         return response.scalars().all()
 
+    def get_list_rows(self, *, session: Session, **params: Any) -> list[Row]:
+        return session.execute(self.get_list_rows_query(**params)).all()
+
+    def get_cursor(self, obj: ModelType | Row, sort: list[SortKey] | None = None) -> str:
+        pk_name = self.model.__table__.primary_key.columns[0].name
+        return encode_cursor(
+            [getattr(obj, column.name) for column, _ in get_sort(self.model, sort)] + [getattr(obj, pk_name)]
+        )
+
+    def get_list_version(self, *, session: Session, **params: Any) -> tuple[datetime | None, int, int]:
+        return tuple(session.execute(self.get_list_version_query(**params)).one())
 
     def create(
         self,
         *,
         obj_in: ModelType,
         created_by_id: int | str | None = None,
-        session: Session | None = None,
+        session: Session,
+        internal_commit: bool = False,
     ) -> ModelType:
-        db_session = session or self.session
         db_obj = self.model.model_validate(obj_in)  # type: ignore
 
         if created_by_id:
             db_obj.created_by_id = created_by_id
 
         try:
-            db_session.add(db_obj)
-            db_session.commit()
+            session.add(db_obj)
+            # Значения по умолчанию из БД возвращаются тем же INSERT ... RETURNING
+            self.flush(session=session)
         except exc.IntegrityError as e:
-            db_session.rollback()
+            session.rollback()
             raise HTTPException(
                 status_code=409,
                 detail=f"{e}",
             )
-        db_session.refresh(db_obj)
+        # Инвалидация регистрируется до коммита, иначе хук after_commit ее не увидит
+        self.cache_invalidate([getattr(db_obj, self.pk.name)], session=session)
+        self.flush(session=session, internal_commit=internal_commit)
         return db_obj
 
     def update(
@@ -121,10 +522,9 @@ class CRUDBase(Generic[ModelType]):
         *,
         obj_current: ModelType,
         obj_new: dict[str, Any] | ModelType,
-        session: Session | None = None,
+        session: Session,
+        internal_commit: bool = False,
     ) -> ModelType:
-        db_session = session or self.session
-
         if isinstance(obj_new, dict):
             update_data = obj_new
         else:
@@ -134,19 +534,150 @@ class CRUDBase(Generic[ModelType]):
         for field in update_data:
             setattr(obj_current, field, update_data[field])
 
-        db_session.add(obj_current)
-        db_session.commit()
-        db_session.refresh(obj_current)
+        session.add(obj_current)
+        self.cache_invalidate([getattr(obj_current, self.pk.name)], session=session)
+        self.flush(session=session, internal_commit=internal_commit)
         return obj_current
 
     def remove(
-        self, *, id: int | str, session: Session | None = None
+        self, *, id: int | str, session: Session, internal_commit: bool = False
     ) -> ModelType:
-        db_session = session or self.session
-        response = db_session.execute(
-            select(self.model).where(self.model.__table__.primary_key.columns[0] == id)
-        )
+        response = session.execute(self.one_by_id_query, {"id": id})
         obj = response.scalar_one()
-        db_session.delete(obj)
-        db_session.commit()
+        session.delete(obj)
+        self.cache_invalidate([id], session=session)
+        self.flush(session=session, internal_commit=internal_commit)
         return obj
+
+    def update_by_id(
+        self,
+        *,
+        id: int | str,
+        obj_new: dict[str, Any] | SQLModel,
+        filters: list[Any] | None = None,
+        session: Session,
+    ) -> ModelType | None:
+        """
+        Обновление по первичному ключу одним UPDATE ... RETURNING (без коммита).
+        Возвращается новый объект вне сессии: после коммита он не перечитывается.
+
+        Returns:
+            обновленный объект или None, если объекта с таким id нет
+        """
+        values = self.get_update_values(self.get_update_data(obj_new))
+        if not values:
+            return self.get_one_by_id(id=id, filters=filters, session=session)
+        try:
+            response = session.execute(
+                self.get_update_by_id_query(id=id, values=values, filters=filters)
+            )
+            row = response.one_or_none()
+        except exc.IntegrityError as e:
+            session.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"{e}",
+            )
+        self.cache_invalidate([id], session=session)
+        return None if row is None else self.model.model_validate(row._mapping)
+
+    def remove_by_id(
+        self,
+        *,
+        id: int | str,
+        filters: list[Any] | None = None,
+        session: Session,
+    ) -> int | str | None:
+        """
+        Удаление по первичному ключу одним DELETE ... RETURNING (без коммита)
+
+        Returns:
+            id удаленного объекта или None, если объекта с таким id нет
+        """
+        response = session.execute(self.get_remove_by_id_query(id=id, filters=filters))
+        deleted_id = response.scalar_one_or_none()
+        self.cache_invalidate([id], session=session)
+        return deleted_id
+
+    def create_many(
+        self,
+        *,
+        objs_in: list[dict[str, Any] | ModelType],
+        session: Session,
+    ) -> list[ModelType]:
+        """
+        Массовое создание объектов одним INSERT ... RETURNING (без коммита).
+        Поля, не переданные явно, получают значения по умолчанию на стороне БД.
+        """
+        if not objs_in:
+            return []
+        rows = [
+            self.model.model_validate(obj_in).model_dump(exclude_unset=True)  # type: ignore
+            for obj_in in objs_in
+        ]
+        try:
+            # Порядок RETURNING совпадает с порядком строк: вызывающий код сопоставляет их по позиции
+            response = session.scalars(insert(self.model).returning(self.model, sort_by_parameter_order=True), rows)
+            objs = response.all()
+        except exc.IntegrityError as e:
+            session.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"{e}",
+            )
+        self.cache_invalidate([getattr(obj, self.pk.name) for obj in objs], session=session)
+        return objs
+
+    def update_many(
+        self,
+        *,
+        objs_new: list[dict[str, Any]],
+        session: Session,
+    ) -> list[int | str]:
+        """
+        Массовое обновление по первичному ключу через executemany (без коммита).
+        Каждый словарь должен содержать первичный ключ.
+
+        Returns:
+            id обновленных объектов; отсутствующие в БД id пропускаются
+        """
+        pk = self.model.__table__.primary_key.columns[0]
+        ids = [obj_new[pk.name] for obj_new in objs_new]
+        if not ids:
+            return []
+        existing = set(session.scalars(select(pk).where(pk.in_(ids))).all())
+        values = [obj_new for obj_new in objs_new if obj_new[pk.name] in existing]
+        if values:
+            try:
+                session.execute(update(self.model), values)
+            except exc.IntegrityError as e:
+                session.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"{e}",
+                )
+        updated_ids = [obj_new[pk.name] for obj_new in values]
+        self.cache_invalidate(updated_ids, session=session)
+        return updated_ids
+
+    def remove_many(
+        self, *, ids: list[int | str], session: Session
+    ) -> list[int | str]:
+        """
+        Массовое удаление одним DELETE ... RETURNING (без коммита).
+
+        Returns:
+            id удаленных объектов
+        """
+        if not ids:
+            return []
+        pk = self.model.__table__.primary_key.columns[0]
+        response = session.execute(
+            delete(self.model)
+            .where(pk.in_(ids))
+            .returning(pk)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_ids = response.scalars().all()
+        self.cache_invalidate(deleted_ids, session=session)
+        return deleted_ids
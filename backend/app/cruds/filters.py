@@ -0,0 +1,143 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Column
+from sqlmodel import SQLModel
+
+from app.cruds.base import SortKey, coerce_cursor_value
+
+# Операторы и их SQL выражения. Значение всегда передается параметром, поэтому запросы
+# одной формы (поля, операторы, количество условий) дают один и тот же ключ кэша компиляции
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "in": lambda column, values: column.in_(values),  # Расширяемый параметр, длина списка не важна
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    # Шаблон собирается здесь, а не в SQL: LIKE с константным префиксом использует индекс
+    # с varchar_pattern_ops
+    "prefix": lambda column, value: column.like(escape_like(value) + "%", escape="/"),
+}
+COMPARISON = frozenset({"eq", "in", "gt", "gte", "lt", "lte"})
+
+
+def escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    operator: str
+    value: Any  # Для in - кортеж значений
+
+
+@dataclass(frozen=True)
+class ListFilter:
+    """
+    Разобранные и проверенные условия и сортировка запроса списка
+    """
+    conditions: tuple[Condition, ...] = ()
+    sort: tuple[tuple[str, bool], ...] = ()  # (поле, по убыванию)
+
+
+@dataclass(frozen=True)
+class CompiledFilter:
+    """
+    Условия WHERE и ключи сортировки для get_list_rows и get_list_version
+    """
+    filters: list[Any]
+    sort: list[SortKey]
+
+
+class FilterSpec:
+    """
+    Декларативное описание фильтров и сортировок списка модели.
+    Разрешены только перечисленные поля и операторы - те, что обслуживаются индексами.
+
+    Синтаксис запроса:
+        filter=status:in:todo,in_progress&filter=due_date:gte:2026-01-01T00:00:00+00:00
+        sort=-due_date,id  (минус - по убыванию)
+    """
+
+    def __init__(
+        self,
+        model: type[SQLModel],
+        filters: dict[str, frozenset[str]],
+        sortable: frozenset[str] = frozenset(),
+        max_conditions: int = 10,
+        max_sort: int = 3,
+        # Построители условий (оператор, значение) для полей, которые сравниваются не с колонкой
+        conditions: dict[str, Callable[[str, Any], Any]] | None = None,
+    ):
+        columns = model.__table__.columns
+        self.columns: dict[str, Column] = {name: columns[name] for name in {*filters, *sortable}}
+        self.conditions = conditions or {}
+        self.filters = filters
+        self.sortable = sortable
+        self.max_conditions = max_conditions
+        self.max_sort = max_sort
+        unknown = {operator for operators in filters.values() for operator in operators} - OPERATORS.keys()
+        if unknown:
+            raise ValueError(f"Unknown operators: {', '.join(sorted(unknown))}")
+
+    def parse_value(self, field: str, value: str) -> Any:
+        try:
+            return coerce_cursor_value(self.columns[field], value)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid value for {field}: {value!r}")
+
+    def parse_condition(self, expression: str) -> Condition:
+        field, _, rest = expression.partition(":")
+        operator, separator, value = rest.partition(":")
+        if not separator:
+            raise ValueError(f"Invalid filter {expression!r}, expected field:operator:value")
+        if field not in self.filters:
+            raise ValueError(f"Filtering by {field!r} is not allowed")
+        if operator not in self.filters[field]:
+            raise ValueError(f"Operator {operator!r} is not allowed for {field!r}")
+        if operator == "in":
+            return Condition(field, operator, tuple(self.parse_value(field, item) for item in value.split(",")))
+        if operator == "prefix":
+            if not value:
+                raise ValueError(f"Empty prefix for {field!r}")
+            return Condition(field, operator, value)
+        return Condition(field, operator, self.parse_value(field, value))
+
+    def parse_sort(self, sort: str) -> tuple[tuple[str, bool], ...]:
+        keys = []
+        for item in sort.split(","):
+            field = item.removeprefix("-")
+            if field not in self.sortable:
+                raise ValueError(f"Sorting by {field!r} is not allowed")
+            if any(field == name for name, _ in keys):
+                raise ValueError(f"Duplicate sort field {field!r}")
+            keys.append((field, item.startswith("-")))
+        if len(keys) > self.max_sort:
+            raise ValueError(f"Too many sort fields, at most {self.max_sort}")
+        return tuple(keys)
+
+    def parse(self, filters: list[str], sort: str | None = None) -> ListFilter:
+        """
+        Raises:
+            ValueError: поле или оператор не разрешены, значение не приводится к типу колонки
+        """
+        if len(filters) > self.max_conditions:
+            raise ValueError(f"Too many filters, at most {self.max_conditions}")
+        return ListFilter(
+            conditions=tuple(self.parse_condition(expression) for expression in filters),
+            sort=self.parse_sort(sort) if sort else (),
+        )
+
+    def compile_condition(self, condition: Condition) -> Any:
+        if condition.field in self.conditions:
+            return self.conditions[condition.field](condition.operator, condition.value)
+        return OPERATORS[condition.operator](self.columns[condition.field], condition.value)
+
+    def compile(self, list_filter: ListFilter) -> CompiledFilter:
+        return CompiledFilter(
+            filters=[self.compile_condition(condition) for condition in list_filter.conditions],
+            sort=[(self.columns[field], descending) for field, descending in list_filter.sort],
+        )
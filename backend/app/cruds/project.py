@@ -1,8 +1,194 @@
-from app.cruds.base import CRUDBase
-from app.models.project import Project
+from typing import Any
 
+from sqlalchemy import Row
+from sqlmodel import Session, delete, func, insert, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
 
-class CRUDProject(CRUDBase[Project]):
-    pass
+from app import cruds
+from app.core.cache import cache
+from app.cruds.async_base import AsyncCRUDBase
+from app.cruds.base import CRUDBase, SortKey, get_order_by, get_sort_keys
+from app.cruds.filters import COMPARISON, FilterSpec
+from app.models.project import (
+    Project,
+    ProjectOut,
+    ProjectTaskStats,
+    ProjectWithStats,
+    TaskStats,
+)
+from app.models.task import Task
+from app.models.utils import TaskStatus
 
-project = CRUDProject(Project)
+project_filter_spec = FilterSpec(
+    Project,
+    filters={
+        "id": COMPARISON,
+        "name": frozenset({"eq", "prefix"}),
+    },
+    sortable=frozenset({"id"}),
+)
+
+
+class ProjectStatsMixin:
+    def get_task_stats_query(self, status: Any = Task.status) -> Select:
+        """
+        Счетчики задач по статусам, посчитанные агрегатом по таблице task
+        """
+        return (
+            select(
+                Task.project_id,
+                *(func.count().filter(status == value).label(value.value) for value in TaskStatus),
+                func.count().label("total"),
+            )
+            .where(Task.project_id.is_not(None))
+            .group_by(Task.project_id)
+        )
+
+    def get_list_with_stats_query(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        filters: list[Any] | None = None,
+        sort: list[SortKey] | None = None,
+        after: list[Any] | None = None,
+    ) -> Select:
+        """
+        Страница проектов со счетчиками задач по статусам одним запросом.
+        Счетчики читаются из project_task_stats, а задачи с наступившим сроком,
+        еще не переведенные в OVERDUE, переносятся в overdue по частичному индексу.
+        """
+        page = self.get_list_rows_query(
+            schema=ProjectOut, skip=skip, limit=limit, filters=filters, sort=sort, after=after
+        ).cte("page")
+        pending = (
+            self.get_task_stats_query()
+            .where(*cruds.task.get_overdue_filters(), Task.project_id.in_(select(page.c.id)))
+            .subquery("pending")
+        )
+        stored = {
+            name: func.coalesce(getattr(ProjectTaskStats, name), 0)
+            for name in TaskStats.model_fields
+        }
+        moved = {
+            name: func.coalesce(pending.c[name], 0)
+            for name in TaskStats.model_fields
+        }
+        counters = {
+            name: stored[name] - moved[name] for name in TaskStats.model_fields
+        }
+        counters["overdue"] = stored["overdue"] + moved["total"]
+        counters["total"] = stored["total"]
+        return (
+            select(page, *(value.label(name) for name, value in counters.items()))
+            .outerjoin(ProjectTaskStats, ProjectTaskStats.project_id == page.c.id)
+            .outerjoin(pending, pending.c.project_id == page.c.id)
+            .order_by(*get_order_by([
+                (page.c[column.name], descending) for column, descending in get_sort_keys(Project, sort)
+            ]))
+        )
+
+    def get_stats_from_rows(self, rows: list[Row]) -> list[ProjectWithStats]:
+        return [
+            ProjectWithStats.model_validate({**row._mapping, "stats": row._mapping})
+            for row in rows
+        ]
+
+
+class ProjectTasksCacheMixin:
+    """
+    Удаление проекта обнуляет project_id его задач внешним ключом (ON DELETE SET NULL),
+    поэтому задачи проекта удаляются из кэша вместе с ним
+    """
+
+    def get_task_ids_query(self, project_ids: list[int]) -> Select:
+        return select(Task.id).where(Task.project_id.in_(project_ids))
+
+    def get_remove_by_id_with_task_ids_query(self, *, id: int, filters: list[Any] | None = None) -> Any:
+        # Задачи проекта возвращаются тем же DELETE: RETURNING вычисляется до того,
+        # как внешний ключ обнулит их project_id
+        task_ids = select(func.array_agg(Task.id)).where(Task.project_id == Project.id).scalar_subquery()
+        return self.get_remove_by_id_query(id=id, filters=filters).returning(task_ids)
+
+
+class CRUDProject(ProjectTasksCacheMixin, ProjectStatsMixin, CRUDBase[Project]):
+    filter_spec = project_filter_spec
+
+    def invalidate_task_cache(self, *, project_ids: list[int], session: Session) -> None:
+        # Вызывается до DELETE, пока задачи еще ссылаются на проекты
+        if cruds.task.cache and project_ids:
+            task_ids = session.scalars(self.get_task_ids_query(project_ids)).all()
+            cruds.task.cache_invalidate(task_ids, session=session)
+
+    def remove(self, *, id: int, session: Session, internal_commit: bool = False) -> Project:
+        self.invalidate_task_cache(project_ids=[id], session=session)
+        return super().remove(id=id, session=session, internal_commit=internal_commit)
+
+    def remove_by_id(self, *, id: int, filters: list[Any] | None = None, session: Session) -> int | None:
+        if not cruds.task.cache:
+            return super().remove_by_id(id=id, filters=filters, session=session)
+        response = session.execute(self.get_remove_by_id_with_task_ids_query(id=id, filters=filters))
+        row = response.one_or_none()
+        self.cache_invalidate([id], session=session)
+        if row is None:
+            return None
+        cruds.task.cache_invalidate(row[1] or [], session=session)
+        return row[0]
+
+    def remove_many(self, *, ids: list[int], session: Session) -> list[int]:
+        self.invalidate_task_cache(project_ids=ids, session=session)
+        return super().remove_many(ids=ids, session=session)
+
+    def get_list_with_stats(self, *, session: Session, **params: Any) -> list[ProjectWithStats]:
+        response = session.execute(self.get_list_with_stats_query(**params))
+        return self.get_stats_from_rows(response.all())
+
+    def rebuild_task_stats(self, *, session: Session) -> int:
+        """
+        Пересчитывает project_task_stats с нуля в текущей транзакции (без коммита).
+        Запись в task на время пересчета блокируется.
+
+        Returns:
+            количество проектов с задачами
+        """
+        session.execute(text("LOCK TABLE task IN SHARE MODE"))
+        session.execute(delete(ProjectTaskStats))
+        stats = self.get_task_stats_query()
+        response = session.execute(
+            insert(ProjectTaskStats)
+            .from_select(["project_id", *(value.value for value in TaskStatus), "total"], stats)
+            .returning(ProjectTaskStats.project_id)
+        )
+        return len(response.all())
+
+
+class AsyncCRUDProject(ProjectTasksCacheMixin, ProjectStatsMixin, AsyncCRUDBase[Project]):
+    filter_spec = project_filter_spec
+
+    async def remove(self, *, id: int, session: AsyncSession, internal_commit: bool = False) -> Project:
+        if cruds.async_task.cache:
+            task_ids = (await session.scalars(self.get_task_ids_query([id]))).all()
+            cruds.async_task.cache_invalidate(task_ids, session=session.sync_session)
+        return await super().remove(id=id, session=session, internal_commit=internal_commit)
+
+    async def remove_by_id(
+        self, *, id: int, filters: list[Any] | None = None, session: AsyncSession
+    ) -> int | None:
+        if not cruds.async_task.cache:
+            return await super().remove_by_id(id=id, filters=filters, session=session)
+        response = await session.execute(self.get_remove_by_id_with_task_ids_query(id=id, filters=filters))
+        row = response.one_or_none()
+        self.cache_invalidate([id], session=session.sync_session)
+        if row is None:
+            return None
+        cruds.async_task.cache_invalidate(row[1] or [], session=session.sync_session)
+        return row[0]
+
+    async def get_list_with_stats(self, *, session: AsyncSession, **params: Any) -> list[ProjectWithStats]:
+        response = await session.execute(self.get_list_with_stats_query(**params))
+        return self.get_stats_from_rows(response.all())
+
+
+project = CRUDProject(Project, cache=cache)
+async_project = AsyncCRUDProject(Project, cache=cache)
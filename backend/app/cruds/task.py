@@ -1,52 +1,436 @@
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Double, Row
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlmodel import (
+    Session,
+    SQLModel,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.cruds.async_base import AsyncCRUDBase
 from app.cruds.base import CRUDBase
-from app.models.task import Task
-from sqlmodel import Session
-from datetime import datetime
+from app.cruds.filters import COMPARISON, FilterSpec
 from app.models import TaskStatus
-from app import cruds
+from app.models.project import Project
+from app.models.task import CreateTask, Task, TaskOut, TaskSearchOut
+from app.models.utils import SEARCH_CONFIG, encode_cursor
+
+
+def as_utc(value: datetime) -> datetime:
+    # Дата без часового пояса считается UTC, как и при записи в колонку timestamptz
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class OverdueMixin:
+    def get_overdue_filters(self) -> list:
+        # Условие просрочки, вычисляемое на стороне БД
+        # Статус подставляется в запрос литералом, чтобы планировщик мог
+        # использовать частичный индекс ix_task_due_date_id_not_overdue
+        return [
+            Task.due_date < func.now(),
+            Task.status != literal(TaskStatus.OVERDUE, Task.__table__.c.status.type, literal_execute=True),
+        ]
+
+    def get_actual_status_expression(self):
+        # Статус с учетом просрочки, вычисляемый в запросе без записи в БД
+        return case(
+            (and_(*self.get_overdue_filters()), literal(TaskStatus.OVERDUE, Task.__table__.c.status.type)),
+            else_=Task.status,
+        )
+
+    def get_actual_status_column(self):
+        return self.get_actual_status_expression().label("status")
+
+    def get_actual_status_condition(self, statuses: Iterable[TaskStatus]):
+        """
+        Условие "статус с учетом просрочки входит в statuses". Записано через колонки
+        без CASE, чтобы условие на status использовало индекс ix_task_project_id_status_due_date:
+            OVERDUE - status = OVERDUE или срок прошел
+            другой статус X - status = X и срок не прошел
+        """
+        statuses = set(statuses)
+        conditions = []
+        pending = sorted(statuses - {TaskStatus.OVERDUE})
+        if pending:
+            conditions.append(and_(
+                Task.status.in_(pending),
+                or_(Task.due_date.is_(None), Task.due_date >= func.now()),
+            ))
+        if TaskStatus.OVERDUE in statuses:
+            overdue = literal(TaskStatus.OVERDUE, Task.__table__.c.status.type, literal_execute=True)
+            conditions.append(or_(Task.status == overdue, Task.due_date < func.now()))
+        return or_(*conditions)
+
+    def is_overdue(self, obj: Task | TaskOut) -> bool:
+        return bool(
+            obj.due_date
+            and obj.status != TaskStatus.OVERDUE
+            and as_utc(obj.due_date) < datetime.now(timezone.utc)
+        )
+
+    def get_last_modified_column(self):
+        # Наступивший due_date считается моментом изменения: ответ меняется при переходе
+        # в OVERDUE, даже если строка в БД еще не обновлена
+        return func.greatest(
+            Task.updated_at,
+            case((Task.due_date < func.now(), Task.due_date)),
+        )
+
+    def get_last_modified(self, obj: Task | Row) -> datetime | None:
+        if obj.due_date and obj.due_date < datetime.now(timezone.utc):
+            return max(obj.updated_at, obj.due_date)
+        return obj.updated_at
+
+    def get_update_values(self, update_data: dict) -> dict:
+        # Правило просрочки выполняется в том же UPDATE. Справа в SET колонки дают старые
+        # значения строки, поэтому новые due_date и status берутся из самого обновления
+        columns = Task.__table__.c
+        due_date = literal(update_data["due_date"], columns.due_date.type) if "due_date" in update_data else Task.due_date
+        # Параметры приводятся к enum явно, иначе CASE из двух параметров получает тип text
+        status = cast(update_data["status"], columns.status.type) if "status" in update_data else Task.status
+        overdue = cast(TaskStatus.OVERDUE, columns.status.type)
+        return {
+            **update_data,
+            "status": case((and_(due_date < func.now(), status != overdue), overdue), else_=status),
+        }
+
+    def get_row_columns(self, schema: type[SQLModel]) -> list:
+        return [
+            self.get_actual_status_column() if name == "status" else Task.__table__.c[name]
+            for name in schema.model_fields
+        ]
+
+    def with_actual_status(self, obj: Task) -> TaskOut:
+        """
+        Возвращает представление задачи со статусом OVERDUE, если срок уже прошел,
+        не изменяя саму задачу в БД
+        """
+        task_out = TaskOut.model_validate(obj)
+        if self.is_overdue(task_out):
+            task_out.status = TaskStatus.OVERDUE
+        return task_out
+
+
+def get_status_filter_condition(operator: str, value: Any):
+    return OverdueMixin().get_actual_status_condition(value if operator == "in" else [value])
+
+
+# Фильтры и сортировки списка задач проекта. Поля покрыты индексами, начинающимися
+# с project_id. status сравнивается с учетом просрочки, как он отдается в ответе;
+# сортировки по нему нет: курсор строился бы по вычисляемому значению
+task_filter_spec = FilterSpec(
+    Task,
+    filters={
+        "id": COMPARISON,
+        "status": frozenset({"eq", "in"}),
+        "due_date": COMPARISON,
+        "title": frozenset({"eq", "prefix"}),
+    },
+    sortable=frozenset({"id", "due_date"}),
+    conditions={"status": get_status_filter_condition},
+)
+
+
+class ProjectTasksMixin:
+    def get_first_by_project_ids_query(self, project_ids: list[int], limit: int) -> Select:
+        """
+        Первые limit задач каждого проекта по id одним запросом:
+        LATERAL подзапрос с LIMIT на проект читает индекс (project_id, id) и не сканирует
+        остальные задачи, как это сделал бы selectinload без ограничения на родителя
+        """
+        tasks = (
+            select(Task.project_id.label("parent_id"), *self.get_row_columns(TaskOut))
+            .where(Task.project_id == Project.id)
+            .order_by(Task.id)
+            .limit(limit)
+            .lateral("tasks")
+        )
+        return (
+            select(tasks)
+            .select_from(Project)
+            .join(tasks, true())
+            .where(Project.id.in_(project_ids))
+        )
+
+    def group_by_project(self, rows: list[Row]) -> dict[int, list[TaskOut]]:
+        tasks = defaultdict(list)
+        for row in rows:
+            tasks[row.parent_id].append(TaskOut.model_validate(row))
+        return tasks
+
+
+class SearchMixin:
+    def get_search_query(
+        self,
+        q: str,
+        project_id: int | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after: list | None = None,
+    ) -> Select:
+        """
+        Поиск задач по словам из title и description, без project_id - также по названию проекта.
+        Совпадения отбираются по GIN индексам search_vector, упорядочиваются по убыванию
+        релевантности и id, курсор after - (rank, id) последней строки предыдущей страницы.
+        Страница выбирается по id и релевантности, колонки задач читаются только для нее
+        """
+        query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), q)
+        task_vector = Task.__table__.c.search_vector
+        project_vector = Project.__table__.c.search_vector
+        task_matches = select(Task.id, func.ts_rank(task_vector, query).label("rank")).where(
+            task_vector.op("@@")(query)
+        )
+        if project_id is None:
+            # Объединение вместо OR: каждая ветка читает свой индекс
+            matches = union_all(
+                task_matches,
+                select(Task.id, func.ts_rank(project_vector, query).label("rank"))
+                .join(Project, Task.project_id == Project.id)
+                .where(project_vector.op("@@")(query)),
+            ).subquery("matches")
+        else:
+            matches = task_matches.where(Task.project_id == project_id).subquery("matches")
+        # double precision: значение из курсора сравнивается с rank без потери точности
+        ranked = (
+            select(matches.c.id, cast(func.sum(matches.c.rank), Double).label("rank"))
+            .group_by(matches.c.id)
+            .subquery("ranked")
+        )
+        page = select(ranked).order_by(ranked.c.rank.desc(), ranked.c.id.desc()).limit(limit)
+        if after is None:
+            page = page.offset(skip)
+        else:
+            try:
+                last_rank, last_id = float(after[0]), int(after[1])
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            page = page.where(
+                tuple_(ranked.c.rank, ranked.c.id) < tuple_(literal(last_rank, Double), literal(last_id))
+            )
+        page = page.subquery("page")
+        return (
+            select(*self.get_row_columns(TaskOut), page.c.rank)
+            .select_from(Task)
+            .join(page, Task.id == page.c.id)
+            .order_by(page.c.rank.desc(), Task.id.desc())
+        )
+
+    def get_search_cursor(self, row: Row | TaskSearchOut) -> str:
+        return encode_cursor([row.rank, row.id])
+
+
+class CRUDTask(OverdueMixin, ProjectTasksMixin, SearchMixin, CRUDBase[Task]):
+    filter_spec = task_filter_spec
 
+    def get_cache_ttl(self, obj: Task) -> int:
+        """
+        Задача хранится в кэше не дольше, чем до наступления due_date,
+        чтобы после него статус перечитывался из БД
+        """
+        ttl = super().get_cache_ttl(obj)
+        if obj.due_date is None or obj.status == TaskStatus.OVERDUE:
+            return ttl
+        seconds_left = int((as_utc(obj.due_date) - datetime.now(timezone.utc)).total_seconds())
+        return max(0, min(ttl, seconds_left))
+
+    def search(self, session: Session, q: str, **params) -> list[Row]:
+        """
+        Строки с полями TaskSearchOut, см. get_search_query
+        """
+        return session.execute(self.get_search_query(q, **params)).all()
 
-class CRUDTask(CRUDBase[Task]):
-    def get_tasks_by_project_id(self, session, project_id):
-        return session.query(Task).filter(Task.project_id == project_id).all()
-    
     def get_status_update(
             self,
             session: Session,
             obj_current: Task,
             internal_commit=False  # Указываем, нужен ли коммит внутри транзакции
     ):
-        if obj_current.due_date and obj_current.due_date.timestamp() < datetime.now().timestamp():
-            obj_current = cruds.task.update(
+        if self.is_overdue(obj_current):
+            obj_current = self.update(
                 session=session,
                 obj_current=obj_current,
-                obj_new=dict(status=TaskStatus.OVERDUE),
+                obj_new={"status": TaskStatus.OVERDUE},
+                internal_commit=internal_commit,
             )
-            if internal_commit:
-                session.commit()
         return obj_current
 
-    def get_tasks_by_project_id_with_update(
-            self, 
-            session: Session, 
-            project_id: int, 
+    def mark_overdue(
+            self,
+            session: Session,
             filters: list | None = None,
-            skip: int = 0,
-            limit: int = 100
-        ):
-        tasks = cruds.task.get_list(
-            session=session,
-            filters=[Task.project_id == project_id] + (filters or []),
-            skip=skip,
-            limit=limit
-        )
-        if not tasks:
-           return [] 
-        updated_tasks = [
-            cruds.task.get_status_update(session, task, internal_commit=False) for task in tasks
-        ]
-        session.commit()
-        return updated_tasks
+    ) -> list[int]:
+        """
+        Переводит все просроченные задачи, подходящие под фильтры, в статус OVERDUE
+        одним запросом UPDATE ... RETURNING
+
+        Args:
+            session: сессия БД
+            filters: дополнительные фильтры для задач
+
+        Returns:
+            список id обновленных задач
+        """
+        query = (
+            update(Task)
+            .where(*self.get_overdue_filters(), *(filters or []))
+            .values(status=TaskStatus.OVERDUE)
+            .returning(Task.id)
+            .execution_options(synchronize_session="fetch")
+        )
+        response = session.execute(query)
+        updated_ids = response.scalars().all()
+        self.cache_invalidate(updated_ids, session=session)
+        return updated_ids
+
+    def mark_overdue_batch(
+            self,
+            session: Session,
+            after: tuple[datetime, int] | None = None,
+            limit: int = 1000,
+    ) -> list[tuple[datetime, int]]:
+        """
+        Переводит в статус OVERDUE очередную пачку просроченных задач,
+        упорядоченных по (due_date, id) начиная с курсора after
+
+        Args:
+            session: сессия БД
+            after: курсор (due_date, id) последней обработанной задачи
+            limit: размер пачки
+
+        Returns:
+            список (due_date, id) обновленных задач
+        """
+        batch = (
+            select(Task.id)
+            .where(*self.get_overdue_filters())
+            .order_by(Task.due_date, Task.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if after:
+            batch = batch.where(tuple_(Task.due_date, Task.id) > tuple_(*after))
+        query = (
+            update(Task)
+            .where(Task.id.in_(batch.scalar_subquery()))
+            .values(status=TaskStatus.OVERDUE)
+            .returning(Task.due_date, Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        response = session.execute(query)
+        updated = sorted(tuple(row) for row in response.all())
+        self.cache_invalidate([id for _, id in updated], session=session)
+        return updated
+
+    def stream_by_project_id(
+            self,
+            session: Session,
+            project_id: int,
+            chunk_size: int = 1000,
+    ) -> Iterator[list[Row]]:
+        """
+        Потоково выбирает задачи проекта через серверный курсор пачками по chunk_size строк.
+        Строки содержат поля TaskOut, статус вычисляется с учетом просрочки.
+        """
+        query = (
+            select(*self.get_row_columns(TaskOut))
+            .where(Task.project_id == project_id)
+            .order_by(Task.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        yield from session.execute(query).partitions()
+
+    def get_first_by_project_ids(
+            self,
+            session: Session,
+            project_ids: list[int],
+            limit: int = settings.EXPAND_TASKS_LIMIT,
+    ) -> dict[int, list[TaskOut]]:
+        """
+        Первые limit задач каждого из проектов, сгруппированные по id проекта
+        """
+        if not project_ids:
+            return {}
+        response = session.execute(self.get_first_by_project_ids_query(project_ids, limit))
+        return self.group_by_project(response.all())
+
+    def copy_rows(
+            self,
+            session: Session,
+            rows: list[CreateTask],
+            project_id: int,
+    ) -> int:
+        """
+        Загружает задачи проекта через COPY FROM STDIN в текущей транзакции сессии (без коммита).
+        Задачи с прошедшим сроком загружаются сразу со статусом OVERDUE, время без зоны считается UTC
+
+        Returns:
+            количество загруженных строк
+        """
+        now = datetime.now(timezone.utc)
+        connection = session.connection().connection.driver_connection
+        with connection.cursor() as cursor:
+            with cursor.copy(
+                "COPY task (project_id, title, description, status, due_date) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    due_date = row.due_date and as_utc(row.due_date)
+                    status = TaskStatus.OVERDUE if due_date and due_date < now else row.status
+                    copy.write_row(
+                        (project_id, row.title, row.description, status.name, due_date)
+                    )
+        return len(rows)
+
+
+class AsyncCRUDTask(OverdueMixin, ProjectTasksMixin, SearchMixin, AsyncCRUDBase[Task]):
+    filter_spec = task_filter_spec
+
+    async def get_status_update(
+            self,
+            session: AsyncSession,
+            obj_current: Task,
+    ):
+        if self.is_overdue(obj_current):
+            obj_current = await self.update(
+                session=session,
+                obj_current=obj_current,
+                obj_new={"status": TaskStatus.OVERDUE},
+            )
+        return obj_current
+
+    async def get_first_by_project_ids(
+            self,
+            session: AsyncSession,
+            project_ids: list[int],
+            limit: int = settings.EXPAND_TASKS_LIMIT,
+    ) -> dict[int, list[TaskOut]]:
+        if not project_ids:
+            return {}
+        response = await session.execute(self.get_first_by_project_ids_query(project_ids, limit))
+        return self.group_by_project(response.all())
+
+    async def search(self, session: AsyncSession, q: str, **params) -> list[Row]:
+        response = await session.execute(self.get_search_query(q, **params))
+        return response.all()
 
 
-task = CRUDTask(Task)
+task = CRUDTask(Task, cache=cache)
+async_task = AsyncCRUDTask(Task, cache=cache)
@@ -1,10 +1,18 @@
+import logging
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
-from app.api.main import api_router
+from app.api.main import get_api_router
 from app.core.config import settings
+from app.core.engine import engine
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core.metrics import registry
+from app.overdue_sweeper import OverdueSweeperThread
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,22 +22,56 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    generate_unique_id_function=custom_generate_unique_id,
-)
-
-# Set all CORS enabled origins
-if settings.BACKEND_CORS_ORIGINS:
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=[
-            str(origin).strip("/") for origin in settings.BACKEND_CORS_ORIGINS
-        ],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Логирование настраивается при запуске сервера, а не при импорте модуля,
+    # чтобы не менять конфигурацию логов у тестов и скриптов, импортирующих приложение
+    logging.basicConfig(level=logging.INFO)
+    sweeper = None
+    if settings.OVERDUE_SWEEPER_IN_PROCESS:
+        sweeper = OverdueSweeperThread(engine)
+        sweeper.start()
+    yield
+    if sweeper:
+        sweeper.stop()
+
+
+def get_metrics() -> PlainTextResponse:
+    """
+    Метрики запросов в текстовом формате Prometheus
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def create_app(async_api: bool = settings.ASYNC_API) -> FastAPI:
+    """
+    Приложение с синхронными или асинхронными (async_api) обработчиками основных эндпоинтов
+    """
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        generate_unique_id_function=custom_generate_unique_id,
+        lifespan=lifespan,
     )
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
+    # Set all CORS enabled origins
+    if settings.BACKEND_CORS_ORIGINS:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=[
+                str(origin).strip("/") for origin in settings.BACKEND_CORS_ORIGINS
+            ],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+    app.add_middleware(InstrumentationMiddleware)
+
+    app.include_router(get_api_router(async_api), prefix=settings.API_V1_STR)
+    app.add_api_route("/metrics", get_metrics, tags=["metrics"], include_in_schema=False)
+    return app
+
+
+app = create_app()
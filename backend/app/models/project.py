@@ -1,12 +1,27 @@
 
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, Relationship
 
 from .base import ProjectBase, SQLModel
+from .utils import get_search_vector_expression
 
 
 class Project(ProjectBase, table=True):
+    __table_args__ = (
+        # Поиск задач по названию проекта, вес ниже, чем у полей самой задачи
+        Column("search_vector", TSVECTOR, Computed(get_search_vector_expression(("name", "C")), persisted=True)),
+        Index("ix_project_search_vector", "search_vector", postgresql_using="gin"),
+        # Фильтры name по равенству и префиксу
+        Index("ix_project_name", "name", postgresql_ops={"name": "varchar_pattern_ops"}),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: int | None = Field(default=None, primary_key=True)
-    tasks: list["Task"] | None = Relationship(back_populates="project")
+    # Задачи отвязываются внешним ключом в БД, ORM не загружает их при удалении проекта
+    tasks: list["Task"] | None = Relationship(
+        back_populates="project", sa_relationship_kwargs={"passive_deletes": True}
+    )
 
 
 class ProjectOut(ProjectBase):
@@ -23,3 +38,25 @@ class CreateProject(SQLModel):
     name: str = Field(..., max_length=64)
 
 
+
+
+class TaskStats(SQLModel):
+    todo: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    overdue: int = 0
+    total: int = 0
+
+
+class ProjectWithStats(ProjectOut):
+    stats: TaskStats
+
+
+class ProjectTaskStats(TaskStats, table=True):
+    """
+    Счетчики задач проекта по сохраненному статусу.
+    Поддерживаются триггерами на таблице task (см. миграцию added_project_task_stats)
+    """
+    __tablename__ = "project_task_stats"
+
+    project_id: int = Field(foreign_key="project.id", primary_key=True, ondelete="CASCADE")
@@ -1,15 +1,43 @@
 from datetime import datetime
+from typing import Any
 
+from sqlalchemy import Column, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import DateTime, Field, Relationship, SQLModel
 
 from app.models import *
 from app.models.base import TaskBase
-from app.models.utils import TaskStatus
+from app.models.project import ProjectOut
+from app.models.utils import TaskStatus, get_search_vector_expression
 
 
 class Task(TaskBase, table=True):
+    __table_args__ = (
+        # Списки задач проекта с фильтрами по статусу и сроку
+        Index("ix_task_project_id_status_due_date", "project_id", "status", "due_date"),
+        # Списки задач проекта с сортировкой и курсором по id
+        Index("ix_task_project_id_id", "project_id", "id"),
+        # Поиск еще не просроченных задач по сроку для перевода в OVERDUE
+        Index(
+            "ix_task_due_date_id_not_overdue",
+            "due_date",
+            "id",
+            postgresql_where=text("status <> 'OVERDUE' AND due_date IS NOT NULL"),
+        ),
+        # Фильтры title по равенству и префиксу (LIKE 'abc%') в списках задач проекта
+        Index("ix_task_project_id_title", "project_id", "title", postgresql_ops={"title": "varchar_pattern_ops"}),
+        # Полнотекстовый поиск: колонка вычисляется БД и не отображается в модель
+        Column(
+            "search_vector",
+            TSVECTOR,
+            Computed(get_search_vector_expression(("title", "A"), ("description", "B")), persisted=True),
+        ),
+        Index("ix_task_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: int | None = Field(default=None, primary_key=True)
-    project_id: int | None = Field(foreign_key="project.id")
+    project_id: int | None = Field(foreign_key="project.id", ondelete="SET NULL")
     project: Project = Relationship(back_populates="tasks")
 
 
@@ -35,3 +63,45 @@ class UpdateTask(SQLModel):
         sa_type=DateTime(timezone=True)
     )
     status: TaskStatus = Field(...)
+
+
+class BulkUpdateTask(UpdateTask):
+    id: int
+
+
+class BulkItemError(SQLModel):
+    index: int  # Позиция элемента в запросе
+    detail: Any
+
+
+class BulkTasksOut(SQLModel):
+    items: list[TaskOut] = []
+    errors: list[BulkItemError] = []
+
+
+class TaskBatchOut(SQLModel):
+    items: list[TaskOut] = []  # В порядке запрошенных id
+    missing: list[int] = []
+
+
+class BulkDeleteOut(SQLModel):
+    deleted: list[int] = []
+    errors: list[BulkItemError] = []
+
+
+class TaskImportOut(SQLModel):
+    accepted: int = 0
+    rejected: int = 0
+    errors: list[BulkItemError] = []  # Первые IMPORT_MAX_REPORTED_ERRORS ошибок
+
+
+class TaskSearchOut(TaskOut):
+    rank: float  # Релевантность, по ней (и id) упорядочена выдача
+
+
+class TaskWithProject(TaskOut):
+    project: ProjectOut | None  # None, если проект удален (project_id обнулен)
+
+
+class ProjectWithTasks(ProjectOut):
+    tasks: list[TaskOut]  # Первые EXPAND_TASKS_LIMIT задач проекта по id
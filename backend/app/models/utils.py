@@ -1,5 +1,8 @@
+import base64
+import json
 from datetime import datetime
 from enum import Enum
+from typing import Any
 
 from pydantic import BaseModel
 from sqlmodel import DateTime, Field, SQLModel, func
@@ -19,6 +22,21 @@ class TimeStampModel(SQLModel):
     )
 
 
+# Конфигурация полнотекстового поиска: русские слова и латиница приводятся к основам.
+# Используется в генерируемых колонках search_vector и в запросах, менять только миграцией
+SEARCH_CONFIG = "russian"
+
+
+def get_search_vector_expression(*weighted: tuple[str, str]) -> str:
+    """
+    Выражение генерируемой колонки tsvector из пар (колонка, вес A-D)
+    """
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted
+    )
+
+
 class TaskStatus(str, Enum):
     TODO = "todo"
     IN_PROGRESS = "in_progress"
@@ -28,6 +46,7 @@ class TaskStatus(str, Enum):
 class Pagination(BaseModel):
     skip: int = 0
     limit: int = 100
+    cursor: list[Any] | None = None  # Декодированный курсор (значения сортировки..., id)
 
     class Config:
         schema_extra = {
@@ -36,3 +55,14 @@ class Pagination(BaseModel):
                 "limit": 10
             }
         }
+
+
+def encode_cursor(values: list[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(values, list) or len(values) < 2:
+        raise ValueError(cursor)
+    return values
@@ -0,0 +1,77 @@
+import logging
+import threading
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from app import cruds
+from app.core.config import settings
+from app.core.engine import engine
+
+logger = logging.getLogger(__name__)
+
+
+def sweep(db_engine: Engine, batch_size: int = settings.OVERDUE_SWEEP_BATCH_SIZE) -> int:
+    """
+    Переводит все задачи с прошедшим due_date в статус OVERDUE пачками,
+    двигаясь курсором по (due_date, id). Каждая пачка коммитится отдельно.
+
+    Returns:
+        количество обновленных задач
+    """
+    total = 0
+    cursor = None
+    with Session(db_engine) as session:
+        while True:
+            updated = cruds.task.mark_overdue_batch(
+                session=session,
+                after=cursor,
+                limit=batch_size
+            )
+            session.commit()
+            total += len(updated)
+            if len(updated) < batch_size:
+                break
+            cursor = updated[-1]
+    return total
+
+
+def run(
+    db_engine: Engine,
+    stop_event: threading.Event,
+    interval: int = settings.OVERDUE_SWEEP_INTERVAL_SECONDS,
+) -> None:
+    while not stop_event.is_set():
+        try:
+            updated = sweep(db_engine)
+            if updated:
+                logger.info(f"Marked {updated} tasks as overdue")
+        except Exception as e:
+            logger.error(e)
+        stop_event.wait(interval)
+
+
+class OverdueSweeperThread(threading.Thread):
+    """Фоновый поток для запуска переводчика статусов внутри процесса приложения"""
+
+    def __init__(self, db_engine: Engine):
+        super().__init__(name="overdue-sweeper", daemon=True)
+        self.db_engine = db_engine
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        run(self.db_engine, self.stop_event)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.join()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Starting overdue sweeper")
+    run(engine, threading.Event())
+
+
+if __name__ == "__main__":
+    main()
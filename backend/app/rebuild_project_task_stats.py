@@ -0,0 +1,26 @@
+import logging
+
+from sqlmodel import Session
+
+from app import cruds
+from app.core.engine import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def rebuild() -> int:
+    with Session(engine) as session:
+        projects = cruds.project.rebuild_task_stats(session=session)
+        session.commit()
+    return projects
+
+
+def main() -> None:
+    logger.info("Rebuilding project task stats")
+    projects = rebuild()
+    logger.info(f"Project task stats rebuilt for {projects} projects")
+
+
+if __name__ == "__main__":
+    main()
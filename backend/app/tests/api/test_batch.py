@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.tests.api.test_expand import count_queries
+
+
+def test_get_tasks_batch(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="batch", description="batch")
+    pg_session.add(project)
+    pg_session.commit()
+    tasks = [
+        Task(project_id=project.id, title=f"batch {i}", description="d", status=TaskStatus.TODO)
+        for i in range(3)
+    ]
+    pg_session.add_all(tasks)
+    pg_session.commit()
+    first, second, third = (task.id for task in tasks)
+    url = f"{settings.API_V1_STR}/task/batch"
+
+    with count_queries() as statements:
+        response = client.get(url, params={"ids": f"{third},0,{first},{third}"})
+    assert response.status_code == 200
+    # Порядок запроса сохраняется, повторы схлопываются, отсутствующие id перечислены отдельно
+    assert [task["id"] for task in response.json()["items"]] == [third, first]
+    assert response.json()["missing"] == [0]
+    # Один параметр-массив вместо параметра на каждый id
+    assert sum("= ANY" in statement for statement in statements) == 1
+
+    response = client.get(url, params={"ids": [str(second), f"{first},{third}"]})
+    assert [task["id"] for task in response.json()["items"]] == [second, first, third]
+    assert response.json()["missing"] == []
+
+    assert client.get(url, params={"ids": "1,x"}).status_code == 400
+    assert client.get(url, params={"ids": ","}).status_code == 400
+    assert client.get(url, params={"ids": f"{first},99999999999"}).status_code == 400
+    assert client.get(url).status_code == 422
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+
+
+def test_bulk_create_update_delete(client: TestClient, pg_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    project = Project(name="bulk", description="bulk")
+    pg_session.add(project)
+    pg_session.commit()
+    project_id = project.id
+    url = f"{settings.API_V1_STR}/task/bulk"
+    past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+
+    items = [
+        {"title": f"bulk {i}", "description": "d", "status": "todo"} for i in range(5)
+    ]
+    items[1] = {"title": "no status"}
+    items[3]["due_date"] = past
+    response = client.post(url, params={"project_id": project_id}, json=items)
+    assert response.status_code == 200
+    body = response.json()
+    # Созданные задачи в порядке запроса, невалидные элементы - ошибки по позициям
+    assert [task["title"] for task in body["items"]] == ["bulk 0", "bulk 2", "bulk 3", "bulk 4"]
+    assert [error["index"] for error in body["errors"]] == [1]
+    assert [task["status"] for task in body["items"]] == ["todo", "todo", "overdue", "todo"]
+    created = [task["id"] for task in body["items"]]
+    assert created == sorted(created)
+
+    response = client.patch(url, json=[
+        {"id": created[2], "title": "late", "description": "d", "status": "todo", "due_date": past},
+        {"id": 0, "title": "missing", "description": "d", "status": "todo"},
+        {"id": created[1], "title": "x" * 100, "description": "d", "status": "todo"},
+        {"id": created[0], "title": "renamed", "description": "d", "status": "completed"},
+        {"id": 2**31, "title": "out of range", "description": "d", "status": "todo"},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    # Обновленные задачи в порядке запроса, id вне диапазона integer - ошибка элемента
+    assert [(task["id"], task["title"]) for task in body["items"]] == [(created[2], "late"), (created[0], "renamed")]
+    assert [(error["index"], error["detail"]) for error in body["errors"] if error["index"] != 2] == [
+        (1, "Task not found"), (4, "Invalid id")
+    ]
+    assert [error["index"] for error in body["errors"]] == [1, 2, 4]
+    pg_session.expunge_all()
+    assert pg_session.get(Task, created[2]).status == TaskStatus.OVERDUE
+    assert pg_session.get(Task, created[1]).title == "bulk 2"
+
+    response = client.request("DELETE", url, json=[created[0], 0, created[1], -2**31 - 1])
+    assert response.status_code == 200
+    assert sorted(response.json()["deleted"]) == [created[0], created[1]]
+    assert [(error["index"], error["detail"]) for error in response.json()["errors"]] == [
+        (1, "Task not found"), (3, "Invalid id")
+    ]
+    pg_session.expunge_all()
+    remaining = pg_session.exec(select(Task.id).where(Task.project_id == project_id)).all()
+    assert sorted(remaining) == [created[2], created[3]]
+
+    assert client.post(url, params={"project_id": 0}, json=items).status_code == 404
+    monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 2)
+    assert client.post(url, params={"project_id": project_id}, json=items).status_code == 400
+    assert client.request("DELETE", url, json=[1, 2, 3]).status_code == 400
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import cruds
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.models.task import TaskOut
+
+
+def test_list_version_matches_loaded_page(pg_session: Session) -> None:
+    project = Project(name="etag", description="etag")
+    pg_session.add(project)
+    pg_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    for i in range(3):
+        pg_session.add(Task(project_id=project.id, title=f"t{i}", description="d", status=TaskStatus.TODO, due_date=past))
+    pg_session.commit()
+
+    filters = [Task.project_id == project.id]
+    tasks = cruds.task.get_list(session=pg_session, filters=filters, limit=2)
+    version = cruds.task.get_list_version(session=pg_session, filters=filters, limit=2)
+    assert version == cruds.task.get_version(tasks)
+    rows = cruds.task.get_list_rows(session=pg_session, schema=TaskOut, filters=filters, limit=2)
+    assert version == cruds.task.get_version(rows)
+    # Просроченные задачи меняют версию на момент due_date
+    assert version[0] >= past
+
+
+def test_conditional_get(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="etag", description="etag")
+    pg_session.add(project)
+    pg_session.commit()
+    url = f"{settings.API_V1_STR}/project/{project.id}"
+
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": response.headers["Last-Modified"]}).status_code == 304
+
+    list_url = f"{settings.API_V1_STR}/task/?project_id={project.id}"
+    list_etag = client.get(list_url).headers["ETag"]
+    assert client.get(list_url, headers={"If-None-Match": list_etag}).status_code == 304
+
+    client.post(list_url, json={"title": "t", "description": "d", "status": "todo"})
+    assert client.get(list_url, headers={"If-None-Match": list_etag}).status_code == 200
@@ -0,0 +1,72 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.models.utils import encode_cursor
+from app.tests.utils.utils import count_queries
+
+
+def test_expand_uses_fixed_number_of_queries(client: TestClient, pg_session: Session) -> None:
+    projects = [Project(name=f"expand {i}", description="expand") for i in range(3)]
+    pg_session.add_all(projects)
+    pg_session.commit()
+    for project in projects:
+        for i in range(settings.EXPAND_TASKS_LIMIT + 1):
+            pg_session.add(Task(project_id=project.id, title=f"t{i}", description="d", status=TaskStatus.TODO))
+    pg_session.commit()
+    first_id = projects[0].id
+    cursor = encode_cursor([first_id - 1, first_id - 1])
+
+    counts = []
+    for limit in (1, 3):
+        with count_queries() as statements:
+            response = client.get(
+                f"{settings.API_V1_STR}/project/",
+                params={"expand": "tasks", "limit": limit, "cursor": cursor},
+            )
+        counts.append(len(statements))
+        body = response.json()
+        assert [project["id"] for project in body] == [project.id for project in projects[:limit]]
+        assert all(len(project["tasks"]) == settings.EXPAND_TASKS_LIMIT for project in body)
+    assert counts[0] == counts[1]
+
+    counts = []
+    for limit in (1, 5):
+        # Проект может читаться из кэша, поэтому первый запрос прогревает его
+        client.get(f"{settings.API_V1_STR}/project/{first_id}")
+        with count_queries() as statements:
+            response = client.get(
+                f"{settings.API_V1_STR}/task/",
+                params={"project_id": first_id, "expand": "project", "limit": limit},
+            )
+        counts.append(len(statements))
+        assert [task["project"]["id"] for task in response.json()] == [first_id] * limit
+    assert counts[0] == counts[1]
+
+    task_id = response.json()[0]["id"]
+    with count_queries() as statements:
+        response = client.get(f"{settings.API_V1_STR}/task/{task_id}", params={"expand": "project"})
+    assert response.json()["project"]["name"] == "expand 0"
+    assert len(statements) == 1
+
+    response = client.get(f"{settings.API_V1_STR}/project/{first_id}", params={"expand": "tasks"})
+    assert len(response.json()["tasks"]) == settings.EXPAND_TASKS_LIMIT
+    assert "tasks" not in client.get(f"{settings.API_V1_STR}/project/{first_id}").json()
+
+
+def test_expand_orphan_task_project(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="orphan", description="orphan")
+    pg_session.add(project)
+    pg_session.commit()
+    task = Task(project_id=project.id, title="t", description="d", status=TaskStatus.TODO)
+    pg_session.add(task)
+    pg_session.commit()
+    task_id = task.id
+
+    assert client.delete(f"{settings.API_V1_STR}/project/", params={"project_id": project.id}).status_code == 200
+    # Внешний ключ обнулен при удалении проекта, задача осталась без проекта
+    response = client.get(f"{settings.API_V1_STR}/task/{task_id}", params={"expand": "project"})
+    assert response.status_code == 200
+    assert response.json()["project"] is None
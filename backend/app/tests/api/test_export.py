@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.routes.project import export_tasks
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.models.task import TaskOut
+
+
+def test_export_project_tasks(client: TestClient, pg_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    project = Project(name="export", description="export")
+    other = Project(name="export other", description="export")
+    pg_session.add_all([project, other])
+    pg_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    tasks = [
+        Task(project_id=project.id, title=f"export, {i}", description="d\n\"quoted\"", status=TaskStatus.TODO,
+             due_date=past if i == 1 else None)
+        for i in range(5)
+    ]
+    pg_session.add_all(tasks + [Task(project_id=other.id, title="other", description="d", status=TaskStatus.TODO)])
+    pg_session.commit()
+    ids = [task.id for task in tasks]
+    url = f"{settings.API_V1_STR}/project/{project.id}/tasks/export"
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert f'filename="project_{project.id}_tasks.ndjson"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert set(rows[0]) == set(TaskOut.model_fields)
+    # Статус просроченной задачи вычисляется при выгрузке
+    assert [row["status"] for row in rows] == ["todo", "overdue", "todo", "todo", "todo"]
+
+    response = client.get(url, params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == ids
+    assert rows[0]["title"] == "export, 0"
+    assert rows[0]["description"] == "d\n\"quoted\""
+
+    # Ответ отдается частями по EXPORT_CHUNK_SIZE строк, а не одним телом
+    assert len(list(export_tasks(project.id, "ndjson"))) == 3
+
+    assert client.get(f"{settings.API_V1_STR}/project/0/tasks/export").status_code == 404
+    assert client.get(url, params={"format": "xml"}).status_code == 422
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import cruds
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.models.task import TaskOut
+from app.tests.utils.utils import count_queries
+
+
+def test_task_list_filter_and_sort(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="filters", description="filters")
+    pg_session.add(project)
+    pg_session.commit()
+    now = datetime.now(timezone.utc)
+    tasks = [
+        Task(project_id=project.id, title=f"report {i}", description="d",
+             status=[TaskStatus.TODO, TaskStatus.COMPLETED][i % 2],
+             due_date=now + timedelta(days=i % 3 + 1) if i % 4 else None)
+        for i in range(8)
+    ] + [Task(project_id=project.id, title="100%_done", description="d", status=TaskStatus.TODO)]
+    pg_session.add_all(tasks)
+    pg_session.commit()
+    url = f"{settings.API_V1_STR}/task/"
+
+    response = client.get(url, params={
+        "project_id": project.id, "filter": ["status:in:todo", "title:prefix:report"]
+    })
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["report 0", "report 2", "report 4", "report 6"]
+    # Символы LIKE в префиксе экранируются
+    response = client.get(url, params={"project_id": project.id, "filter": "title:prefix:100%_"})
+    assert [task["title"] for task in response.json()] == ["100%_done"]
+
+    # Сортировка по сроку (NULL последними) и по убыванию id, страницы по курсору
+    expected = sorted(
+        tasks, key=lambda task: (task.due_date is None, task.due_date or now, -task.id)
+    )
+    pages, cursor = [], None
+    while True:
+        params = {"project_id": project.id, "sort": "due_date,-id", "limit": 2}
+        response = client.get(url, params=params | ({"cursor": cursor} if cursor else {}))
+        assert response.status_code == 200
+        pages += [task["id"] for task in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == [task.id for task in expected]
+
+    for params in [
+        {"filter": "created_at:eq:2026-01-01"},  # Поле без индекса
+        {"filter": "title:gt:a"},  # Оператор не разрешен для поля
+        {"filter": "due_date:gte:tomorrow"},  # Значение не приводится к типу колонки
+        {"filter": "status"},
+        {"sort": "title"},
+    ]:
+        response = client.get(url, params={"project_id": project.id} | params)
+        assert response.status_code == 400, params
+
+    response = client.get(f"{settings.API_V1_STR}/project/", params={"filter": "name:eq:filters", "sort": "-id"})
+    assert project.id in [item["id"] for item in response.json()]
+    assert {item["name"] for item in response.json()} == {"filters"}
+
+
+def test_status_filter_uses_actual_status(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="filters overdue", description="filters")
+    pg_session.add(project)
+    pg_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    # Срок прошел, но статус в БД еще не переведен в OVERDUE
+    late = Task(project_id=project.id, title="late", description="d", status=TaskStatus.TODO, due_date=past)
+    todo = Task(project_id=project.id, title="todo", description="d", status=TaskStatus.TODO)
+    pg_session.add_all([late, todo])
+    pg_session.commit()
+    url = f"{settings.API_V1_STR}/task/"
+
+    for params, expected in [
+        ({}, ["late", "todo"]),
+        ({"filter": "status:eq:overdue"}, ["late"]),
+        ({"filter": "status:eq:todo"}, ["todo"]),
+        ({"filter": "status:in:todo,overdue"}, ["late", "todo"]),
+        ({"status": "overdue"}, ["late"]),
+        ({"status": "todo"}, ["todo"]),
+    ]:
+        with count_queries() as statements:
+            response = client.get(url, params={"project_id": project.id} | params)
+        assert [task["title"] for task in response.json()] == expected, params
+        assert {task["status"] for task in response.json()} <= {"todo", "overdue"}
+        # Чтение списка вычисляет статус в запросе и ничего не пишет в БД
+        assert not [statement for statement in statements if statement.lstrip().upper().startswith("UPDATE")]
+    pg_session.refresh(late)
+    assert late.status == TaskStatus.TODO
+
+
+def test_same_filter_shape_shares_compiled_statement() -> None:
+    spec = cruds.task.filter_spec
+
+    def get_query(filters: list[str]):
+        compiled = spec.compile(spec.parse(filters, "-due_date"))
+        return cruds.task.get_list_rows_query(schema=TaskOut, filters=compiled.filters, sort=compiled.sort)
+
+    first = get_query(["status:in:todo,completed", "title:prefix:a"])
+    second = get_query(["status:in:todo", "title:prefix:b"])
+    assert first._generate_cache_key() == second._generate_cache_key()
+    assert first._generate_cache_key() != get_query(["status:eq:todo"])._generate_cache_key()
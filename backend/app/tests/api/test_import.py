@@ -0,0 +1,67 @@
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api import deps
+from app.core import replica
+from app.core.config import settings
+from app.core.engine import engine
+from app.models import Task, TaskStatus
+from app.models.project import Project
+
+
+def test_import_tasks(client: TestClient, pg_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    project = Project(name="import", description="import")
+    pg_session.add(project)
+    pg_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    existing = Task(project_id=project.id, title="existing", description="d", status=TaskStatus.TODO, due_date=past)
+    pg_session.add(existing)
+    pg_session.commit()
+    project_id, existing_id, existing_updated_at = project.id, existing.id, existing.updated_at
+    url = f"{settings.API_V1_STR}/project/{project_id}/tasks/import"
+    # Отметка о записи ставится, только если настроены реплики
+    monkeypatch.setattr(deps.replica_router, "engines", [engine])
+    client.cookies.clear()
+
+    ndjson = "\n".join([
+        json.dumps({"title": "late", "description": "d", "status": "todo", "due_date": past.isoformat()}),
+        "not json",
+        json.dumps({"title": "no status"}),
+        "",
+        json.dumps({"title": "future", "description": "d", "status": "todo"}),
+    ])
+    response = client.post(url, content=ndjson, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 2
+    assert response.json()["rejected"] == 2
+    assert [error["index"] for error in response.json()["errors"]] == [1, 2]
+    assert replica.STICKY_COOKIE in response.cookies
+
+    # Строки с NUL и с ошибкой разбора CSV отклоняются, остальные загружаются
+    csv_body = (
+        "title,description,status\ncsv 1,d,todo\ncsv\x00 2,d,todo\n"
+        f"csv 3,{'x' * (csv.field_size_limit() + 1)},todo\ncsv 4,d,completed\n"
+    )
+    response = client.post(url, content=csv_body, params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 2
+    assert response.json()["rejected"] == 2
+
+    pg_session.expunge_all()
+    tasks = {task.title: task for task in pg_session.exec(select(Task).where(Task.project_id == project_id))}
+    assert set(tasks) == {"existing", "late", "future", "csv 1", "csv 4"}
+    # Просроченная загруженная задача сразу OVERDUE, уже существующие задачи проекта не трогаются
+    assert tasks["late"].status == TaskStatus.OVERDUE
+    assert tasks["future"].status == TaskStatus.TODO
+    assert tasks["existing"].status == TaskStatus.TODO
+    assert tasks["existing"].updated_at == existing_updated_at
+    assert tasks["existing"].id == existing_id
+
+    assert client.post(
+        f"{settings.API_V1_STR}/project/0/tasks/import", content=ndjson
+    ).status_code == 404
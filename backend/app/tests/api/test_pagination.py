@@ -0,0 +1,67 @@
+import base64
+import json
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.models.utils import encode_cursor
+
+
+def get_all_pages(client: TestClient, url: str, params: dict) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params=params | ({"cursor": cursor} if cursor else {}))
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_cursor_pagination(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="pagination", description="pagination")
+    pg_session.add(project)
+    pg_session.commit()
+    tasks = [
+        Task(project_id=project.id, title=f"page {i}", description="d", status=TaskStatus.TODO)
+        for i in range(5)
+    ]
+    pg_session.add_all(tasks)
+    pg_session.commit()
+    ids = [task.id for task in tasks]
+    url = f"{settings.API_V1_STR}/task/"
+    params = {"project_id": project.id, "limit": 2}
+
+    # Курсор берется из X-Next-Cursor, на неполной последней странице заголовка нет
+    assert get_all_pages(client, url, params) == [ids[:2], ids[2:4], ids[4:]]
+    assert get_all_pages(client, url, params | {"sort": "-id"}) == [ids[:2:-1], ids[2:0:-1], ids[:1]]
+
+    # Удаление строки между запросами не сдвигает следующую страницу, в отличие от skip
+    response = client.get(url, params=params)
+    cursor = response.headers["X-Next-Cursor"]
+    pg_session.delete(tasks[0])
+    pg_session.commit()
+    response = client.get(url, params=params | {"cursor": cursor})
+    assert [task["id"] for task in response.json()] == ids[2:4]
+    # При наличии курсора skip игнорируется
+    response = client.get(url, params=params | {"cursor": cursor, "skip": 1})
+    assert [task["id"] for task in response.json()] == ids[2:4]
+
+    # Курсор другой сортировки не подходит: в нем другое число значений
+    response = client.get(url, params=params | {"sort": "due_date,-id"})
+    assert response.status_code == 200
+    other_sort_cursor = response.headers["X-Next-Cursor"]
+    for cursor in [
+        "not base64!",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        base64.urlsafe_b64encode(json.dumps({"id": 1}).encode()).decode(),
+        encode_cursor([ids[1]]),
+        encode_cursor(["x", "y"]),
+        other_sort_cursor,
+    ]:
+        response = client.get(url, params=params | {"cursor": cursor})
+        assert response.status_code == 400, cursor
+        assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,58 @@
+import random
+import string
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+
+
+def test_search_tasks(client: TestClient, pg_session: Session) -> None:
+    # Слово, которого нет в задачах предыдущих запусков
+    word = "".join(random.choices(string.ascii_lowercase, k=12))
+    project = Project(name=f"Проект {word}", description="d")
+    other = Project(name="other", description="d")
+    pg_session.add_all([project, other])
+    pg_session.commit()
+    in_title = Task(
+        project_id=project.id, title=f"настроить ксилофон {word}", description="d", status=TaskStatus.TODO
+    )
+    in_description = Task(
+        project_id=other.id, title="t", description=f"купить новые ксилофоны {word}", status=TaskStatus.TODO
+    )
+    by_project = Task(project_id=project.id, title="Барабан", description="d", status=TaskStatus.TODO)
+    pg_session.add_all([in_title, in_description, by_project])
+    pg_session.commit()
+
+    response = client.get(f"{settings.API_V1_STR}/task/search", params={"q": word})
+    assert response.status_code == 200
+    # Совпадение в названии задачи весит больше, чем в описании и названии проекта
+    assert [task["id"] for task in response.json()] == [in_title.id, in_description.id, by_project.id]
+    ranks = [task["rank"] for task in response.json()]
+    assert ranks == sorted(ranks, reverse=True)
+
+    # Keyset пагинация по (rank, id)
+    pages, cursor = [], None
+    while True:
+        params = {"q": word, "limit": 1} | ({"cursor": cursor} if cursor else {})
+        response = client.get(f"{settings.API_V1_STR}/task/search", params=params)
+        pages += [task["id"] for task in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == [in_title.id, in_description.id, by_project.id]
+
+    # В проекте ищутся только его задачи, слова приводятся к основе
+    response = client.get(f"{settings.API_V1_STR}/project/{project.id}/tasks/search", params={"q": "ксилофоны"})
+    assert [task["id"] for task in response.json()] == [in_title.id]
+    response = client.get(
+        f"{settings.API_V1_STR}/project/{project.id}/tasks/search", params={"q": "ксилофон -настроить"}
+    )
+    assert response.json() == []
+
+    assert client.get(f"{settings.API_V1_STR}/task/search", params={"q": ""}).status_code == 422
+    assert client.get(
+        f"{settings.API_V1_STR}/task/search", params={"q": word, "cursor": "WyJ4IiwgMV0="}
+    ).status_code == 400
@@ -0,0 +1,28 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from app.api import serializers
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.task import TaskOut
+
+
+def test_rows_and_models_serialize_equally(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    values = {
+        "created_at": now,
+        "updated_at": now,
+        "description": "d",
+        "title": "t",
+        "due_date": None,
+        "status": TaskStatus.TODO,
+        "id": 1,
+    }
+    # Строки результата SQLAlchemy, как и namedtuple, отдают поля через _asdict()
+    row = namedtuple("Row", TaskOut.model_fields)(**values)
+
+    from_models = serializers.render(serializers.task_list_adapter, [Task(project_id=1, **values)]).body
+    from_rows = serializers.render_rows(serializers.task_rows_adapter, [row]).body
+    assert from_models == from_rows
+    assert serializers.render(serializers.task_adapter, Task(project_id=1, **values)).body == from_models[1:-1]
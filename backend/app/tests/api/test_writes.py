@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project, ProjectTaskStats
+from app.tests.api.test_expand import count_queries
+
+
+def test_update_and_delete_are_single_statements(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="writes", description="writes")
+    pg_session.add(project)
+    pg_session.commit()
+    task = Task(project_id=project.id, title="t", description="d", status=TaskStatus.TODO)
+    pg_session.add(task)
+    pg_session.commit()
+    project_id, task_id = project.id, task.id
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+
+    with count_queries() as statements:
+        response = client.patch(
+            f"{settings.API_V1_STR}/task/{task_id}",
+            json={"title": "late", "description": "d", "due_date": past.isoformat(), "status": "todo"},
+        )
+    assert response.status_code == 200
+    # Срок прошел - статус OVERDUE выставлен тем же UPDATE и сохранен в БД
+    assert response.json()["status"] == TaskStatus.OVERDUE
+    assert len(statements) == 1
+
+    response = client.patch(
+        f"{settings.API_V1_STR}/task/{task_id}",
+        json={"title": "t", "description": "d", "due_date": None, "status": "in_progress"},
+    )
+    assert response.json()["status"] == TaskStatus.IN_PROGRESS
+    assert client.patch(
+        f"{settings.API_V1_STR}/task/0",
+        json={"title": "t", "description": "d", "status": "todo"},
+    ).status_code == 404
+
+    with count_queries() as statements:
+        response = client.delete(f"{settings.API_V1_STR}/project/", params={"project_id": project_id})
+    assert response.status_code == 200
+    assert len(statements) == 1
+    assert client.delete(f"{settings.API_V1_STR}/project/", params={"project_id": project_id}).status_code == 404
+
+    # Задачи удаленного проекта отвязываются, его счетчики удаляются вместе с ним
+    pg_session.expire_all()
+    assert pg_session.get(Task, task_id).project_id is None
+    assert pg_session.exec(select(ProjectTaskStats).where(ProjectTaskStats.project_id == project_id)).first() is None
+
+    response = client.delete(f"{settings.API_V1_STR}/task/", params={"task_id": task_id})
+    assert response.status_code == 200
+    assert client.delete(f"{settings.API_V1_STR}/task/", params={"task_id": task_id}).status_code == 404
+
+
+def test_request_is_one_transaction(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="unit of work", description="unit of work")
+    pg_session.add(project)
+    pg_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+
+    response = client.post(
+        f"{settings.API_V1_STR}/task/",
+        params={"project_id": project.id},
+        json={"title": "t", "description": "d", "due_date": past.isoformat(), "status": "todo"},
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == TaskStatus.OVERDUE
+    # Вставка и перевод в OVERDUE - одна транзакция с одним коммитом
+    assert response.headers["X-DB-Commits"] == "1"
+
+    # Исключение в обработчике завершает транзакцию откатом, без коммита
+    response = client.post(
+        f"{settings.API_V1_STR}/task/bulk",
+        params={"project_id": 0},
+        json=[{"title": "t", "description": "d", "status": "todo"}],
+    )
+    assert response.status_code == 404
+    assert response.headers["X-DB-Commits"] == "0"
+
+
+def test_create_task_with_naive_due_date(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="naive due date", description="naive")
+    pg_session.add(project)
+    pg_session.commit()
+    url = f"{settings.API_V1_STR}/task/"
+
+    # Срок без часового пояса считается UTC и в синхронных, и в асинхронных обработчиках
+    for due_date, status in [("2020-01-01T00:00:00", TaskStatus.OVERDUE), ("2999-01-01T00:00:00", TaskStatus.TODO)]:
+        response = client.post(
+            url,
+            params={"project_id": project.id},
+            json={"title": "naive", "description": "d", "status": "todo", "due_date": due_date},
+        )
+        assert response.status_code == 200, due_date
+        assert response.json()["status"] == status
+        pg_session.expire_all()
+        assert pg_session.get(Task, response.json()["id"]).status == status
@@ -2,12 +2,12 @@ from collections.abc import Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, delete
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
 
-from app.core.config import settings
 from app.core.db import init_db
 from app.core.engine import engine
-from app.main import app
+from app.main import create_app
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -17,8 +17,18 @@ def db() -> Generator[Session, None, None]:
         yield session
 
 
+@pytest.fixture(scope="session")
+def pg_session(db: Session) -> Session:
+    # Тесты, которым нужна настоящая БД, пропускаются, если Postgres недоступен
+    try:
+        db.exec(select(1))
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+    return db
 
-@pytest.fixture(scope="module")
-def client() -> Generator[TestClient, None, None]:
-    with TestClient(app) as c:
+
+@pytest.fixture(scope="module", params=[False, True], ids=["sync", "async"])
+def client(request: pytest.FixtureRequest) -> Generator[TestClient, None, None]:
+    # Тесты API выполняются и с асинхронными обработчиками основных эндпоинтов (ASYNC_API)
+    with TestClient(create_app(async_api=request.param)) as c:
         yield c
@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import cruds
+from app.core import cache as cache_module
+from app.core.cache import MemoryCache, RedisCache
+from app.core.config import settings
+from app.cruds.task import CRUDTask
+from app.main import create_app
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+
+
+class LocalRedis:
+    """Заглушка клиента Redis: хранит значения в словаре, TTL не учитывает"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", {"id": 1}, ttl=60)
+    cache.set("b", {"id": 2}, ttl=60)
+    assert cache.get("a") == {"id": 1}
+    cache.set("c", {"id": 3}, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": 1}
+    assert cache.get_stats() == {"hits": 2, "misses": 1, "evictions": 1, "invalidations": 0}
+
+
+def test_memory_cache_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = MemoryCache()
+    cache.set("a", {"id": 1}, ttl=10)
+    cache.set("b", {"id": 2}, ttl=0)
+    assert cache.get("b") is None
+    now += 11
+    assert cache.get("a") is None
+    assert cache.stats.evictions == 1
+
+
+def test_memory_cache_delete():
+    cache = MemoryCache()
+    cache.set("a", {"id": 1}, ttl=60)
+    cache.delete("a", "missing")
+    assert cache.get("a") is None
+    assert cache.stats.invalidations == 1
+
+
+def test_redis_cache():
+    client = LocalRedis()
+    cache = RedisCache(client)
+    cache.set("task:1", {"id": 1, "title": "t"}, ttl=60)
+    assert "cache:task:1" in client.data
+    assert cache.get("task:1") == {"id": 1, "title": "t"}
+    cache.delete("task:1")
+    assert cache.get("task:1") is None
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "evictions": 0, "invalidations": 1}
+
+
+def test_task_cache_ttl_respects_due_date():
+    crud = CRUDTask(Task, cache=MemoryCache())
+    now = datetime.now(timezone.utc)
+    task = Task(id=1, project_id=1, title="t", status=TaskStatus.TODO)
+    assert crud.get_cache_ttl(task) == settings.CACHE_TTL_SECONDS
+
+    task.due_date = now + timedelta(seconds=30)
+    assert 0 < crud.get_cache_ttl(task) <= 30
+
+    task.due_date = now - timedelta(seconds=1)
+    assert crud.get_cache_ttl(task) == 0
+
+    task.status = TaskStatus.OVERDUE
+    assert crud.get_cache_ttl(task) == settings.CACHE_TTL_SECONDS
+
+
+def test_invalidation_waits_for_commit(pg_session: Session):
+    crud = CRUDTask(Task, cache=MemoryCache())
+    project = Project(name="cache", description="cache")
+    pg_session.add(project)
+    pg_session.commit()
+    task = Task(project_id=project.id, title="cached", description="d", status=TaskStatus.TODO)
+    pg_session.add(task)
+    pg_session.commit()
+    task_id, key = task.id, crud.get_cache_key(task.id)
+    pg_session.expunge_all()
+    crud.get_one_by_id(id=task_id, session=pg_session)
+    assert crud.cache.get(key)["title"] == "cached"
+
+    # До коммита кэш не трогается, а своя транзакция видит изменение, а не кэш
+    crud.update_by_id(id=task_id, obj_new={"title": "rolled back"}, session=pg_session)
+    assert crud.cache.get(key)["title"] == "cached"
+    assert crud.get_one_by_id(id=task_id, session=pg_session).title == "rolled back"
+    pg_session.rollback()
+    assert crud.cache.get(key)["title"] == "cached"
+
+    crud.update_by_id(id=task_id, obj_new={"title": "committed"}, session=pg_session)
+    pg_session.commit()
+    assert crud.cache.get(key) is None
+    pg_session.expunge_all()
+    assert crud.get_one_by_id(id=task_id, session=pg_session).title == "committed"
+
+
+def test_project_delete_invalidates_its_tasks(pg_session: Session, monkeypatch):
+    monkeypatch.setattr(cruds.task, "cache", MemoryCache())
+    project = Project(name="cache", description="cache")
+    pg_session.add(project)
+    pg_session.commit()
+    task = Task(project_id=project.id, title="t", description="d", status=TaskStatus.TODO)
+    pg_session.add(task)
+    pg_session.commit()
+    task_id, project_id = task.id, project.id
+    pg_session.expunge_all()
+    cruds.task.get_one_by_id(id=task_id, session=pg_session)
+    assert cruds.task.cache.get(cruds.task.get_cache_key(task_id))["project_id"] == project_id
+
+    cruds.project.remove_by_id(id=project_id, session=pg_session)
+    pg_session.commit()
+    # project_id задачи обнулен внешним ключом, в кэше не должно остаться старого значения
+    assert cruds.task.cache.get(cruds.task.get_cache_key(task_id)) is None
+    pg_session.expunge_all()
+    assert cruds.task.get_one_by_id(id=task_id, session=pg_session).project_id is None
+
+
+def test_async_writes_invalidate_sync_reads(pg_session: Session, monkeypatch):
+    # Синхронные и асинхронные обработчики работают с одним кэшем
+    shared = MemoryCache()
+    for crud in (cruds.task, cruds.async_task, cruds.project, cruds.async_project):
+        monkeypatch.setattr(crud, "cache", shared)
+    project = Project(name="cache", description="cache")
+    pg_session.add(project)
+    pg_session.commit()
+    tasks = [Task(project_id=project.id, title="t", description="d", status=TaskStatus.TODO) for _ in range(2)]
+    pg_session.add_all(tasks)
+    pg_session.commit()
+    project_id, (updated_id, deleted_id) = project.id, [task.id for task in tasks]
+    api = settings.API_V1_STR
+
+    with TestClient(create_app(async_api=False)) as sync_client, \
+            TestClient(create_app(async_api=True)) as async_client:
+        assert sync_client.get(f"{api}/project/{project_id}/tasks/export").status_code == 200
+        for task_id in (updated_id, deleted_id):
+            assert sync_client.get(f"{api}/task/{task_id}").status_code == 200
+        assert shared.get(cruds.project.get_cache_key(project_id)) is not None
+        assert shared.get(cruds.task.get_cache_key(updated_id))["project_id"] == project_id
+
+        response = async_client.patch(
+            f"{api}/task/{updated_id}", json={"title": "changed", "description": "d", "status": "todo"}
+        )
+        assert response.status_code == 200
+        assert sync_client.get(f"{api}/task/{updated_id}").json()["title"] == "changed"
+
+        assert async_client.delete(f"{api}/task/", params={"task_id": deleted_id}).status_code == 200
+        assert sync_client.get(f"{api}/task/{deleted_id}").status_code == 404
+
+        # Удаление проекта обнуляет project_id его задач, в кэше не остается ни проекта, ни задач
+        assert async_client.delete(f"{api}/project/", params={"project_id": project_id}).status_code == 200
+        assert sync_client.get(f"{api}/project/{project_id}/tasks/export").status_code == 404
+        assert shared.get(cruds.task.get_cache_key(updated_id)) is None
+    pg_session.expunge_all()
+    assert cruds.task.get_one_by_id(id=updated_id, session=pg_session).project_id is None
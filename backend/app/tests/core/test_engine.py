@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import NullPool, create_engine, text
+
+from app.core.config import settings
+from app.core.engine import get_engine_options
+
+
+def test_prepare_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "DB_USE_NULL_POOL", False)
+    monkeypatch.setattr(settings, "DB_PREPARE_THRESHOLD", 2)
+    assert get_engine_options()["connect_args"]["prepare_threshold"] == 2
+
+    monkeypatch.setattr(settings, "DB_PREPARE_THRESHOLD", 0)
+    assert get_engine_options()["connect_args"]["prepare_threshold"] is None
+
+    # За PgBouncer подготовленные запросы отключены независимо от порога
+    monkeypatch.setattr(settings, "DB_PREPARE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "DB_USE_NULL_POOL", True)
+    assert get_engine_options()["connect_args"]["prepare_threshold"] is None
+
+
+def test_replica_connect_timeout():
+    assert "connect_timeout" not in get_engine_options()["connect_args"]
+    assert get_engine_options(connect_timeout=2)["connect_args"]["connect_timeout"] == 2
+
+
+def test_null_pool(monkeypatch):
+    monkeypatch.setattr(settings, "DB_USE_NULL_POOL", True)
+    options = get_engine_options()
+    assert issubclass(options["poolclass"], NullPool)
+    # NullPool не принимает параметры размера пула
+    assert not {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} & set(options)
+
+
+@pytest.mark.usefixtures("pg_session")
+def test_statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    db_engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **get_engine_options())
+    try:
+        with db_engine.connect() as conn:
+            assert conn.execute(text("SHOW statement_timeout")).scalar_one() == "1500ms"
+    finally:
+        db_engine.dispose()
+
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 0)
+    assert "options" not in get_engine_options()["connect_args"]
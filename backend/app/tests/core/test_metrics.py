@@ -0,0 +1,77 @@
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+from app.models.project import Project
+
+
+def test_metrics_text_format() -> None:
+    counter = Counter("requests", "Requests", ("route",))
+    counter.inc('/a"b')
+    counter.inc('/a"b')
+    assert counter.render()[-1] == 'requests{route="/a\\"b"} 2.0'
+
+    histogram = Histogram("duration", "Duration", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+    assert histogram.render()[2:] == [
+        'duration_bucket{route="/a",le="0.1"} 1',
+        'duration_bucket{route="/a",le="1.0"} 2',
+        'duration_bucket{route="/a",le="+Inf"} 3',
+        'duration_sum{route="/a"} 5.55',
+        'duration_count{route="/a"} 3',
+    ]
+
+
+def test_request_db_stats(client: TestClient, pg_session: Session) -> None:
+    project = Project(name="metrics", description="metrics")
+    pg_session.add(project)
+    pg_session.commit()
+
+    response = client.get(f"{settings.API_V1_STR}/project/{project.id}")
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Statements"]) >= 1
+    assert float(response.headers["X-DB-Time-Ms"]) >= float(response.headers["X-DB-Slowest-Ms"])
+    assert "db;dur=" in response.headers["Server-Timing"]
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    route = f"{settings.API_V1_STR}/project/"
+    assert any(
+        line.startswith("db_statements_per_request_count") and route in line
+        for line in response.text.splitlines()
+    )
+
+
+def test_request_log_level_and_sql_length(
+    client: TestClient, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Список читается из БД и при включенном кэше объектов
+    url = f"{settings.API_V1_STR}/project/"
+    caplog.set_level(logging.INFO, logger="app.requests")
+
+    # Быстрые запросы пишутся с уровнем DEBUG и при уровне INFO в лог не попадают
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 60_000)
+    client.get(url)
+    assert not [record for record in caplog.records if record.name == "app.requests"]
+
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 0)
+    monkeypatch.setattr(settings, "LOG_SLOWEST_SQL_LENGTH", 10)
+    client.get(url)
+    [record] = [record for record in caplog.records if record.name == "app.requests"]
+    assert record.levelno == logging.WARNING
+    log = json.loads(record.getMessage())
+    assert log["route"] == url
+    assert len(log["db_slowest_sql"]) == 10
+    caplog.clear()
+
+    monkeypatch.setattr(settings, "LOG_SLOWEST_SQL_LENGTH", 0)
+    client.get(url)
+    [record] = [record for record in caplog.records if record.name == "app.requests"]
+    assert json.loads(record.getMessage())["db_slowest_sql"] is None
@@ -0,0 +1,60 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import create_engine
+
+from app.api import deps
+from app.core import replica
+from app.core.config import settings
+from app.core.engine import engine, get_async_engine
+
+
+@pytest.mark.usefixtures("pg_session")
+def test_replica_router_skips_unavailable_and_lagging() -> None:
+    # Основная БД - заглушка реплики без отставания, второй движок недоступен
+    broken = create_engine(
+        "postgresql+psycopg://postgres@localhost:1/app", pool_pre_ping=False, connect_args={"connect_timeout": 1}
+    )
+    router = replica.ReplicaRouter([broken, engine], max_lag=1, check_interval=0)
+    assert [router.choose() for _ in range(3)] == [1, 1, 1]
+    assert router.states[0].lag is None
+    assert router.states[1].lag == 0
+
+    router.get_lag = lambda engine: 10.0
+    assert router.choose() is None
+
+    # В пределах check_interval используется прошлое значение отставания
+    router = replica.ReplicaRouter([engine, engine], max_lag=1, check_interval=60)
+    assert {router.choose(), router.choose()} == {0, 1}
+    router.get_lag = lambda engine: 10.0
+    assert router.choose() is not None
+
+    assert replica.ReplicaRouter([], max_lag=1, check_interval=0).choose() is None
+
+
+@pytest.mark.usefixtures("pg_session")
+def test_reads_go_to_primary_after_write(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    router = replica.ReplicaRouter([engine], max_lag=1, check_interval=60)
+    chosen = []
+    choose = router.choose
+    router.choose = lambda: chosen.append(choose()) or chosen[-1]
+    monkeypatch.setattr(deps, "replica_router", router)
+    monkeypatch.setattr(deps, "replica_engines", [engine])
+    monkeypatch.setattr(deps, "get_async_replica_engines", lambda: [get_async_engine()])
+    client.cookies.clear()
+
+    response = client.post(f"{settings.API_V1_STR}/project/", json={"name": "replica", "description": "d"})
+    assert response.status_code == 200
+    assert replica.STICKY_COOKIE in response.cookies
+    project_id = response.json()["id"]
+
+    # Сразу после записи чтение идет в основную БД
+    response = client.get(f"{settings.API_V1_STR}/project/{project_id}")
+    assert response.status_code == 200
+    assert chosen == []
+
+    client.cookies.clear()
+    response = client.get(f"{settings.API_V1_STR}/project/{project_id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "replica"
+    assert chosen == [0]
+    assert replica.STICKY_COOKIE not in response.cookies
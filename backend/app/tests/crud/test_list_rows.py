@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from app import cruds
+from app.models import Task, TaskStatus
+from app.models.project import Project, ProjectOut
+from app.models.task import TaskOut
+
+
+def test_list_rows_are_read_only(pg_session: Session) -> None:
+    project = Project(name="rows", description="rows")
+    pg_session.add(project)
+    pg_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    pg_session.add(Task(project_id=project.id, title="t", description="d", status=TaskStatus.TODO, due_date=past))
+    pg_session.commit()
+    project_id = project.id
+    pg_session.expunge_all()
+
+    rows = cruds.task.get_list_rows(
+        session=pg_session,
+        schema=TaskOut,
+        filters=[Task.project_id == project_id],
+    )
+    assert len(rows) == 1
+    assert rows[0]._fields == tuple(TaskOut.model_fields)
+    # Статус вычисляется в запросе с учетом просрочки
+    assert rows[0].status == TaskStatus.OVERDUE
+    assert len(pg_session.identity_map) == 0
+
+    projects = cruds.project.get_list_rows(session=pg_session, schema=ProjectOut, after=[project_id - 1, project_id - 1])
+    assert projects[0].id == project_id
+    assert ProjectOut.model_validate(projects[0]).name == "rows"
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import cruds
+from app.core.config import settings
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.models.utils import encode_cursor
+
+
+def test_project_list_with_stats(client: TestClient, pg_session: Session) -> None:
+    empty = Project(name="empty", description="stats")
+    project = Project(name="stats", description="stats")
+    pg_session.add_all([empty, project])
+    pg_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    for status, due_date in [
+        (TaskStatus.TODO, None),
+        (TaskStatus.TODO, past),
+        (TaskStatus.IN_PROGRESS, None),
+        (TaskStatus.COMPLETED, None),
+    ]:
+        pg_session.add(Task(project_id=project.id, title="t", description="d", status=status, due_date=due_date))
+    pg_session.commit()
+
+    first_id = min(empty.id, project.id)
+    projects = cruds.project.get_list_with_stats(session=pg_session, after=[first_id - 1, first_id - 1], limit=2)
+    stats = {p.id: p.stats for p in projects}
+    assert stats[empty.id].total == 0
+    assert stats[project.id].model_dump() == {
+        "todo": 1, "in_progress": 1, "completed": 1, "overdue": 1, "total": 4
+    }
+
+    response = client.get(
+        f"{settings.API_V1_STR}/project/",
+        params={"include": "stats", "limit": 1, "cursor": encode_cursor([project.id - 1, project.id - 1])},
+    )
+    assert response.json()[0]["stats"]["total"] == 4
+    assert "stats" not in client.get(f"{settings.API_V1_STR}/project/", params={"limit": 1}).json()[0]
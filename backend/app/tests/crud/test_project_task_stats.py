@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, select
+
+from app import cruds
+from app.models import Task, TaskStatus
+from app.models.project import Project, ProjectTaskStats, TaskStats
+
+
+def get_stored_stats(session: Session) -> dict[int, tuple]:
+    fields = [getattr(ProjectTaskStats, name) for name in TaskStats.model_fields]
+    rows = session.execute(select(ProjectTaskStats.project_id, *fields)).all()
+    # Строки с нулевыми счетчиками остаются после удаления всех задач проекта
+    return {row[0]: tuple(row[1:]) for row in rows if row.total}
+
+
+def get_live_stats(session: Session, status=Task.status) -> dict[int, tuple]:
+    rows = session.execute(cruds.project.get_task_stats_query(status)).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def test_task_stats_are_consistent(pg_session: Session) -> None:
+    projects = [Project(name="stats", description="stats") for _ in range(2)]
+    pg_session.add_all(projects)
+    pg_session.commit()
+    first, second = [project.id for project in projects]
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+
+    tasks = cruds.task.create_many(
+        session=pg_session,
+        objs_in=[
+            {"project_id": first, "title": "t", "description": "d", "status": status, "due_date": due_date}
+            for status in TaskStatus
+            for due_date in (None, past)
+        ],
+    )
+    pg_session.commit()
+    cruds.task.update_many(
+        session=pg_session,
+        objs_new=[
+            {"id": tasks[0].id, "status": TaskStatus.COMPLETED},
+            {"id": tasks[1].id, "project_id": second},
+            {"id": tasks[2].id, "title": "only title"},
+        ],
+    )
+    cruds.task.remove_many(session=pg_session, ids=[tasks[3].id])
+    pg_session.commit()
+    assert get_stored_stats(pg_session) == get_live_stats(pg_session)
+
+    # Просроченные задачи, еще не переведенные в OVERDUE, учитываются в overdue при чтении
+    page = cruds.project.get_list_with_stats(session=pg_session, after=[first - 1, first - 1], limit=2)
+    live = get_live_stats(pg_session, cruds.task.get_actual_status_column())
+    assert {project.id: tuple(project.stats.model_dump().values()) for project in page} == {
+        first: live[first], second: live[second]
+    }
+
+    cruds.task.mark_overdue(session=pg_session, filters=[Task.project_id.in_([first, second])])
+    pg_session.commit()
+    assert get_stored_stats(pg_session) == get_live_stats(pg_session)
+
+    pg_session.execute(ProjectTaskStats.__table__.update().values(total=0, todo=0))
+    cruds.project.rebuild_task_stats(session=pg_session)
+    pg_session.commit()
+    assert get_stored_stats(pg_session) == get_live_stats(pg_session)
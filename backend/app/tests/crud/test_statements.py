@@ -0,0 +1,36 @@
+from sqlmodel import Session
+
+from app import cruds
+from app.models import Task, TaskStatus
+from app.models.project import Project
+from app.tests.api.test_expand import count_queries
+
+
+def test_prebuilt_statements(pg_session: Session) -> None:
+    project = Project(name="statements", description="statements")
+    pg_session.add(project)
+    pg_session.commit()
+    tasks = [
+        Task(project_id=project.id, title=f"t{i}", description="d", status=TaskStatus.TODO)
+        for i in range(3)
+    ]
+    pg_session.add_all(tasks)
+    pg_session.commit()
+    ids = [task.id for task in tasks]
+    filters = [Task.project_id == project.id]
+    pg_session.expunge_all()
+
+    with count_queries() as statements:
+        for skip, limit in [(0, 2), (1, 2), (2, 5)]:
+            page = cruds.task.get_list(session=pg_session, filters=filters, skip=skip, limit=limit)
+            assert [task.id for task in page] == ids[skip:skip + limit]
+    # Страница без сортировки и курсора - заготовленный запрос с параметрами LIMIT/OFFSET
+    assert len(set(statements)) == 1
+    assert cruds.task.get_list(session=pg_session, filters=filters, limit=1, after=[ids[0], ids[0]])[0].id == ids[1]
+
+    pg_session.expunge_all()
+    with count_queries() as statements:
+        for id in ids:
+            assert cruds.task.get_one_by_id(session=pg_session, id=id, filters=filters).id == id
+        assert cruds.task.get_one_by_id(session=pg_session, id=ids[0], filters=[Task.project_id == 0]) is None
+    assert len(set(statements)) == 1
@@ -0,0 +1,105 @@
+import re
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, text
+
+from app import cruds
+from app.api import deps
+from app.cruds.base import get_list_query
+from app.models import Task, TaskStatus
+from app.models.task import TaskOut
+
+BIG_PROJECT_ID, SMALL_PROJECT_ID = 1, 2
+
+
+@pytest.fixture(scope="module")
+def task_table(pg_session: Session) -> Generator[Session, None, None]:
+    # Временная таблица с индексами модели перекрывает task в пределах транзакции:
+    # планы не зависят от данных, оставленных другими тестами
+    pg_session.execute(text(
+        "CREATE TEMP TABLE task (LIKE public.task INCLUDING DEFAULTS INCLUDING GENERATED) ON COMMIT DROP"
+    ))
+    for index in Task.__table__.indexes:
+        index.create(pg_session.connection())
+    # Один большой проект и 200 маленьких, у каждой десятой задачи заголовок "report ..."
+    pg_session.execute(text("""
+        INSERT INTO task (project_id, title, description, status, due_date)
+        SELECT CASE WHEN g <= 10000 THEN 1 ELSE 2 + g % 200 END,
+               CASE WHEN g % 10 = 0 THEN 'report ' ELSE 'task ' END || g, 'd',
+               (enum_range(NULL::taskstatus))[1 + g % 4], now() + (g % 50 - 5) * interval '1 day'
+        FROM generate_series(1, 20000) g
+    """))
+    pg_session.execute(text("ANALYZE task"))
+    yield pg_session
+    pg_session.rollback()
+
+
+def get_plan_indexes(session: Session, query) -> set[str]:
+    compiled = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    plan = "\n".join(session.execute(text(f"EXPLAIN {compiled}")).scalars().all())
+    assert "Seq Scan" not in plan, plan
+    return set(re.findall(r"Index (?:Only )?Scan (?:using|on) (\w+)", plan))
+
+
+def get_route_query(project_id: int, status: TaskStatus | None, list_filter: list[str], sort: str | None = None):
+    # Запрос списка задач в том виде, в котором его строит маршрут GET /task/
+    spec = cruds.task.filter_spec
+    compiled = spec.compile(spec.parse(list_filter, sort))
+    return cruds.task.get_list_rows_query(
+        schema=TaskOut,
+        filters=[Task.project_id == project_id] + deps.get_status_filter(status) + compiled.filters,
+        sort=compiled.sort,
+        limit=100,
+    )
+
+
+def test_task_listing_uses_index(task_table: Session) -> None:
+    query = get_route_query(SMALL_PROJECT_ID, TaskStatus.TODO, ["due_date:gte:2020-01-01T00:00:00+00:00"], "due_date")
+    assert get_plan_indexes(task_table, query) == {"ix_task_project_id_status_due_date"}
+
+
+@pytest.mark.parametrize(
+    ("status", "list_filter"),
+    [
+        (TaskStatus.TODO, []),
+        (TaskStatus.OVERDUE, []),
+        (None, ["status:in:todo,overdue"]),
+    ],
+)
+def test_task_status_filter_uses_index(
+    task_table: Session, status: TaskStatus | None, list_filter: list[str]
+) -> None:
+    # Статус с учетом просрочки записан условиями на колонки, а не CASE, и идет по индексу
+    query = get_route_query(SMALL_PROJECT_ID, status, list_filter)
+    assert get_plan_indexes(task_table, query) == {"ix_task_project_id_status_due_date"}
+
+
+def test_task_listing_with_cursor_uses_index(task_table: Session) -> None:
+    # Страница большого проекта читается по индексу в порядке id без сортировки
+    query = get_list_query(
+        Task,
+        filters=[Task.project_id == BIG_PROJECT_ID],
+        limit=100,
+        after=[5000, 5000],
+    )
+    assert get_plan_indexes(task_table, query) == {"ix_task_project_id_id"}
+
+
+def test_overdue_sweep_uses_partial_index(task_table: Session) -> None:
+    query = (
+        Task.__table__.select()
+        .with_only_columns(Task.id)
+        .where(*cruds.task.get_overdue_filters())
+        .order_by(Task.due_date, Task.id)
+        .limit(1000)
+    )
+    assert get_plan_indexes(task_table, query) == {"ix_task_due_date_id_not_overdue"}
+
+
+def test_task_title_prefix_filter_uses_index(task_table: Session) -> None:
+    query = get_route_query(SMALL_PROJECT_ID, None, ["title:prefix:report"])
+    assert get_plan_indexes(task_table, query) == {"ix_task_project_id_title"}
@@ -0,0 +1,63 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from sqlmodel import Session
+
+from app import overdue_sweeper
+from app.core.engine import engine
+from app.models import Task, TaskStatus
+from app.models.project import Project
+
+
+def test_sweep(pg_session: Session) -> None:
+    project = Project(name="sweeper", description="sweeper")
+    pg_session.add(project)
+    pg_session.commit()
+    now = datetime.now(timezone.utc)
+    statuses = [TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED, TaskStatus.TODO, TaskStatus.TODO]
+    overdue = [
+        Task(project_id=project.id, title=f"late {i}", description="d", status=status,
+             due_date=now - timedelta(hours=i + 1))
+        for i, status in enumerate(statuses)
+    ]
+    pending = [
+        Task(project_id=project.id, title="future", description="d", status=TaskStatus.TODO,
+             due_date=now + timedelta(days=1)),
+        Task(project_id=project.id, title="no due date", description="d", status=TaskStatus.TODO),
+    ]
+    pg_session.add_all(overdue + pending)
+    pg_session.commit()
+
+    # Пачки меньше числа просроченных задач: проход продолжается по курсору до конца
+    mark_overdue_batch = overdue_sweeper.cruds.task.mark_overdue_batch
+    with patch.object(overdue_sweeper.cruds.task, "mark_overdue_batch", wraps=mark_overdue_batch) as batch:
+        assert overdue_sweeper.sweep(engine, batch_size=2) >= len(overdue)
+    assert batch.call_count >= 3
+    pg_session.expire_all()
+    assert [task.status for task in overdue] == [TaskStatus.OVERDUE] * len(overdue)
+    assert [task.status for task in pending] == [TaskStatus.TODO] * len(pending)
+
+
+def test_run_survives_errors_and_stops() -> None:
+    stop_event = threading.Event()
+    calls = []
+
+    def failing_sweep(db_engine):
+        calls.append(db_engine)
+        if len(calls) == 2:
+            stop_event.set()
+        raise RuntimeError("database is down")
+
+    with patch.object(overdue_sweeper, "sweep", side_effect=failing_sweep), \
+            patch.object(overdue_sweeper.logger, "error") as log_error:
+        overdue_sweeper.run(engine, stop_event, interval=0)
+    assert len(calls) == 2
+    assert log_error.call_count == 2
+
+    # stop() прерывает ожидание интервала и дожидается завершения потока
+    with patch.object(overdue_sweeper, "sweep", return_value=0):
+        thread = overdue_sweeper.OverdueSweeperThread(engine)
+        thread.start()
+        thread.stop()
+    assert not thread.is_alive()
@@ -1,9 +1,12 @@
 import random
 import string
+from contextlib import contextmanager
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from app.core.config import settings
+from app.core.engine import engine, get_async_engine
 
 
 def random_lower_string() -> str:
@@ -24,3 +27,20 @@ def get_superuser_token_headers(client: TestClient) -> dict[str, str]:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_):
+        statements.append(statement)
+
+    engines = [engine, get_async_engine().sync_engine]
+    for db_engine in engines:
+        event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for db_engine in engines:
+            event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
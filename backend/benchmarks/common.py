@@ -0,0 +1,86 @@
+"""
+Общие функции бенчмарков: перцентили, метаданные запуска и сохранение результатов.
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(values: list[float], q: float) -> float:
+    # Перцентиль по ближайшему рангу: значение из выборки, без интерполяции
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    # Задержки в секундах, в отчете - миллисекунды
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1e3, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1e3, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1e3, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1e3, 3) if latencies else 0.0,
+    }
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_metadata() -> dict[str, Any]:
+    return {
+        "commit": get_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": {
+            name: getattr(settings, name)
+            for name in ("FAST_JSON", "ASYNC_API", "CACHE_BACKEND", "DB_POOL_SIZE", "DB_USE_NULL_POOL")
+        },
+    }
+
+
+def save_results(kind: str, results: dict[str, Any], output: str | None = None) -> Path:
+    """
+    Сохраняет результаты в JSON. По умолчанию - benchmarks/results/<kind>-<commit>-<время>.json
+    """
+    if output:
+        path = Path(output)
+    else:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = RESULTS_DIR / f"{kind}-{results.get('commit') or 'nocommit'}-{stamp}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False, default=str))
+    print(f"Results saved to {path}")
+    return path
+
+
+BENCHMARK_DB_MARKER = "bench"
+
+
+def check_throwaway_database(yes_truncate: bool = False) -> None:
+    """
+    Сидирование очищает таблицы, поэтому запуск разрешен только на БД, имя которой
+    содержит "bench" (как в run.sh), либо с явным подтверждением yes_truncate
+    """
+    if settings.ENVIRONMENT == "production":
+        raise SystemExit("Benchmarks must not run against a production database")
+    if not yes_truncate and BENCHMARK_DB_MARKER not in settings.POSTGRES_DB.lower():
+        raise SystemExit(
+            f"Database {settings.POSTGRES_DB!r} does not look like a benchmark database and will be truncated. "
+            "Use a database named *bench* or pass --yes-truncate"
+        )
@@ -0,0 +1,68 @@
+"""
+Сравнение двух файлов результатов load.py или micro.py, например до и после коммита:
+    python benchmarks/compare.py benchmarks/results/load-abc123-....json benchmarks/results/load-def456-....json
+
+Регрессией считается рост p95 или числа запросов на HTTP запрос и падение RPS/ops
+больше чем на --threshold процентов. При регрессиях код возврата 1.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+# Метрика и направление: 1 - больше лучше, -1 - меньше лучше
+METRICS = {
+    "rps": 1,
+    "ops": 1,
+    "p50_ms": -1,
+    "p95_ms": -1,
+    "p99_ms": -1,
+    "queries_per_request": -1,
+}
+CHECKED = ("rps", "ops", "p95_ms", "queries_per_request")
+
+
+def load(path: str) -> dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def get_entries(results: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    return results.get("scenarios") or results.get("benchmarks") or {}
+
+
+def compare(base: dict[str, Any], head: dict[str, Any], threshold: float) -> list[str]:
+    regressions = []
+    base_entries, head_entries = get_entries(base), get_entries(head)
+    print(f"base {base.get('commit')}  head {head.get('commit')}")
+    print(f"{'name':<28}{'metric':<22}{'base':>12}{'head':>12}{'change':>10}")
+    for name in sorted(base_entries.keys() & head_entries.keys()):
+        for metric, direction in METRICS.items():
+            before = base_entries[name].get(metric)
+            after = head_entries[name].get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            regressed = metric in CHECKED and -direction * change > threshold
+            mark = " !" if regressed else ""
+            print(f"{name:<28}{metric:<22}{before:>12}{after:>12}{change:>+9.1f}%{mark}")
+            if regressed:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10, help="допустимое ухудшение, %%")
+    args = parser.parse_args()
+
+    regressions = compare(load(args.base), load(args.head), args.threshold)
+    if regressions:
+        print("Regressions: " + ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Нагрузочный тест всех эндпоинтов API конкурентными клиентами.
+
+Сервер запускается отдельно на заполненной БД (см. benchmarks/seed.py), например:
+    uvicorn app.main:app --workers 4
+    python benchmarks/load.py --base-url http://localhost:8000 --concurrency 32 --requests 1000
+
+Для каждого сценария считаются RPS, p50/p95/p99 и число SQL запросов на HTTP запрос
+(заголовок X-DB-Statements, сервер должен работать не в production).
+Пишущие сценарии работают с отдельным проектом и не трогают засеянные данные.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.common import get_metadata, save_results, summarize
+
+API = settings.API_V1_STR
+
+
+@dataclass
+class Context:
+    project_ids: list[int]
+    task_ids: list[int]
+    # Проект для пишущих сценариев и созданные в нем объекты
+    write_project_id: int = 0
+    created_task_ids: list[int] = field(default_factory=list)
+    created_project_ids: list[int] = field(default_factory=list)
+    etag: str | None = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # По номеру запроса возвращает путь и аргументы httpx или None, если данные закончились
+    make: Callable[[Context, int], tuple[str, dict[str, Any]] | None]
+    on_response: Callable[[Context, httpx.Response], None] | None = None
+
+
+@dataclass
+class ScenarioResult:
+    latencies: list[float] = field(default_factory=list)
+    statements: list[int] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+
+
+def new_task(i: int) -> dict[str, Any]:
+    return {
+        "title": f"load {i}",
+        "description": "load test task",
+        "status": "todo",
+        "due_date": (datetime.now(timezone.utc) + timedelta(days=i % 30 - 5)).isoformat(),
+    }
+
+
+def pick(values: list[int], i: int) -> int | None:
+    return values[i % len(values)] if values else None
+
+
+def pop(values: list[int]) -> int | None:
+    return values.pop() if values else None
+
+
+def with_id(value: int | None, build: Callable[[int], tuple[str, dict[str, Any]]]):
+    return None if value is None else build(value)
+
+
+def remember(target: str) -> Callable[[Context, httpx.Response], None]:
+    def on_response(context: Context, response: httpx.Response) -> None:
+        if response.status_code == 200:
+            body = response.json()
+            items = body["items"] if isinstance(body, dict) and "items" in body else [body]
+            getattr(context, target).extend(item["id"] for item in items)
+    return on_response
+
+
+def get_scenarios() -> list[Scenario]:
+    ndjson = "".join(json.dumps(new_task(i)) + "\n" for i in range(20))
+    return [
+        # Чтение проектов
+        Scenario("project_list", "GET", lambda c, i: (f"{API}/project/", {"params": {"limit": 100}})),
+        Scenario("project_list_stats", "GET", lambda c, i: (f"{API}/project/", {"params": {"limit": 100, "include": "stats"}})),
+        Scenario("project_list_expand", "GET", lambda c, i: (f"{API}/project/", {"params": {"limit": 100, "expand": "tasks"}})),
+        Scenario("project_list_not_modified", "GET", lambda c, i: (
+            f"{API}/project/", {"params": {"limit": 100}, "headers": {"If-None-Match": c.etag or "*"}}
+        )),
+        Scenario("project_get", "GET", lambda c, i: (f"{API}/project/{pick(c.project_ids, i)}", {})),
+        Scenario("project_get_expand", "GET", lambda c, i: (
+            f"{API}/project/{pick(c.project_ids, i)}", {"params": {"expand": "tasks"}}
+        )),
+        # Чтение задач
+        Scenario("task_list", "GET", lambda c, i: (
+            f"{API}/task/", {"params": {"project_id": pick(c.project_ids, i), "limit": 100}}
+        )),
+        Scenario("task_list_filtered", "GET", lambda c, i: (
+            f"{API}/task/", {"params": {"project_id": pick(c.project_ids, i), "limit": 100, "filter": "status:eq:todo"}}
+        )),
+        Scenario("task_list_expand", "GET", lambda c, i: (
+            f"{API}/task/", {"params": {"project_id": pick(c.project_ids, i), "limit": 100, "expand": "project"}}
+        )),
+        Scenario("task_get", "GET", lambda c, i: (f"{API}/task/{pick(c.task_ids, i)}", {})),
+        Scenario("task_get_expand", "GET", lambda c, i: (
+            f"{API}/task/{pick(c.task_ids, i)}", {"params": {"expand": "project"}}
+        )),
+        Scenario("task_batch", "GET", lambda c, i: (
+            f"{API}/task/batch", {"params": {"ids": ",".join(map(str, c.task_ids[i % len(c.task_ids):][:100]))}}
+        ) if c.task_ids else None),
+        # Номер из названия сидированных задач: совпадения есть в каждом проекте
+        Scenario("task_search", "GET", lambda c, i: (
+            f"{API}/task/search", {"params": {"q": str(i % 100 + 1), "limit": 20}}
+        )),
+        Scenario("project_task_search", "GET", lambda c, i: (
+            f"{API}/project/{pick(c.project_ids, i)}/tasks/search", {"params": {"q": f"task {i % 100 + 1}", "limit": 20}}
+        )),
+        Scenario("cache_stats", "GET",lambda c, i: (f"{API}/utils/cache-stats", {})),
+        # Запись задач
+        Scenario("task_create", "POST", lambda c, i: (
+            f"{API}/task/", {"params": {"project_id": c.write_project_id}, "json": new_task(i)}
+        ), remember("created_task_ids")),
+        Scenario("task_update", "PATCH", lambda c, i: with_id(
+            pick(c.created_task_ids, i), lambda task_id: (f"{API}/task/{task_id}", {"json": new_task(i)})
+        )),
+        Scenario("task_bulk_create", "POST", lambda c, i: (
+            f"{API}/task/bulk", {"params": {"project_id": c.write_project_id}, "json": [new_task(j) for j in range(20)]}
+        ), remember("created_task_ids")),
+        Scenario("task_bulk_update", "PATCH", lambda c, i: (
+            f"{API}/task/bulk",
+            {"json": [{"id": task_id, **new_task(i)} for task_id in c.created_task_ids[i * 20 % len(c.created_task_ids):][:20]]},
+        ) if c.created_task_ids else None),
+        Scenario("task_delete", "DELETE", lambda c, i: with_id(
+            pop(c.created_task_ids), lambda task_id: (f"{API}/task/", {"params": {"task_id": task_id}})
+        )),
+        Scenario("task_bulk_delete", "DELETE", lambda c, i: (
+            f"{API}/task/bulk", {"json": [c.created_task_ids.pop() for _ in range(min(20, len(c.created_task_ids)))]}
+        ) if c.created_task_ids else None),
+        # Выгрузка и загрузка
+        Scenario("task_import", "POST", lambda c, i: (
+            f"{API}/project/{c.write_project_id}/tasks/import",
+            {"content": ndjson, "headers": {"Content-Type": "application/x-ndjson"}},
+        )),
+        Scenario("task_export", "GET", lambda c, i: (f"{API}/project/{c.write_project_id}/tasks/export", {})),
+        # Запись проектов
+        Scenario("project_create", "POST", lambda c, i: (
+            f"{API}/project/", {"json": {"name": f"load {i}", "description": "load test project"}}
+        ), remember("created_project_ids")),
+        Scenario("project_update", "PATCH", lambda c, i: with_id(
+            pick(c.created_project_ids, i), lambda project_id: (
+                f"{API}/project/", {"params": {"project_id": project_id}, "json": {"name": f"load {i}", "description": "updated"}}
+            )
+        )),
+        Scenario("project_delete", "DELETE", lambda c, i: with_id(
+            pop(c.created_project_ids), lambda project_id: (f"{API}/project/", {"params": {"project_id": project_id}})
+        )),
+    ]
+
+
+async def prepare(client: httpx.AsyncClient) -> Context:
+    response = await client.get(f"{API}/project/", params={"limit": 1000})
+    response.raise_for_status()
+    project_ids = [project["id"] for project in response.json()]
+    if not project_ids:
+        raise SystemExit("Database is empty, run benchmarks/seed.py first")
+
+    task_ids = []
+    for project_id in project_ids[:20]:
+        response = await client.get(f"{API}/task/", params={"project_id": project_id, "limit": 50})
+        response.raise_for_status()
+        task_ids.extend(task["id"] for task in response.json())
+
+    response = await client.post(f"{API}/project/", json={"name": "load writes", "description": "load test"})
+    response.raise_for_status()
+    context = Context(project_ids=project_ids, task_ids=task_ids, write_project_id=response.json()["id"])
+    context.etag = (await client.get(f"{API}/project/", params={"limit": 100})).headers.get("ETag")
+    return context
+
+
+async def run_scenario(
+        client: httpx.AsyncClient,
+        context: Context,
+        scenario: Scenario,
+        requests: int,
+        concurrency: int,
+) -> dict[str, Any]:
+    result = ScenarioResult()
+    counter = itertools.count()
+
+    async def worker() -> None:
+        while (i := next(counter)) < requests:
+            request = scenario.make(context, i)
+            if request is None:
+                return
+            url, kwargs = request
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, url, **kwargs)
+            except httpx.HTTPError:
+                result.errors += 1
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.statuses[response.status_code] = result.statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                result.errors += 1
+            if "X-DB-Statements" in response.headers:
+                result.statements.append(int(response.headers["X-DB-Statements"]))
+            if scenario.on_response:
+                scenario.on_response(context, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    count = len(result.latencies)
+    return {
+        "requests": count,
+        "errors": result.errors,
+        "statuses": result.statuses,
+        "rps": round(count / elapsed, 2) if elapsed else 0.0,
+        **summarize(result.latencies),
+        "queries_per_request": round(sum(result.statements) / len(result.statements), 2) if result.statements else None,
+        "max_queries_per_request": max(result.statements, default=None),
+    }
+
+
+def print_report(results: dict[str, dict[str, Any]]) -> None:
+    print(f"{'scenario':<28}{'req':>7}{'err':>6}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<28}{result['requests']:>7}{result['errors']:>6}{result['rps']:>10.1f}"
+            f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+            f"{result['queries_per_request'] if result['queries_per_request'] is not None else '-':>8}"
+        )
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    scenarios = [s for s in get_scenarios() if not args.scenarios or s.name in args.scenarios]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        context = await prepare(client)
+        results = {}
+        for scenario in scenarios:
+            results[scenario.name] = await run_scenario(client, context, scenario, args.requests, args.concurrency)
+            print(f"{scenario.name}: {results[scenario.name]['rps']} rps")
+        await client.delete(f"{API}/project/", params={"project_id": context.write_project_id})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="запросов на сценарий")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--scenarios", nargs="*", help="имена сценариев, по умолчанию все")
+    parser.add_argument("--profile", help="профиль данных из seed.py, пишется в результаты")
+    parser.add_argument("--output", help="файл результатов, по умолчанию benchmarks/results/")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_report(results)
+    save_results("load", {
+        **get_metadata(),
+        "profile": args.profile,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Микробенчмарки слоя CRUD и сериализации на заполненной БД (см. benchmarks/seed.py):
+    python benchmarks/micro.py --repeat 200
+
+* get_list / get_list_rows - страница задач проекта ORM объектами и строками;
+* get_one_by_id / get_many_by_ids - заготовленные запросы CRUDBase; *_adhoc - тот же запрос,
+  собираемый заново при каждом вызове, *_unprepared - без подготовки запросов на сервере;
+* get_status_update - перевод просроченной задачи в OVERDUE, изменения откатываются;
+* serialize_* - сериализация страницы задач тремя путями из benchmarks/serialization.py.
+"""
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.utils import create_model_field
+from sqlmodel import Session, create_engine, func, select
+
+from app import cruds
+from app.core.config import settings
+from app.core.engine import engine, get_engine_options
+from app.cruds.base import CRUDBase
+from app.models import Task, TaskStatus
+from app.models.task import TaskOut
+from benchmarks import serialization
+from benchmarks.common import get_metadata, save_results, summarize
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    func()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return {"ops": round(len(latencies) / sum(latencies), 2), **summarize(latencies)}
+
+
+def get_largest_project_id(session: Session) -> int:
+    return session.execute(
+        select(Task.project_id).group_by(Task.project_id).order_by(func.count().desc()).limit(1)
+    ).scalar_one()
+
+
+def get_overdue_candidate(session: Session) -> Task:
+    task = session.execute(
+        select(Task).where(*cruds.task.get_overdue_filters()).limit(1)
+    ).scalar_one_or_none()
+    if task is None:
+        raise SystemExit("No tasks past due date, run benchmarks/seed.py first")
+    return task
+
+
+def bench_lookups(repeat: int, ids: list[int]) -> dict[str, dict[str, float]]:
+    """
+    Чтение по первичному ключу без кэша объектов: заготовленный запрос, запрос,
+    собираемый при каждом вызове, и заготовленный запрос без PREPARE на сервере
+    """
+    crud = CRUDBase(Task)
+    pk = Task.__table__.primary_key.columns[0]
+    unprepared = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        **(get_engine_options() | {"connect_args": {"prepare_threshold": None}}),
+    )
+    results = {}
+    with Session(engine) as session, Session(unprepared) as unprepared_session:
+
+        def get_one_by_id() -> None:
+            crud.get_one_by_id(session=session, id=ids[0])
+            session.expunge_all()
+
+        def get_one_by_id_adhoc() -> None:
+            session.execute(select(Task).where(pk == ids[0])).scalar_one_or_none()
+            session.expunge_all()
+
+        def get_one_by_id_unprepared() -> None:
+            crud.get_one_by_id(session=unprepared_session, id=ids[0])
+            unprepared_session.expunge_all()
+
+        def get_many_by_ids() -> None:
+            crud.get_many_by_ids(session=session, list_ids=ids)
+            session.expunge_all()
+
+        def get_many_by_ids_adhoc() -> None:
+            session.execute(select(Task).where(pk.in_(ids))).scalars().all()
+            session.expunge_all()
+
+        for bench in [
+            get_one_by_id, get_one_by_id_adhoc, get_one_by_id_unprepared, get_many_by_ids, get_many_by_ids_adhoc
+        ]:
+            results[bench.__name__] = measure(bench, repeat)
+    unprepared.dispose()
+    return results
+
+
+def bench_get_status_update(repeat: int) -> dict[str, float]:
+    """
+    Каждый вызов коммитит, поэтому сессия работает в точке сохранения внешней транзакции,
+    которая в конце откатывается и не меняет засеянные данные
+    """
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
+            task_id = get_overdue_candidate(session).id
+
+            def update_status() -> None:
+                task = session.get(Task, task_id)
+                task.status = TaskStatus.TODO
+                session.flush()
+                cruds.task.get_status_update(session=session, obj_current=task)
+                session.expunge_all()
+
+            result = measure(update_status, repeat)
+        transaction.rollback()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100, help="размер страницы")
+    parser.add_argument("--profile", help="профиль данных из seed.py, пишется в результаты")
+    parser.add_argument("--output", help="файл результатов, по умолчанию benchmarks/results/")
+    args = parser.parse_args()
+
+    settings.FAST_JSON = True
+    results = {}
+    field = create_model_field(name="Response", type_=list[TaskOut], mode="serialization")
+    with Session(engine) as session:
+        project_id = get_largest_project_id(session)
+        filters = [Task.project_id == project_id]
+
+        def get_list() -> None:
+            cruds.task.get_list(session=session, filters=filters, limit=args.limit)
+            session.expunge_all()
+
+        def get_list_rows() -> None:
+            cruds.task.get_list_rows(session=session, schema=TaskOut, filters=filters, limit=args.limit)
+
+        results["get_list"] = measure(get_list, args.repeat)
+        results["get_list_rows"] = measure(get_list_rows, args.repeat)
+
+        page = select(Task).where(*filters).limit(args.limit)
+        results["serialize_response_model"] = measure(
+            lambda: serialization.response_model_path(session, field, page), args.repeat
+        )
+        results["serialize_fast_json"] = measure(lambda: serialization.fast_json_path(session, page), args.repeat)
+        results["serialize_rows"] = measure(lambda: serialization.rows_path(session, page), args.repeat)
+        ids = session.execute(select(Task.id).where(*filters).limit(20)).scalars().all()
+    results |= bench_lookups(args.repeat, ids)
+    results["get_status_update"] = bench_get_status_update(args.repeat)
+
+    for name, result in results.items():
+        print(f"{name:<28}{result['ops']:>10.1f} ops/s{result['p50_ms']:>9.3f} ms p50{result['p99_ms']:>9.3f} ms p99")
+    save_results("micro", {
+        **get_metadata(),
+        "profile": args.profile,
+        "repeat": args.repeat,
+        "limit": args.limit,
+        "benchmarks": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env bash
+# Полный прогон бенчмарков на одноразовом Postgres в Docker:
+#   bash benchmarks/run.sh balanced
+# Профиль - один из benchmarks/seed.py. Результаты пишутся в benchmarks/results/
+
+set -e
+
+PROFILE=${1:-small}
+BENCH_PORT=${BENCH_PORT:-55432}
+CONTAINER=task-benchmark-db
+
+export POSTGRES_SERVER=localhost
+export POSTGRES_PORT=$BENCH_PORT
+export POSTGRES_USER=postgres
+export POSTGRES_PASSWORD=benchmark
+export POSTGRES_DB=benchmark
+export ENVIRONMENT=local
+export PYTHONPATH=.
+
+docker run --rm -d --name $CONTAINER -p "$BENCH_PORT:5432" \
+    -e POSTGRES_PASSWORD=$POSTGRES_PASSWORD -e POSTGRES_DB=$POSTGRES_DB postgres:12 > /dev/null
+trap 'kill $SERVER_PID 2> /dev/null; docker stop $CONTAINER > /dev/null' EXIT
+
+python app/backend_pre_start.py
+alembic upgrade head
+python benchmarks/seed.py --profile "$PROFILE"
+
+uvicorn app.main:app --port 8001 --workers "${BENCH_WORKERS:-4}" --log-level warning &
+SERVER_PID=$!
+until curl -s localhost:8001/metrics > /dev/null; do sleep 0.5; done
+
+python benchmarks/micro.py --profile "$PROFILE"
+python benchmarks/load.py --base-url http://localhost:8001 --profile "$PROFILE" \
+    --concurrency "${BENCH_CONCURRENCY:-16}" --requests "${BENCH_REQUESTS:-500}"
@@ -0,0 +1,99 @@
+"""
+Заполнение одноразовой БД данными для нагрузочных тестов.
+
+Профили задают число проектов и задач в каждом проекте:
+    one_project    - 1 проект, 1 000 000 задач
+    balanced       - 1 000 проектов по 100 задач
+    many_projects  - 100 000 проектов по 3 задачи
+    small          - 10 проектов по 100 задач (для быстрой проверки)
+
+Таблицы project и task очищаются перед заполнением, поэтому БД должна называться *bench*
+(как в run.sh), иначе нужен флаг --yes-truncate:
+    python benchmarks/seed.py --profile balanced
+    python benchmarks/seed.py --projects 500 --tasks 20 --yes-truncate
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.engine import engine
+from benchmarks.common import check_throwaway_database
+
+PROFILES = {
+    "one_project": (1, 1_000_000),
+    "balanced": (1_000, 100),
+    "many_projects": (100_000, 3),
+    "small": (10, 100),
+}
+
+# Задачи вставляются порциями по проектам, чтобы не держать одну огромную транзакцию
+TASKS_PER_BATCH = 200_000
+
+INSERT_PROJECTS = text("""
+    INSERT INTO project (name, description)
+    SELECT 'benchmark ' || n, 'benchmark project ' || n
+    FROM generate_series(1, :projects) AS n
+""")
+
+# Статусы и сроки распределены равномерно; часть сроков уже прошла,
+# но статус не OVERDUE - так проверяется вычисление статуса при чтении
+INSERT_TASKS = text("""
+    INSERT INTO task (project_id, title, description, status, due_date, created_at, updated_at)
+    SELECT
+        p.id,
+        'task ' || n,
+        'benchmark task ' || n,
+        (ARRAY['TODO', 'IN_PROGRESS', 'COMPLETED', 'OVERDUE'])[1 + n % 4]::taskstatus,
+        CASE WHEN n % 5 = 0 THEN NULL ELSE now() + (n % 60 - 10) * interval '1 day' END,
+        now(),
+        now()
+    FROM project AS p
+    CROSS JOIN generate_series(1, :tasks) AS n
+    WHERE p.id BETWEEN :first_id AND :last_id
+""")
+
+
+def reset(session: Session) -> None:
+    session.execute(text("TRUNCATE task, project, project_task_stats RESTART IDENTITY"))
+
+
+def seed(session: Session, projects: int, tasks: int) -> None:
+    reset(session)
+    session.execute(INSERT_PROJECTS, {"projects": projects})
+    session.commit()
+    projects_per_batch = max(1, TASKS_PER_BATCH // max(tasks, 1))
+    for first_id in range(1, projects + 1, projects_per_batch):
+        session.execute(INSERT_TASKS, {
+            "tasks": tasks,
+            "first_id": first_id,
+            "last_id": first_id + projects_per_batch - 1,
+        })
+        session.commit()
+    # VACUUM нельзя выполнить внутри транзакции
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE project, task, project_task_stats"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=PROFILES, default="small")
+    parser.add_argument("--projects", type=int, help="число проектов, перекрывает профиль")
+    parser.add_argument("--tasks", type=int, help="число задач в проекте, перекрывает профиль")
+    parser.add_argument("--yes-truncate", action="store_true", help="очистить таблицы БД без \"bench\" в имени")
+    args = parser.parse_args()
+
+    check_throwaway_database(args.yes_truncate)
+    projects, tasks = PROFILES[args.profile]
+    projects = args.projects if args.projects is not None else projects
+    tasks = args.tasks if args.tasks is not None else tasks
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        seed(session, projects, tasks)
+    print(f"Seeded {projects} projects x {tasks} tasks in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Стоимость сериализации страницы задач в пересчете на строку.
+
+Сравниваются три пути:
+* response_model - ORM объекты, валидация и сериализация FastAPI, json.dumps;
+* fast_json - ORM объекты, готовый TypeAdapter и dump_json в pydantic-core;
+* rows - строки, выбранные по колонкам, dump_json без создания моделей.
+
+Данные лежат в SQLite в памяти, поэтому Postgres не нужен:
+    python benchmarks/serialization.py --rows 100 --repeat 200
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import Engine
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.sql.expression import Select
+
+from app.api import serializers
+from app.core.config import settings
+from app.models import Project, Task, TaskStatus
+from app.models.task import TaskOut
+
+
+@compiles(CreateColumn, "sqlite")
+def skip_search_vector(element: CreateColumn, compiler, **kw) -> str | None:
+    # Вычисляемые tsvector колонки есть только в Postgres, модели их не отображают
+    if isinstance(element.element.type, TSVECTOR):
+        return None
+    return compiler.visit_create_column(element, **kw)
+
+
+def create_schema(engine: Engine) -> None:
+    for table in SQLModel.metadata.tables.values():
+        for index in table.indexes:
+            if any(isinstance(column.type, TSVECTOR) for column in index.columns):
+                index.ddl_if(dialect="postgresql")
+    SQLModel.metadata.create_all(engine)
+
+
+def seed(session: Session, rows: int) -> None:
+    project = Project(name="benchmark", description="benchmark")
+    session.add(project)
+    session.flush()
+    now = datetime.now()
+    session.add_all(
+        Task(
+            project_id=project.id,
+            title=f"task {i}",
+            description="description " * 10,
+            status=list(TaskStatus)[i % len(TaskStatus)],
+            due_date=now + timedelta(days=i),
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(rows)
+    )
+    session.commit()
+
+
+def response_model_path(session: Session, field, query: Select | None = None) -> bytes:
+    tasks = session.exec(query if query is not None else select(Task)).all()
+    content = asyncio.run(serialize_response(field=field, response_content=tasks))
+    session.expunge_all()
+    return JSONResponse(content).body
+
+
+def fast_json_path(session: Session, query: Select | None = None) -> bytes:
+    tasks = session.exec(query if query is not None else select(Task)).all()
+    response = serializers.render(serializers.task_list_adapter, tasks)
+    session.expunge_all()
+    return response.body
+
+
+def rows_path(session: Session, query: Select | None = None) -> bytes:
+    columns = [Task.__table__.c[name] for name in TaskOut.model_fields]
+    query = query.with_only_columns(*columns) if query is not None else select(*columns)
+    rows = session.execute(query).all()
+    return serializers.render_rows(serializers.task_rows_adapter, rows).body
+
+
+def measure(name: str, func, rows: int, repeat: int) -> None:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - started
+    per_row = elapsed / (repeat * rows) * 1e6
+    print(f"{name:<16}{elapsed / repeat * 1e3:>10.3f} ms/page{per_row:>10.2f} us/row")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    settings.FAST_JSON = True
+    engine = create_engine("sqlite://")
+    create_schema(engine)
+    field = create_model_field(name="Response", type_=list[TaskOut], mode="serialization")
+    with Session(engine) as session:
+        seed(session, args.rows)
+        session.expunge_all()
+        assert len(rows_path(session)) == len(fast_json_path(session))
+        measure("response_model", lambda: response_model_path(session, field), args.rows, args.repeat)
+        measure("fast_json", lambda: fast_json_path(session), args.rows, args.repeat)
+        measure("rows", lambda: rows_path(session), args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()